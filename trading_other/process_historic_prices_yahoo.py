@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from pandas_datareader._utils import RemoteDataError
@@ -6,13 +7,18 @@ import requests
 import datetime as dt
 from datetime import timedelta, date, datetime
 from datetime import date
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from trading_system.system_development.engine.data_loader import compact_ohlcv
 
 #delete existing tables
 #make new tables that start as far back as possible
 #run this process to get all data up to today
 
 class Process_update_historic:
-    def __init__(self, interval, delta, start, end, db, table_name):
+    def __init__(self, interval, delta, start, end, db, table_name, compact=False):
         self.interval = interval
         self.delta = delta
         self.start = start
@@ -21,6 +27,8 @@ class Process_update_historic:
 
         self.db = db
         self.table_name = table_name
+        # compact: float32 prices / int32 volume where no value changes, categorical ticker in memory
+        self.compact = compact
 
         self.df = pd.DataFrame
         self.df_fv = pd.DataFrame
@@ -63,6 +71,8 @@ class Process_update_historic:
 
             # Create the DataFrame
             self.df = pd.DataFrame(rows, columns=column_names)
+            if self.compact:
+                self.df = self.compact_frame(self.df)
 
         except sqlite3.Error as e:
             print(f'An error occurred while reading data: {e}')
@@ -104,6 +114,7 @@ class Process_update_historic:
             conn.close()
 
     def get_data(self):
+        frames = []
         for count, ticker in enumerate(self.tickers):
             try:
                 df = yf.download(tickers=[ticker], interval=self.interval, start=self.start, end=self.t_end,
@@ -111,13 +122,10 @@ class Process_update_historic:
                 df['ticker'] = ticker
                 df['dt'] = df.index.astype(str)
                 df.rename(columns={'dt': 'date', 'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Adj Close': 'adj_close', 'Volume': 'volume'}, inplace=True)
+                if self.compact:
+                    df = self.compact_frame(df)
 
-
-                if self.data.empty:
-                    self.data = df
-                else:
-                    # self.data = self.data.join(df, how='outer')
-                    self.data = pd.concat([self.data, df], ignore_index=True)
+                frames.append(df)
                 if count % 1 == 0:
                     print(count)
                     print(ticker)
@@ -130,6 +138,15 @@ class Process_update_historic:
                 print('remote error {}'.format(ticker))
                 continue
 
+        # One concat for the whole universe (appending per ticker is quadratic)
+        if not self.data.empty:
+            frames.insert(0, self.data)
+        if frames:
+            self.data = pd.concat(frames, ignore_index=True)
+            if self.compact:
+                # concat of categoricals with different categories falls back to object
+                self.data['ticker'] = self.data['ticker'].astype('category')
+
     def update_db(self):
         try:
             # Connect to the database
@@ -147,6 +164,22 @@ class Process_update_historic:
         finally:
             conn.close()
 
+    @staticmethod
+    def compact_frame(df, max_decimals=6):
+        # engine.data_loader.compact_ohlcv with this table's column names: prices as
+        # float32 only where no quote changes, volume as int32 when whole-numbered and
+        # in range, ticker as a categorical (integer code per row instead of a string).
+        # Roughly halves memory for long-format universe tables.
+        df = df.copy()
+        for col in ['open', 'high', 'low', 'close', 'adj_close']:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float64)
+        if 'volume' in df.columns:
+            df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
+        return compact_ohlcv(df, max_decimals=max_decimals,
+                             price_columns=['open', 'high', 'low', 'close', 'adj_close'],
+                             volume_column='volume')
+
     @staticmethod
     def discord_notification(status, interval, start, end):
         message = f'{status}: {interval} Historic price data download process between {start} and {end}'
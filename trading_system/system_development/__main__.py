@@ -0,0 +1,15 @@
+"""
+Entry point for ``python -m system_development`` (see cli.py).
+"""
+
+import os
+import sys
+
+# The development code imports its own modules from this folder
+# ("from engine...", "from strategies..."), the same way main.ipynb does.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main())
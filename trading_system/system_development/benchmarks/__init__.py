@@ -0,0 +1,13 @@
+"""
+Reproducible benchmarks for the engine hot paths.
+
+Run from the system_development folder (same import root as main.ipynb):
+
+    python -m benchmarks                      # 1k, 100k and 1M bars
+    python -m benchmarks --sizes 1000 100000  # subset of sizes
+    python -m benchmarks --only indicators    # cases whose name matches
+
+All inputs are seeded synthetic OHLCV bars (no network). Each run is
+appended to a JSON history file together with the git commit, so timings
+can be compared between commits.
+"""
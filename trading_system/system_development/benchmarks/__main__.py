@@ -0,0 +1,70 @@
+import argparse
+
+from .bench_engine import (
+    DEFAULT_HISTORY,
+    DEFAULT_SIZES,
+    append_history,
+    compare_runs,
+    load_history,
+    print_comparison,
+    run_benchmarks,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the system_development engine hot paths."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Number of synthetic bars per run (default: 1k 100k 1M).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repeats per case.")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic data seed.")
+    parser.add_argument("--only", default=None, help="Only run cases containing this text.")
+    parser.add_argument(
+        "--history",
+        default=DEFAULT_HISTORY,
+        help="JSON history file the run is appended to.",
+    )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Do not append this run to the history file.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Flag cases slower than previous run by more than this factor.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    history = load_history(args.history)
+
+    run = run_benchmarks(
+        sizes=args.sizes,
+        repeat=args.repeat,
+        seed=args.seed,
+        only=args.only,
+    )
+
+    if history:
+        previous = history[-1]
+        rows = compare_runs(previous, run, threshold=args.threshold)
+        if rows:
+            print_comparison(rows, previous.get("commit"))
+
+    if not args.no_save:
+        append_history(run, args.history)
+        print(f"\n[INFO] Appended run to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from engine import indicators
+from engine.indicators import add_core_indicators
+from engine.metrics import calculate_stats
+from strategies.breakout_v1 import rules as bo_rules, run_backtest as bo_backtest
+from strategies.breakout_v1.config import StrategyParams as BOParams
+from strategies.trend_pullback_v1 import rules as tp_rules, run_backtest as tp_backtest
+from strategies.trend_pullback_v1.config import StrategyParams as TPParams
+
+from .synthetic import make_ohlcv
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "results", "history.json")
+
+# A case turns the synthetic bars into a zero-argument callable to time.
+# Anything done before returning the callable (e.g. preparing signals for
+# the loop benchmarks) is setup and is not timed.
+Setup = Callable[[pd.DataFrame], Callable[[], object]]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Setup
+
+
+def _prepared(df: pd.DataFrame, rules, params, subset: List[str]) -> pd.DataFrame:
+    return rules.prepare_dataframe(df, params).dropna(subset=subset).copy()
+
+
+def _bo_prepared(df: pd.DataFrame) -> pd.DataFrame:
+    return _prepared(df, bo_rules, BOParams(), ["Close", "High", "Low", "EMA_Slow", "ATR", "ADX"])
+
+
+def _tp_prepared(df: pd.DataFrame) -> pd.DataFrame:
+    return _prepared(df, tp_rules, TPParams(), ["EMA_Fast", "EMA_Slow", "RSI", "ATR", "ADX"])
+
+
+def _bo_loop_setup(df: pd.DataFrame) -> Callable[[], object]:
+    prepared = _bo_prepared(df)
+    return lambda: bo_backtest.run_backtest_loop(prepared, "BENCH", BOParams())
+
+
+def _tp_loop_setup(df: pd.DataFrame) -> Callable[[], object]:
+    prepared = _tp_prepared(df)
+    return lambda: tp_backtest.run_backtest_loop(prepared, "BENCH", TPParams())
+
+
+def _stats_setup(df: pd.DataFrame) -> Callable[[], object]:
+    equity, trades = tp_backtest.run_backtest_loop(_tp_prepared(df), "BENCH", TPParams())
+    return lambda: calculate_stats(equity, trades)
+
+
+CASES: List[Case] = [
+    Case("indicators.ema", lambda df: lambda: indicators.ema(df["Close"], 20)),
+    Case("indicators.rsi", lambda df: lambda: indicators.rsi(df["Close"], 5)),
+    Case(
+        "indicators.true_range",
+        lambda df: lambda: indicators.true_range(df["High"], df["Low"], df["Close"]),
+    ),
+    Case(
+        "indicators.atr",
+        lambda df: lambda: indicators.atr(df["High"], df["Low"], df["Close"], 14),
+    ),
+    Case(
+        "indicators.adx",
+        lambda df: lambda: indicators.adx(df["High"], df["Low"], df["Close"], 20),
+    ),
+    Case("indicators.add_core_indicators", lambda df: lambda: add_core_indicators(df)),
+    Case(
+        "breakout_v1.prepare_dataframe",
+        lambda df: lambda: bo_rules.prepare_dataframe(df, BOParams()),
+    ),
+    Case(
+        "trend_pullback_v1.prepare_dataframe",
+        lambda df: lambda: tp_rules.prepare_dataframe(df, TPParams()),
+    ),
+    Case("breakout_v1.run_backtest_loop", _bo_loop_setup),
+    Case("trend_pullback_v1.run_backtest_loop", _tp_loop_setup),
+    Case("metrics.calculate_stats", _stats_setup),
+]
+
+
+def _time_call(fn: Callable[[], object], repeat: int) -> List[float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_benchmarks(
+    sizes: List[int] | None = None,
+    repeat: int = 3,
+    seed: int = 42,
+    only: Optional[str] = None,
+    verbose: bool = True,
+) -> Dict[str, object]:
+    """
+    Time every case at every size and return one history entry.
+
+    Timings are wall-clock seconds; 'best' (minimum over repeats) is the
+    number to compare across commits, 'median' shows the noise.
+    """
+    if sizes is None:
+        sizes = DEFAULT_SIZES
+    cases = [c for c in CASES if only is None or only in c.name]
+
+    results: List[Dict[str, object]] = []
+    for n_bars in sizes:
+        df = make_ohlcv(n_bars, seed=seed)
+        for case in cases:
+            fn = case.setup(df)
+            timings = _time_call(fn, repeat)
+            best = min(timings)
+            entry = {
+                "case": case.name,
+                "n_bars": n_bars,
+                "best_s": best,
+                "median_s": float(np.median(timings)),
+                "repeat": repeat,
+                "ns_per_bar": best / n_bars * 1e9,
+            }
+            results.append(entry)
+            if verbose:
+                print(
+                    f"{case.name:40s} {n_bars:>9d} bars  "
+                    f"best {best * 1e3:10.2f} ms  "
+                    f"({entry['ns_per_bar']:9.1f} ns/bar)"
+                )
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def load_history(path: str = DEFAULT_HISTORY) -> List[Dict[str, object]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def append_history(run: Dict[str, object], path: str = DEFAULT_HISTORY) -> None:
+    history = load_history(path)
+    history.append(run)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(history, fh, indent=2)
+
+
+def compare_runs(
+    previous: Dict[str, object],
+    current: Dict[str, object],
+    threshold: float = 1.2,
+) -> List[Dict[str, object]]:
+    """
+    Ratio current/previous 'best' time for every (case, n_bars) present in
+    both runs. Ratios above `threshold` are flagged as regressions.
+    """
+    before = {(r["case"], r["n_bars"]): r["best_s"] for r in previous["results"]}
+    rows: List[Dict[str, object]] = []
+    for r in current["results"]:
+        key = (r["case"], r["n_bars"])
+        if key not in before or before[key] <= 0:
+            continue
+        ratio = r["best_s"] / before[key]
+        rows.append(
+            {
+                "case": r["case"],
+                "n_bars": r["n_bars"],
+                "previous_s": before[key],
+                "current_s": r["best_s"],
+                "ratio": ratio,
+                "regression": ratio > threshold,
+            }
+        )
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, object]], previous_commit: Optional[str]) -> None:
+    print(f"\n=== Compared with previous run (commit {previous_commit}) ===")
+    for row in rows:
+        flag = "  <-- REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['case']:40s} {row['n_bars']:>9d} bars  "
+            f"x{row['ratio']:6.2f}{flag}"
+        )
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(
+    n_bars: int,
+    seed: int = 42,
+    freq: str = "1h",
+    start: str = "2000-01-03",
+    start_price: float = 100.0,
+    bar_vol: float = 0.004,
+) -> pd.DataFrame:
+    """
+    Deterministic geometric-random-walk OHLCV bars.
+
+    Columns match download_price_data(): Open, High, Low, Close,
+    Adj Close, Volume. The same (n_bars, seed) always gives the same frame.
+    """
+    rng = np.random.default_rng(seed)
+
+    log_ret = rng.normal(0.0, bar_vol, size=n_bars)
+    # slow regime drift so the trend filters see both up and down trends
+    drift = 0.5 * bar_vol * np.sin(np.arange(n_bars) / 500.0)
+    close = start_price * np.exp(np.cumsum(log_ret + drift))
+
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * (1.0 + rng.normal(0.0, bar_vol / 4, size=n_bars - 1))
+
+    wick = np.abs(rng.normal(0.0, bar_vol / 2, size=(2, n_bars)))
+    high = np.maximum(open_, close) * (1.0 + wick[0])
+    low = np.minimum(open_, close) * (1.0 - wick[1])
+    volume = rng.integers(1_000, 100_000, size=n_bars)
+
+    index = pd.date_range(start=start, periods=n_bars, freq=freq)
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": volume,
+        },
+        index=index,
+    )
@@ -0,0 +1,422 @@
+"""
+Command-line runner for the development strategy registry.
+
+Run from the trading_system folder:
+
+    python -m system_development list
+    python -m system_development run breakout_v1 --symbols ^GSPC ^NDX \\
+        --interval 1h --workers 8 --no-plot --format json --output stats.json
+    python -m system_development run trend_pullback_v1 \\
+        --param entry_mode=shallow_pullback --param tp_atr_mult=2 \\
+        --params-file sweep_base.json --format csv
+
+Parameter overrides are applied on top of the strategy's StrategyParams
+defaults: first --params-file (JSON, or YAML if PyYAML is installed), then
+each --param key=value in order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Any, Dict, List, Optional
+
+from strategies.registry import get_strategy, list_strategies
+
+
+# --- Parameter handling --- #
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off"}
+
+
+def _coerce(name: str, raw: Any, default: Any) -> Any:
+    """Convert an override to the type of the field's default value."""
+    if not isinstance(raw, str):
+        return raw
+    if isinstance(default, bool):
+        value = raw.strip().lower()
+        if value in _TRUE:
+            return True
+        if value in _FALSE:
+            return False
+        raise ValueError(f"Parameter {name} expects a boolean, got '{raw}'")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def load_params_file(path: str) -> Dict[str, Any]:
+    with open(path) as fh:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as exc:
+                raise ImportError(
+                    "Reading YAML params files needs PyYAML (pip install pyyaml)"
+                ) from exc
+            data = yaml.safe_load(fh)
+        else:
+            data = json.load(fh)
+    if not isinstance(data, dict):
+        raise ValueError(f"Params file {path} must contain a mapping of name -> value")
+    return data
+
+
+def build_params(params_cls: type, overrides: Dict[str, Any]) -> Any:
+    defaults = params_cls()
+    valid = {f.name for f in fields(params_cls)}
+    unknown = sorted(set(overrides) - valid)
+    if unknown:
+        raise ValueError(
+            f"Unknown parameter(s) for {params_cls.__module__}.{params_cls.__name__}: "
+            f"{', '.join(unknown)}. Valid: {', '.join(sorted(valid))}"
+        )
+    typed = {k: _coerce(k, v, getattr(defaults, k)) for k, v in overrides.items()}
+    return replace(defaults, **typed)
+
+
+def parse_overrides(pairs: List[str]) -> Dict[str, str]:
+    overrides: Dict[str, str] = {}
+    for pair in pairs:
+        if "=" not in pair:
+            raise ValueError(f"--param expects key=value, got '{pair}'")
+        key, value = pair.split("=", 1)
+        overrides[key.strip()] = value.strip()
+    return overrides
+
+
+# --- Execution --- #
+
+def _run_symbol(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Backtest one symbol. Runs in a worker process when --workers > 1, so it
+    only takes / returns picklable values and never raises.
+    """
+    from engine.instrumentation import Tracer, tracing
+    from engine.result_store import ResultStore
+
+    spec = get_strategy(task["strategy"])
+    store = ResultStore(task["store"]) if task["store"] else None
+    tracer = Tracer(profile=task["profile"], profile_dir=task["profile_dir"])
+
+    t0 = time.perf_counter()
+    try:
+        with tracing(tracer), tracer.span("backtest_symbol", symbol=task["symbol"]), \
+                tracer.profile(task["symbol"]):
+            if task["incremental"]:
+                result = spec.update_backtest(
+                    symbol=task["symbol"],
+                    store=store,
+                    params=task["params"],
+                    start=task["start"],
+                    end=task["end"],
+                    interval=task["interval"],
+                    verbose=task["verbose"],
+                )
+            else:
+                result = spec.backtest_symbol(
+                    symbol=task["symbol"],
+                    params=task["params"],
+                    start=task["start"],
+                    end=task["end"],
+                    interval=task["interval"],
+                    plot=task["plot"],
+                    verbose=task["verbose"],
+                    show_benchmark=task["plot"],
+                    store=store,
+                )
+        error = None
+    except Exception as exc:  # keep the batch going; report per symbol
+        result = None
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        if store is not None:
+            store.close()
+
+    return {
+        "symbol": task["symbol"],
+        "result": result,
+        "error": error,
+        "elapsed_s": time.perf_counter() - t0,
+        "spans": tracer.records,
+        "counters": dict(tracer.counters),
+    }
+
+
+def _rows(strategy: str, interval: str, outcomes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for out in outcomes:
+        row: Dict[str, Any] = {
+            "strategy": strategy,
+            "symbol": out["symbol"],
+            "interval": interval,
+            "elapsed_s": round(out["elapsed_s"], 4),
+            "error": out["error"],
+        }
+        if out["result"] is not None:
+            row.update(out["result"].stats)
+        rows.append(row)
+    return rows
+
+
+def _json_value(value: Any) -> Any:
+    """
+    Plain JSON value: numpy scalars become Python numbers, and non-finite
+    floats (e.g. profit_factor with no losing trades) become null, as
+    strict parsers (jq, JSON.parse) reject Infinity / NaN.
+    """
+    if isinstance(value, dict):
+        return {k: _json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()  # numpy scalar
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _write_output(rows: List[Dict[str, Any]], fmt: str, output: Optional[str]) -> None:
+    if fmt == "json":
+        text = json.dumps(_json_value(rows), indent=2, default=float, allow_nan=False)
+    else:
+        columns: List[str] = []
+        for row in rows:
+            columns.extend(k for k in row if k not in columns)
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+        text = buf.getvalue()
+
+    if output:
+        with open(output, "w", newline="") as fh:
+            fh.write(text)
+        print(f"[INFO] Wrote {len(rows)} rows to {output}", file=sys.stderr)
+    else:
+        sys.stdout.write(text if text.endswith("\n") else text + "\n")
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    for name in list_strategies():
+        spec = get_strategy(name)
+        print(f"{name}")
+        print(f"  default symbols: {', '.join(spec.default_symbols)}")
+        for f in fields(spec.params_cls):
+            print(f"  {f.name:22s} = {getattr(spec.params_cls(), f.name)!r}")
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    from engine.instrumentation import Tracer
+    from engine.metrics import print_stats
+
+    spec = get_strategy(args.strategy)
+
+    overrides: Dict[str, Any] = {}
+    if args.params_file:
+        overrides.update(load_params_file(args.params_file))
+    overrides.update(parse_overrides(args.param))
+    params = build_params(spec.params_cls, overrides)
+
+    symbols = args.symbols or spec.default_symbols
+    machine_output = args.format in ("json", "csv")
+    log = sys.stderr if machine_output else sys.stdout
+
+    if args.incremental and not args.store:
+        print("[ERROR] --incremental needs --store", file=sys.stderr)
+        return 2
+
+    plot = args.plot
+    if plot and args.incremental:
+        print("[WARN] --plot is ignored with --incremental", file=log)
+        plot = False
+    if plot and args.workers > 1:
+        print("[WARN] --plot is ignored with --workers > 1", file=log)
+        plot = False
+
+    tasks = [
+        {
+            "strategy": args.strategy,
+            "symbol": sym,
+            "params": params,
+            "start": args.start,
+            "end": args.end,
+            "interval": args.interval,
+            "plot": plot,
+            "verbose": args.verbose and not machine_output,
+            "store": args.store,
+            "incremental": args.incremental,
+            "profile": args.profile,
+            "profile_dir": args.profile_dir,
+        }
+        for sym in symbols
+    ]
+
+    print(
+        f"[INFO] {args.strategy}: {len(tasks)} symbol(s), interval={args.interval}, "
+        f"workers={args.workers}",
+        file=log,
+    )
+    t0 = time.perf_counter()
+    if args.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            outcomes = list(pool.map(_run_symbol, tasks))
+    else:
+        outcomes = [_run_symbol(task) for task in tasks]
+    wall = time.perf_counter() - t0
+
+    tracer = Tracer()
+    for out in outcomes:
+        tracer.merge(out["spans"], out["counters"])
+        if out["error"]:
+            print(f"[ERROR] {out['symbol']}: {out['error']}", file=log)
+
+    rows = _rows(args.strategy, args.interval, outcomes)
+
+    results = {o["symbol"]: o["result"] for o in outcomes if o["result"] is not None}
+    if args.portfolio and results:
+        portfolio = spec.build_portfolio_result(results, params, weighting=args.weighting)
+        rows.append(
+            {
+                "strategy": args.strategy,
+                "symbol": portfolio.symbol,
+                "interval": args.interval,
+                "elapsed_s": None,
+                "error": None,
+                **portfolio.stats,
+            }
+        )
+
+    if machine_output:
+        _write_output(rows, args.format, args.output)
+    else:
+        for row in rows:
+            if row["error"] is None:
+                stats = {k: v for k, v in row.items()
+                         if k not in ("strategy", "symbol", "interval", "elapsed_s", "error")}
+                print_stats(row["symbol"], stats)
+
+    print(f"[INFO] Finished in {wall:.2f}s", file=log)
+
+    if args.timings:
+        with contextlib.redirect_stdout(log):
+            tracer.print_summary()
+    if args.trace:
+        tracer.to_chrome_trace(args.trace)
+        print(f"[INFO] Wrote trace to {args.trace}", file=log)
+
+    return 1 if any(o["error"] for o in outcomes) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m system_development",
+        description="Run development strategies from the registry.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_list = sub.add_parser("list", help="List registered strategies and their params.")
+    p_list.set_defaults(func=cmd_list)
+
+    p_run = sub.add_parser("run", help="Backtest a strategy over one or more symbols.")
+    p_run.add_argument("strategy", choices=list_strategies())
+    p_run.add_argument(
+        "--symbols",
+        nargs="+",
+        default=None,
+        help="Symbols to run (default: the strategy's INDEX_SYMBOLS + FX_SYMBOLS).",
+    )
+    p_run.add_argument("--start", default="2015-01-01")
+    p_run.add_argument("--end", default=None)
+    p_run.add_argument("--interval", default="1d")
+    p_run.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parallel worker processes (one symbol per task).",
+    )
+    p_run.add_argument(
+        "--plot",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Show equity plots (single worker only). Default: --no-plot.",
+    )
+    p_run.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override a StrategyParams field; repeatable.",
+    )
+    p_run.add_argument("--params-file", default=None, help="JSON/YAML file of overrides.")
+    p_run.add_argument(
+        "--format",
+        choices=["table", "json", "csv"],
+        default="table",
+        help="Output format for stats (json/csv are machine-readable).",
+    )
+    p_run.add_argument("--output", default=None, help="Write json/csv output to a file.")
+    p_run.add_argument(
+        "--portfolio",
+        action="store_true",
+        help="Also report the portfolio of all symbols (see --weighting).",
+    )
+    p_run.add_argument(
+        "--weighting",
+        choices=["equal", "inverse_vol"],
+        default="equal",
+        help="Portfolio weighting scheme for --portfolio.",
+    )
+    p_run.add_argument(
+        "--store",
+        default=None,
+        help="ResultStore SQLite path; identical runs are loaded instead of recomputed.",
+    )
+    p_run.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Resume each symbol's stored run and simulate only new bars (needs --store).",
+    )
+    p_run.add_argument(
+        "--verbose",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Per-symbol signal counts and exit breakdown (table format only).",
+    )
+    p_run.add_argument("--timings", action="store_true", help="Print per-stage timing summary.")
+    p_run.add_argument("--trace", default=None, help="Write a Chrome trace JSON to this path.")
+    p_run.add_argument(
+        "--profile",
+        choices=["cprofile", "pyinstrument"],
+        default=None,
+        help="Capture one profile per symbol.",
+    )
+    p_run.add_argument("--profile-dir", default="profiles")
+    p_run.set_defaults(func=cmd_run)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (KeyError, ValueError, ImportError, OSError) as exc:
+        parser.exit(2, f"error: {exc}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Shared bar-by-bar trade simulation for the ATR-stop strategies.
+
+breakout_v1 and trend_pullback_v1 run the same position logic (ATR-sized
+entries on Signal, stop / fixed-RR target / trend exit, optional trailing
+stop, cash or mark-to-market equity); they differ only in the ADX level
+below which a trade is closed as a trend exit.
+
+simulate() walks NumPy columns of a prepared frame and keeps everything
+that must survive between calls in a PositionState, so a long history can
+be fed one chunk at a time and give the same trades and equity as a
+single call over the whole frame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import TradeLog
+
+# Columns simulate() reads from the prepared frame.
+KERNEL_COLUMNS = ["Close", "High", "Low", "ADX", "EMA_Slow", "ATR", "Signal"]
+
+
+@dataclass
+class PositionState:
+    """Realised equity and the open position (if any) between bars."""
+
+    equity: float
+    position: int = 0  # 0 flat, 1 long, -1 short
+    entry_price: float = 0.0
+    stop_price: float = 0.0
+    tp_price: Optional[float] = None
+    size: float = 0.0
+    entry_ts: Optional[int] = None  # ns since epoch (UTC)
+
+
+def simulate(
+    df: pd.DataFrame,
+    symbol: str,
+    params: Any,
+    adx_exit_level: float,
+    state: Optional[PositionState] = None,
+    trades: Optional[TradeLog] = None,
+) -> Tuple[np.ndarray, TradeLog, PositionState]:
+    """
+    Run the position logic over `df` (indicators + Signal, warm-up rows
+    dropped).
+
+    params          : strategy StrategyParams (stop/tp multiples, risk,
+                      exit_mode, trail_stops, equity_mode, initial_capital)
+    adx_exit_level  : close an open trade when ADX falls below this
+    state / trades  : carried over from the previous chunk; new ones are
+                      created when omitted
+
+    Returns (equity per bar, trades, state). Closed trades are appended
+    to `trades`; `state` is updated in place and also returned.
+    """
+    if state is None:
+        state = PositionState(equity=params.initial_capital)
+    if trades is None:
+        trades = TradeLog(tz=getattr(df.index, "tz", None))
+
+    n = len(df)
+    equity_out = np.empty(n)
+    if n == 0:
+        return equity_out, trades, state
+
+    index = pd.DatetimeIndex(df.index)
+    ts_values = (index.tz_convert("UTC") if index.tz is not None else index).asi8.tolist()
+    closes = df["Close"].to_numpy(dtype=float).tolist()
+    highs = df["High"].to_numpy(dtype=float).tolist()
+    lows = df["Low"].to_numpy(dtype=float).tolist()
+    adxs = df["ADX"].to_numpy(dtype=float).tolist()
+    ema_slows = df["EMA_Slow"].to_numpy(dtype=float).tolist()
+    atrs = df["ATR"].to_numpy(dtype=float).tolist()
+    signals = df["Signal"].to_numpy().astype(np.int64).tolist()
+
+    fixed_rr = params.exit_mode == "fixed_rr"
+    trailing = params.exit_mode == "trend_follow" and params.trail_stops
+    mark_to_market = params.equity_mode.lower() == "mtm"
+    stop_mult = params.stop_atr_mult
+    tp_mult = params.tp_atr_mult
+    risk = params.risk_per_trade
+
+    equity = state.equity
+    position = state.position
+    entry_price = state.entry_price
+    stop_price = state.stop_price
+    tp_price = state.tp_price
+    size = state.size
+    entry_ts = state.entry_ts
+
+    for i in range(n):
+        ts = ts_values[i]
+        close = closes[i]
+        high = highs[i]
+        low = lows[i]
+        adx = adxs[i]
+        ema_slow = ema_slows[i]
+        atr_val = atrs[i]
+
+        if position == 0:
+            # ---- FLAT: check for new entry ----
+            signal = signals[i]
+            if signal != 0 and atr_val > 0:
+                stop_distance = stop_mult * atr_val
+                size = equity * risk / stop_distance
+
+                entry_price = close
+                if signal == 1:
+                    stop_price = entry_price - stop_distance
+                    tp_price = entry_price + tp_mult * atr_val if fixed_rr else None
+                else:
+                    stop_price = entry_price + stop_distance
+                    tp_price = entry_price - tp_mult * atr_val if fixed_rr else None
+
+                position = signal
+                entry_ts = ts
+
+        else:
+            # ---- IN A TRADE: manage position ----
+            exit_price = None
+            exit_reason = None
+
+            if trailing:
+                if position == 1:
+                    stop_price = max(stop_price, close - stop_mult * atr_val)
+                else:
+                    stop_price = min(stop_price, close + stop_mult * atr_val)
+
+            if position == 1:
+                if low <= stop_price:
+                    exit_price = stop_price
+                    exit_reason = "stop"
+                elif fixed_rr and tp_price is not None and high >= tp_price:
+                    exit_price = tp_price
+                    exit_reason = "tp"
+                elif (adx < adx_exit_level) or (close < ema_slow):
+                    exit_price = close
+                    exit_reason = "trend_exit"
+            else:
+                if high >= stop_price:
+                    exit_price = stop_price
+                    exit_reason = "stop"
+                elif fixed_rr and tp_price is not None and low <= tp_price:
+                    exit_price = tp_price
+                    exit_reason = "tp"
+                elif (adx < adx_exit_level) or (close > ema_slow):
+                    exit_price = close
+                    exit_reason = "trend_exit"
+
+            if exit_price is not None:
+                pnl = (exit_price - entry_price) * size * position
+                equity += pnl  # realised PnL only
+
+                trades.append(
+                    symbol=symbol,
+                    entry_date=entry_ts,
+                    exit_date=ts,
+                    direction=position,
+                    entry_price=entry_price,
+                    exit_price=exit_price,
+                    size=size,
+                    pnl=pnl,
+                    return_pct=pnl / equity if equity != 0 else 0.0,
+                    exit_reason=exit_reason,
+                )
+
+                position = 0
+                entry_price = stop_price = 0.0
+                tp_price = None
+                size = 0.0
+                entry_ts = None
+
+        # ---- Equity for this bar (cash vs mtm) ----
+        if mark_to_market and position != 0:
+            equity_out[i] = equity + (close - entry_price) * size * position
+        else:
+            equity_out[i] = equity
+
+    state.equity = equity
+    state.position = position
+    state.entry_price = entry_price
+    state.stop_price = stop_price
+    state.tp_price = tp_price
+    state.size = size
+    state.entry_ts = entry_ts
+    return equity_out, trades, state
@@ -0,0 +1,294 @@
+"""
+SQLite store for OHLCV bars across a universe of symbols.
+
+Bars live in one long-format table keyed by (symbol_id, interval, ts):
+tickers are integer-coded through a small `symbols` table and timestamps
+are int64 ns since the epoch (UTC), so a row carries no repeated strings.
+
+    store = BarStore("bars.db")
+    store.write("^GSPC", "1h", download_price_data("^GSPC", interval="1h"))
+    df = store.read("^GSPC", "1h", start="2024-01-01", compact=True)
+    universe = store.read_many(["^GSPC", "^NDX"], "1h", compact=True)
+
+With compact=True frames come back with float32 prices, int32 volume and,
+for read_many(), a categorical 'ticker' column (see compact_ohlcv).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import PRICE_COLUMNS, VOLUME_COLUMN, compact_ohlcv
+
+_DB_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+
+
+def _to_ns(ts) -> Optional[int]:
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.value
+
+
+class BarStore:
+    """
+    Integer-coded, long-format bar storage with per-symbol range reads.
+    """
+
+    def __init__(self, db_path: str = "bars.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.row_factory = sqlite3.Row
+        self.ensure_schema()
+        self._symbol_ids: Dict[str, int] = {
+            row["symbol"]: row["id"]
+            for row in self._conn.execute("SELECT id, symbol FROM symbols")
+        }
+
+    def close(self):
+        self._conn.close()
+
+    # --- Schema --- #
+
+    def ensure_schema(self):
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS symbols (
+                id INTEGER PRIMARY KEY,
+                symbol TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol_id INTEGER NOT NULL,
+                interval TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                adj_close REAL,
+                volume INTEGER,
+                PRIMARY KEY (symbol_id, interval, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def _symbol_id(self, symbol: str, create: bool = False) -> Optional[int]:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None and create:
+            cur = self._conn.execute("INSERT INTO symbols (symbol) VALUES (?)", (symbol,))
+            sid = cur.lastrowid
+            self._symbol_ids[symbol] = sid
+        return sid
+
+    def symbols(self) -> List[str]:
+        return sorted(self._symbol_ids)
+
+    # --- Write --- #
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Insert or replace the bars of `df` (DatetimeIndex, OHLCV columns as
+        returned by download_price_data). Returns the number of rows written.
+        """
+        if df.empty:
+            return 0
+        sid = self._symbol_id(symbol, create=True)
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        n = len(df)
+        columns = [
+            df[c].to_numpy(dtype=np.float64).tolist() if c in df.columns else [None] * n
+            for c in _DB_COLUMNS
+        ]
+        volume = columns[-1]
+        columns[-1] = [None if v is None or np.isnan(v) else int(v) for v in volume]
+
+        rows = zip([sid] * n, [interval] * n, index.asi8.tolist(), *columns)
+        self._conn.executemany(
+            """
+            INSERT OR REPLACE INTO bars (
+                symbol_id, interval, ts, open, high, low, close, adj_close, volume
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        self._conn.commit()
+        return n
+
+    # --- Read --- #
+
+    def _where(
+        self,
+        symbol_ids: List[int],
+        interval: str,
+        start,
+        end,
+    ) -> Tuple[str, list]:
+        clauses = [f"symbol_id IN ({','.join('?' * len(symbol_ids))})", "interval = ?"]
+        values: list = [*symbol_ids, interval]
+        if start is not None:
+            clauses.append("ts >= ?")
+            values.append(_to_ns(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            values.append(_to_ns(end))
+        return " AND ".join(clauses), values
+
+    def _fetch(self, symbol_ids: List[int], interval: str, start, end) -> pd.DataFrame:
+        where, values = self._where(symbol_ids, interval, start, end)
+        cur = self._conn.execute(
+            f"""
+            SELECT symbol_id, ts, open, high, low, close, adj_close, volume
+            FROM bars WHERE {where}
+            ORDER BY symbol_id, ts
+            """,
+            values,
+        )
+        rows = cur.fetchall()
+        names = ["symbol_id", "ts", *_DB_COLUMNS]
+        if not rows:
+            return pd.DataFrame(columns=names)
+        return pd.DataFrame.from_records(rows, columns=names)
+
+    @staticmethod
+    def _finish(frame: pd.DataFrame, compact: bool) -> pd.DataFrame:
+        if frame[VOLUME_COLUMN].isna().all():
+            frame = frame.drop(columns=[VOLUME_COLUMN])
+        if frame["Adj Close"].isna().all():
+            frame = frame.drop(columns=["Adj Close"])
+        for col in PRICE_COLUMNS:
+            if col in frame.columns:
+                frame[col] = frame[col].astype(np.float64)
+        return compact_ohlcv(frame) if compact else frame
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start=None,
+        end=None,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Bars for one symbol in [start, end), indexed by a naive UTC
+        DatetimeIndex named 'Date' like download_price_data's output.
+        """
+        sid = self._symbol_id(symbol)
+        if sid is None:
+            raise KeyError(f"No bars stored for {symbol}")
+        raw = self._fetch([sid], interval, start, end)
+        if raw.empty:
+            raise ValueError(f"No bars stored for {symbol} with interval={interval}")
+
+        index = pd.DatetimeIndex(raw["ts"].to_numpy(dtype=np.int64).view("M8[ns]"), name="Date")
+        frame = raw.drop(columns=["symbol_id", "ts"]).set_axis(index)
+        return self._finish(frame, compact)
+
+    def iter_chunks(
+        self,
+        symbol: str,
+        interval: str,
+        start=None,
+        end=None,
+        chunk_size: int = 100_000,
+        compact: bool = False,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield the bars of read() in consecutive frames of at most
+        `chunk_size` rows, fetching each page from SQLite only when it is
+        needed (keyset pagination on ts), for engine.streaming backtests.
+        """
+        sid = self._symbol_id(symbol)
+        if sid is None:
+            raise KeyError(f"No bars stored for {symbol}")
+
+        lower = start
+        inclusive = True
+        while True:
+            where, values = self._where([sid], interval, None, end)
+            if lower is not None:
+                where += " AND ts >= ?" if inclusive else " AND ts > ?"
+                values.append(_to_ns(lower))
+            rows = self._conn.execute(
+                f"""
+                SELECT symbol_id, ts, open, high, low, close, adj_close, volume
+                FROM bars WHERE {where}
+                ORDER BY ts
+                LIMIT ?
+                """,
+                [*values, int(chunk_size)],
+            ).fetchall()
+            if not rows:
+                return
+            raw = pd.DataFrame.from_records(rows, columns=["symbol_id", "ts", *_DB_COLUMNS])
+            index = pd.DatetimeIndex(raw["ts"].to_numpy(dtype=np.int64).view("M8[ns]"), name="Date")
+            yield self._finish(raw.drop(columns=["symbol_id", "ts"]).set_axis(index), compact)
+
+            if len(rows) < chunk_size:
+                return
+            lower = int(rows[-1]["ts"])
+            inclusive = False
+
+    def read_many(
+        self,
+        symbols: Iterable[str],
+        interval: str,
+        start=None,
+        end=None,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Long-format bars for several symbols: columns 'ticker', 'date' and
+        the OHLCV columns, grouped by ticker and sorted by date within each.
+        'ticker' is categorical, so each row stores a small integer code.
+        """
+        symbols = list(symbols)
+        ids = {s: self._symbol_id(s) for s in symbols}
+        missing = [s for s, sid in ids.items() if sid is None]
+        if missing:
+            raise KeyError(f"No bars stored for {', '.join(missing)}")
+
+        raw = self._fetch(list(ids.values()), interval, start, end)
+        ticker = pd.Categorical.from_codes(
+            pd.Index([ids[s] for s in symbols]).get_indexer(raw["symbol_id"].to_numpy()),
+            categories=symbols,
+        )
+        frame = raw.drop(columns=["symbol_id", "ts"])
+        frame.insert(0, "date", raw["ts"].to_numpy(dtype=np.int64).view("M8[ns]"))
+        frame.insert(0, "ticker", ticker)
+        return self._finish(frame, compact)
+
+    def coverage(self, symbol: str, interval: str) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], int]:
+        """(first bar, last bar, number of bars) stored for symbol / interval."""
+        sid = self._symbol_id(symbol)
+        if sid is None:
+            return None, None, 0
+        row = self._conn.execute(
+            "SELECT MIN(ts) AS first, MAX(ts) AS last, COUNT(*) AS n "
+            "FROM bars WHERE symbol_id = ? AND interval = ?",
+            (sid, interval),
+        ).fetchone()
+        if not row["n"]:
+            return None, None, 0
+        return pd.Timestamp(row["first"]), pd.Timestamp(row["last"]), int(row["n"])
@@ -0,0 +1,240 @@
+"""
+Resumable backtests: keep the end state of a run and extend it with new
+bars instead of recomputing the whole history.
+
+A BacktestSnapshot holds the BacktestResult so far plus the StreamState
+(indicator state, signal tail, open position with its stop / target, and
+realised equity) after the last bar. extend_backtest() feeds only the bars
+after that point through the same streaming path, so the extended result
+is identical to a full re-run over the longer history.
+
+refresh_backtest() wraps this for nightly updates: it loads the snapshot
+for (strategy, code version, params, symbol, start, interval) from a
+ResultStore, downloads only the bars since the last one, checks that the
+last stored bar has not been revised, extends and saves the snapshot.
+update_backtest() runs it for a strategy given by its ChunkRules factory.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import download_price_data
+from .metrics import BacktestResult, TradeLog, calculate_stats
+from .result_store import ResultStore, make_lineage_key
+from .streaming import (
+    ChunkResult,
+    ChunkRulesFactory,
+    StreamState,
+    new_stream_state,
+    stream_backtest,
+)
+
+# A strategy's stream_backtest(chunks, symbol, params, state)
+StreamFn = Callable[..., Iterator[ChunkResult]]
+
+_CHECK_COLUMNS = ["Open", "High", "Low", "Close"]
+
+
+@dataclass
+class BacktestSnapshot:
+    result: BacktestResult
+    state: StreamState
+    interval: str
+
+    @property
+    def last_ts(self) -> Optional[pd.Timestamp]:
+        bar = self.state.last_bar
+        return None if bar is None else bar.name
+
+
+def _collect(
+    symbol: str,
+    previous: Optional[BacktestResult],
+    parts: Iterable[ChunkResult],
+) -> BacktestResult:
+    equity: List[pd.Series] = []
+    benchmark: List[pd.Series] = []
+    logs: List[TradeLog] = []
+    if previous is not None:
+        equity.append(previous.equity_curve)
+        if previous.benchmark_curve is not None:
+            benchmark.append(previous.benchmark_curve)
+        logs.append(previous.trades)
+
+    for part in parts:
+        equity.append(part.equity)
+        benchmark.append(part.benchmark)
+        logs.append(part.trades)
+
+    equity = [e for e in equity if len(e)]
+    benchmark = [b for b in benchmark if len(b)]
+    equity_curve = pd.concat(equity) if equity else pd.Series(dtype=float)
+    trades = TradeLog.concat(logs)
+    return BacktestResult(
+        symbol=symbol,
+        equity_curve=equity_curve,
+        trades=trades,
+        stats=calculate_stats(equity_curve, trades),
+        benchmark_curve=pd.concat(benchmark) if benchmark else None,
+    )
+
+
+def start_backtest(
+    stream_fn: StreamFn,
+    symbol: str,
+    params: Any,
+    bars: pd.DataFrame,
+    interval: str,
+) -> BacktestSnapshot:
+    """Backtest `bars` from scratch and return a resumable snapshot."""
+    state = new_stream_state(params)
+    parts = list(stream_fn([bars], symbol, params, state=state))
+    return BacktestSnapshot(result=_collect(symbol, None, parts), state=state, interval=interval)
+
+
+def extend_backtest(
+    stream_fn: StreamFn,
+    snapshot: BacktestSnapshot,
+    params: Any,
+    new_bars: pd.DataFrame,
+) -> BacktestSnapshot:
+    """
+    Continue `snapshot` with the bars of `new_bars` that come after its
+    last bar. The snapshot passed in is left untouched.
+    """
+    last_ts = snapshot.last_ts
+    if last_ts is not None:
+        new_bars = new_bars[new_bars.index > last_ts]
+    if new_bars.empty:
+        return snapshot
+
+    state = copy.deepcopy(snapshot.state)
+    symbol = snapshot.result.symbol
+    parts = list(stream_fn([new_bars], symbol, params, state=state))
+    return BacktestSnapshot(
+        result=_collect(symbol, snapshot.result, parts),
+        state=state,
+        interval=snapshot.interval,
+    )
+
+
+def last_bar_matches(snapshot: BacktestSnapshot, bars: pd.DataFrame) -> bool:
+    """
+    True if `bars` contains the snapshot's last bar with the same OHLC
+    (to 1e-9 relative), i.e. the history it was built on has not been
+    revised by the data source.
+    """
+    last = snapshot.state.last_bar
+    if last is None or last.name not in bars.index:
+        return False
+    fresh = bars.loc[last.name]
+    if isinstance(fresh, pd.DataFrame):
+        fresh = fresh.iloc[-1]
+    cols = [c for c in _CHECK_COLUMNS if c in bars.columns and c in last.index]
+    return bool(
+        np.allclose(
+            fresh[cols].to_numpy(dtype=float),
+            last[cols].to_numpy(dtype=float),
+            rtol=1e-9,
+            atol=0.0,
+        )
+    )
+
+
+def _naive(ts: Any) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def refresh_backtest(
+    stream_fn: StreamFn,
+    store: ResultStore,
+    strategy: str,
+    version: str,
+    symbol: str,
+    params: Any,
+    start: str = "2015-01-01",
+    end: str | None = None,
+    interval: str = "1d",
+    download: Callable[..., pd.DataFrame] = download_price_data,
+    verbose: bool = False,
+) -> BacktestResult:
+    """
+    Bring the stored backtest for this lineage up to date and return it.
+
+    Only bars from the day of the last stored bar onwards are downloaded.
+    If there is no snapshot yet, or the overlapping bar no longer matches
+    (e.g. a dividend adjustment changed history), the full history is
+    downloaded and recomputed.
+
+    The stored snapshot is the open-ended lineage (up to the latest bar),
+    so it is only written when `end` is None. With an `end`, the snapshot
+    is extended up to `end` if it stops before it, otherwise the range is
+    recomputed from `start`; either way the store is left untouched.
+    """
+    key = make_lineage_key(strategy, version, params, symbol, start, interval)
+    snapshot = store.get_snapshot(key)
+    persist = end is None
+
+    if snapshot is not None and snapshot.last_ts is not None and not persist:
+        if _naive(end) <= _naive(snapshot.last_ts):
+            snapshot = None  # the stored run goes past `end`: recompute the range
+
+    if snapshot is not None and snapshot.last_ts is not None:
+        since = _naive(snapshot.last_ts)
+        recent = download(symbol, start=since.normalize(), end=end, interval=interval)
+        if last_bar_matches(snapshot, recent):
+            before = snapshot.state.bars
+            snapshot = extend_backtest(stream_fn, snapshot, params, recent)
+            if verbose:
+                print(
+                    f"[INFO] {symbol}: resumed after {since}, "
+                    f"{snapshot.state.bars - before} new bar(s)"
+                )
+            if persist:
+                store.put_snapshot(key, snapshot, strategy=strategy, version=version)
+            return snapshot.result
+        if verbose:
+            print(f"[INFO] {symbol}: stored history was revised; recomputing")
+
+    bars = download(symbol, start=start, end=end, interval=interval)
+    snapshot = start_backtest(stream_fn, symbol, params, bars, interval)
+    if persist:
+        store.put_snapshot(key, snapshot, strategy=strategy, version=version)
+    if verbose:
+        print(f"[INFO] {symbol}: full backtest over {len(bars)} bars")
+    return snapshot.result
+
+
+def update_backtest(
+    chunk_rules: ChunkRulesFactory,
+    store: ResultStore,
+    strategy: str,
+    version: str,
+    symbol: str,
+    params: Any,
+    start: str = "2015-01-01",
+    end: str | None = None,
+    interval: str = "1d",
+    verbose: bool = False,
+) -> BacktestResult:
+    """refresh_backtest() over stream_backtest() with `chunk_rules`."""
+    return refresh_backtest(
+        partial(stream_backtest, chunk_rules),
+        store,
+        strategy,
+        version,
+        symbol,
+        params,
+        start=start,
+        end=end,
+        interval=interval,
+        verbose=verbose,
+    )
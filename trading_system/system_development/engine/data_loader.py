@@ -1,12 +1,19 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from datetime import timedelta
+from typing import Sequence
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+VOLUME_COLUMN = "Volume"
 
 
 def _normalise_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Ensure OHLCV columns are simple string names, even if yfinance returns
     tuples or a MultiIndex.
+
+    The columns are renamed on `df` itself (only the labels change, so no
+    data is copied); `df` must be a frame the caller owns.
     """
     cols = []
 
@@ -17,11 +24,80 @@ def _normalise_columns(df: pd.DataFrame) -> pd.DataFrame:
             c = c[0]
         cols.append(str(c))
 
-    df = df.copy()
     df.columns = cols
     return df
 
 
+def _fits_float32(values: np.ndarray, max_decimals: int) -> bool:
+    """
+    True if float32 loses nothing: every finite value round-trips exactly
+    (e.g. quotes that came from a float32 source), or they are all quoted
+    in at most `max_decimals` decimal places and float32 stays within half
+    a tick of each, so rounding back to that many decimals recovers it.
+    """
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return True
+    if np.abs(finite).max() > np.finfo(np.float32).max:
+        return False
+    back = finite.astype(np.float32).astype(np.float64)
+    if np.array_equal(back, finite):
+        return True
+    for decimals in range(max_decimals + 1):
+        if np.array_equal(np.round(finite, decimals), finite):
+            return bool(np.all(np.abs(back - finite) < 0.5 * 10.0 ** -decimals))
+    return False
+
+
+def _fits_int32(values: np.ndarray) -> bool:
+    if values.size == 0:
+        return True
+    if values.dtype.kind == "f":
+        if np.isnan(values).any() or not np.array_equal(values, np.round(values)):
+            return False
+    info = np.iinfo(np.int32)
+    return bool(values.min() >= info.min and values.max() <= info.max)
+
+
+def compact_ohlcv(
+    df: pd.DataFrame,
+    max_decimals: int = 6,
+    price_columns: Sequence[str] = PRICE_COLUMNS,
+    volume_column: str = VOLUME_COLUMN,
+) -> pd.DataFrame:
+    """
+    Downcast an OHLCV frame to roughly half its memory.
+
+    - price columns become float32 only when no quote changes: the values
+      round-trip exactly, or they have at most `max_decimals` decimals and
+      float32 is accurate to half a tick at their magnitude (0.01 ticks up
+      to ~65k, 1e-5 FX quotes up to ~64). Adjusted prices with arbitrary
+      decimals stay float64
+    - Volume becomes int32 when it is whole-numbered and fits, else it is
+      left as is
+    - a 'ticker' / 'Ticker' / 'symbol' column of strings becomes categorical
+
+    price_columns / volume_column name the columns for frames that do not
+    use yfinance's names.
+
+    The indicator functions convert to float64 before accumulating, so
+    compact frames can be passed straight to prepare_dataframe.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in price_columns and s.dtype == np.float64:
+            if _fits_float32(s.to_numpy(), max_decimals):
+                s = s.astype(np.float32)
+        elif col == volume_column and s.dtype.kind in "if":
+            if _fits_int32(s.to_numpy()):
+                s = s.astype(np.int32)
+        elif col in ("ticker", "Ticker", "symbol") and s.dtype == object:
+            s = s.astype("category")
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
 def _max_chunk_days_for_interval(interval: str) -> int | None:
     """
     Return the maximum number of days Yahoo reliably supports in a single
@@ -43,6 +119,8 @@ def download_price_data(
     start: str = "2015-01-01",
     end: str | None = None,
     interval: str = "1d",
+    compact: bool = False,
+    timeout: float = 30.0,
 ) -> pd.DataFrame:
     """
     Download OHLCV data for a symbol using yfinance, with automatic
@@ -59,6 +137,10 @@ def download_price_data(
         End date. If None, uses today's date.
     interval : str
         Bar interval (e.g. '1d', '1h', '4h').
+    compact : bool
+        If True, return float32 prices / int32 volume (see compact_ohlcv).
+    timeout : float
+        Seconds to wait for each yfinance request before giving up.
 
     Returns
     -------
@@ -66,6 +148,10 @@ def download_price_data(
         DataFrame indexed by datetime with columns:
         ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'].
     """
+    # Imported here so that code paths which never download (registry
+    # listing, cached / synthetic runs, worker start-up) don't pay for it.
+    import yfinance as yf
+
     start_dt = pd.to_datetime(start)
     end_dt = pd.to_datetime(end) if end is not None else pd.Timestamp.today()
 
@@ -81,6 +167,7 @@ def download_price_data(
             auto_adjust=False,
             progress=False,
             group_by="column",
+            timeout=timeout,
         )
     else:
         # Chunk the request into smaller date ranges
@@ -99,6 +186,7 @@ def download_price_data(
                 auto_adjust=False,
                 progress=False,
                 group_by="column",
+                timeout=timeout,
             )
 
             if not df_chunk.empty:
@@ -129,5 +217,8 @@ def download_price_data(
     existing = [c for c in wanted if c in df.columns]
     df = df[existing]
 
-    df = df.dropna()
+    if df.isna().to_numpy().any():
+        df = df.dropna()
+    if compact:
+        df = compact_ohlcv(df)
     return df
\ No newline at end of file
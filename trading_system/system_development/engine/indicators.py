@@ -1,34 +1,166 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
 
-def ema(series: pd.Series, period: int) -> pd.Series:
-    return series.ewm(span=period, adjust=False).mean()
+def _as_float64(series: pd.Series) -> pd.Series:
+    """
+    Indicators accumulate in float64 even when the input bars are compact
+    (float32) frames; differences / ranges are taken after upcasting.
+    """
+    if series.dtype == np.float64:
+        return series
+    return series.astype(np.float64)
+
+
+# --- Streaming state --- #
+#
+# Every indicator below can be run over consecutive chunks of one series by
+# passing the same state object on each call. The state holds what the
+# next chunk needs from the previous one: the last raw values (for diff /
+# true range) and, for each exponential average, its last value plus the
+# number of NaN inputs seen since. Continuing an EWM from that state gives
+# exactly the values a single pass over the whole series would.
+
+
+@dataclass
+class EwmState:
+    value: float = np.nan  # last smoothed value (NaN until the first observation)
+    trailing_nans: int = 0  # NaN inputs since the last observation
+
+
+@dataclass
+class RsiState:
+    prev_close: Optional[float] = None
+    gain: EwmState = field(default_factory=EwmState)
+    loss: EwmState = field(default_factory=EwmState)
+
+
+@dataclass
+class AtrState:
+    prev_close: Optional[float] = None
+    tr: EwmState = field(default_factory=EwmState)
+
 
+@dataclass
+class AdxState:
+    prev_high: Optional[float] = None
+    prev_low: Optional[float] = None
+    prev_close: Optional[float] = None
+    tr: EwmState = field(default_factory=EwmState)
+    plus_dm: EwmState = field(default_factory=EwmState)
+    minus_dm: EwmState = field(default_factory=EwmState)
+    dx: EwmState = field(default_factory=EwmState)
 
-def rsi(series: pd.Series, period: int = 14) -> pd.Series:
+
+@dataclass
+class CoreIndicatorState:
+    """State for add_core_indicators(); one per symbol stream."""
+
+    prev_close: Optional[float] = None
+    ema_fast: EwmState = field(default_factory=EwmState)
+    ema_slow: EwmState = field(default_factory=EwmState)
+    rsi: RsiState = field(default_factory=RsiState)
+    atr: AtrState = field(default_factory=AtrState)
+    adx: AdxState = field(default_factory=AdxState)
+
+
+def _ewm_mean(series: pd.Series, state: Optional[EwmState] = None, **ewm_kwargs) -> pd.Series:
+    """
+    series.ewm(adjust=False, **ewm_kwargs).mean(), continued from `state`.
+
+    The previous chunk is stood in for by its last smoothed value followed
+    by its trailing NaNs: with adjust=False that reproduces both the seed
+    and the decay of the old weight, so the result matches one pass over
+    the concatenated series.
+    """
+    if state is None:
+        return series.ewm(adjust=False, **ewm_kwargs).mean()
+
+    if np.isnan(state.value):
+        out = series.ewm(adjust=False, **ewm_kwargs).mean()
+    else:
+        seed = np.full(1 + state.trailing_nans, np.nan)
+        seed[0] = state.value
+        values = np.concatenate([seed, series.to_numpy(dtype=np.float64)])
+        smoothed = pd.Series(values).ewm(adjust=False, **ewm_kwargs).mean().to_numpy()
+        out = pd.Series(smoothed[seed.size:], index=series.index)
+
+    observed = np.flatnonzero(~np.isnan(series.to_numpy(dtype=np.float64)))
+    if observed.size:
+        state.value = float(out.iloc[-1])
+        state.trailing_nans = len(series) - 1 - int(observed[-1])
+    elif not np.isnan(state.value):
+        state.trailing_nans += len(series)
+    return out
+
+
+def _diff(series: pd.Series, prev: Optional[float]) -> pd.Series:
+    """series.diff(), with the first difference taken against `prev`."""
+    out = series.diff()
+    if prev is not None and len(out):
+        out.iloc[0] = series.iloc[0] - prev
+    return out
+
+
+def _last(series: pd.Series, prev: Optional[float]) -> Optional[float]:
+    return float(series.iloc[-1]) if len(series) else prev
+
+
+# --- Indicators --- #
+
+
+def ema(series: pd.Series, period: int, state: Optional[EwmState] = None) -> pd.Series:
+    return _ewm_mean(_as_float64(series), state, span=period)
+
+
+def rsi(series: pd.Series, period: int = 14, state: Optional[RsiState] = None) -> pd.Series:
     """
     Wilder-style RSI.
     """
-    delta = series.diff()
+    series = _as_float64(series)
+    delta = _diff(series, state.prev_close if state else None)
     gain = delta.clip(lower=0.0)
     loss = -delta.clip(upper=0.0)
 
-    avg_gain = gain.ewm(alpha=1 / period, adjust=False).mean()
-    avg_loss = loss.ewm(alpha=1 / period, adjust=False).mean()
+    avg_gain = _ewm_mean(gain, state.gain if state else None, alpha=1 / period)
+    avg_loss = _ewm_mean(loss, state.loss if state else None, alpha=1 / period)
+    if state is not None:
+        state.prev_close = _last(series, state.prev_close)
 
     rs = avg_gain / avg_loss.replace(0, np.nan)
     rsi_series = 100 - (100 / (1 + rs))
     return rsi_series
 
 
-def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
-    prev_close = close.shift(1)
-    tr1 = high - low
-    tr2 = (high - prev_close).abs()
-    tr3 = (low - prev_close).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    return tr
+def true_range(
+    high: pd.Series,
+    low: pd.Series,
+    close: pd.Series,
+    prev_close: Optional[float] = None,
+) -> pd.Series:
+    """
+    True range. `prev_close` is the close before the first bar (when
+    continuing a stream); without it the first bar's range is High - Low.
+    """
+    h = high.to_numpy(dtype=float)
+    l = low.to_numpy(dtype=float)
+    c = close.to_numpy(dtype=float)
+    prev = np.empty_like(c)
+    if prev.size:
+        prev[0] = np.nan if prev_close is None else prev_close
+        prev[1:] = c[:-1]
+
+    # Row-wise max of the three ranges, skipping NaN (first bar has no
+    # previous close), without concatenating them into a frame.
+    tr = h - l
+    np.fmax(tr, np.abs(h - prev), out=tr)
+    np.fmax(tr, np.abs(l - prev), out=tr)
+    return pd.Series(tr, index=high.index)
 
 
 def atr(
@@ -36,9 +168,18 @@ def atr(
     low: pd.Series,
     close: pd.Series,
     period: int = 14,
+    tr: pd.Series | None = None,
+    state: Optional[AtrState] = None,
 ) -> pd.Series:
-    tr = true_range(high, low, close)
-    atr_series = tr.ewm(alpha=1 / period, adjust=False).mean()
+    """
+    Wilder ATR. Pass a precomputed true range as `tr` to avoid
+    recomputing it when ADX is calculated on the same bars.
+    """
+    if tr is None:
+        tr = true_range(high, low, close, state.prev_close if state else None)
+    atr_series = _ewm_mean(tr, state.tr if state else None, alpha=1 / period)
+    if state is not None:
+        state.prev_close = _last(_as_float64(close), state.prev_close)
     return atr_series
 
 
@@ -47,12 +188,16 @@ def adx(
     low: pd.Series,
     close: pd.Series,
     period: int = 14,
+    tr: pd.Series | None = None,
+    state: Optional[AdxState] = None,
 ) -> pd.Series:
     """
     Welles Wilder ADX implementation.
     """
-    up_move = high.diff()
-    down_move = -low.diff()
+    high = _as_float64(high)
+    low = _as_float64(low)
+    up_move = _diff(high, state.prev_high if state else None)
+    down_move = -_diff(low, state.prev_low if state else None)
 
     plus_dm = np.where(
         (up_move > down_move) & (up_move > 0),
@@ -68,16 +213,23 @@ def adx(
     plus_dm = pd.Series(plus_dm, index=high.index)
     minus_dm = pd.Series(minus_dm, index=high.index)
 
-    tr = true_range(high, low, close)
+    if tr is None:
+        tr = true_range(high, low, close, state.prev_close if state else None)
 
-    atr_tr = tr.ewm(alpha=1 / period, adjust=False).mean()
-    plus_di = 100 * (plus_dm.ewm(alpha=1 / period, adjust=False).mean() / atr_tr)
-    minus_di = 100 * (minus_dm.ewm(alpha=1 / period, adjust=False).mean() / atr_tr)
+    alpha = 1 / period
+    atr_tr = _ewm_mean(tr, state.tr if state else None, alpha=alpha)
+    plus_di = 100 * (_ewm_mean(plus_dm, state.plus_dm if state else None, alpha=alpha) / atr_tr)
+    minus_di = 100 * (_ewm_mean(minus_dm, state.minus_dm if state else None, alpha=alpha) / atr_tr)
 
     dx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di).abs()).replace(
         [np.inf, -np.inf], np.nan
     )
-    adx_series = dx.ewm(alpha=1 / period, adjust=False).mean()
+    adx_series = _ewm_mean(dx, state.dx if state else None, alpha=alpha)
+
+    if state is not None:
+        state.prev_high = _last(high, state.prev_high)
+        state.prev_low = _last(low, state.prev_low)
+        state.prev_close = _last(_as_float64(close), state.prev_close)
     return adx_series
 
 
@@ -88,14 +240,43 @@ def add_core_indicators(
     rsi_period: int = 5,
     atr_period: int = 14,
     adx_period: int = 20,
+    inplace: bool = False,
+    state: Optional[CoreIndicatorState] = None,
 ) -> pd.DataFrame:
     """
     Add EMA20, EMA50, RSI, ATR, ADX to a price DataFrame.
+
+    With inplace=True the columns are written into `df` itself and `df` is
+    returned, instead of into a copy of the whole frame.
+
+    Pass a CoreIndicatorState to process a long history in consecutive
+    chunks: each call continues from where the previous chunk ended.
     """
-    df = df.copy()
-    df["EMA_Fast"] = ema(df["Close"], ema_fast)
-    df["EMA_Slow"] = ema(df["Close"], ema_slow)
-    df["RSI"] = rsi(df["Close"], rsi_period)
-    df["ATR"] = atr(df["High"], df["Low"], df["Close"], atr_period)
-    df["ADX"] = adx(df["High"], df["Low"], df["Close"], adx_period)
+    if not inplace:
+        df = df.copy()
+    high, low, close = df["High"], df["Low"], df["Close"]
+    tr = true_range(high, low, close, state.prev_close if state else None)
+    df["EMA_Fast"] = ema(close, ema_fast, state.ema_fast if state else None)
+    df["EMA_Slow"] = ema(close, ema_slow, state.ema_slow if state else None)
+    df["RSI"] = rsi(close, rsi_period, state.rsi if state else None)
+    df["ATR"] = atr(high, low, close, atr_period, tr=tr, state=state.atr if state else None)
+    df["ADX"] = adx(high, low, close, adx_period, tr=tr, state=state.adx if state else None)
+    if state is not None:
+        state.prev_close = _last(_as_float64(close), state.prev_close)
     return df
+
+
+def drop_warmup(df: pd.DataFrame, subset: list[str]) -> pd.DataFrame:
+    """
+    Drop the leading rows where any of `subset` is still NaN (indicator
+    warm-up).
+
+    When the NaNs are confined to that leading block, which is the normal
+    case for the recursive indicators above, the result is a row slice of
+    `df` rather than a filtered copy. Otherwise falls back to dropna().
+    """
+    valid = df[subset].notna().to_numpy().all(axis=1)
+    first = int(valid.argmax()) if valid.any() else len(valid)
+    if valid[first:].all():
+        return df.iloc[first:]
+    return df.dropna(subset=subset)
@@ -0,0 +1,284 @@
+"""
+Lightweight instrumentation for the backtest pipeline.
+
+Stages are wrapped in context-manager spans:
+
+    tracer = get_tracer()
+    with tracer.span("prepare_dataframe", symbol=symbol) as span:
+        df = prepare_dataframe(raw, params)
+        span.count("bars", len(df))
+
+By default get_tracer() returns a no-op tracer, so instrumented code costs
+next to nothing. Install a real one for a run with:
+
+    with tracing(Tracer(profile="cprofile")) as tracer:
+        run_backtest_for_default_universe(...)
+    tracer.print_summary()
+    tracer.to_chrome_trace("trace.json")   # open in chrome://tracing / Perfetto
+
+With profile="cprofile" or "pyinstrument", tracer.profile(symbol) captures
+a per-symbol profile into profile_dir.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    start_ns: int
+    end_ns: int
+    pid: int
+    tid: int
+    tags: Dict[str, Any] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class Span:
+    """Handle yielded by Tracer.span(); lets the stage record counters."""
+
+    def __init__(self, record: SpanRecord):
+        self._record = record
+
+    def count(self, name: str, value: float = 1) -> None:
+        self._record.counters[name] = self._record.counters.get(name, 0) + value
+
+
+class _NullSpan:
+    def count(self, name: str, value: float = 1) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Default tracer: every call is a no-op."""
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name: str, **tags: Any) -> Iterator[_NullSpan]:
+        yield _NULL_SPAN
+
+    @contextmanager
+    def profile(self, symbol: str) -> Iterator[None]:
+        yield
+
+    def count(self, name: str, value: float = 1) -> None:
+        pass
+
+
+class Tracer:
+    """
+    Collects timed spans and counters.
+
+    profile : None, "cprofile" or "pyinstrument"
+        Opt-in per-symbol profiling used by Tracer.profile().
+    profile_dir : str
+        Where per-symbol profiles are written.
+    """
+
+    enabled = True
+
+    def __init__(self, profile: Optional[str] = None, profile_dir: str = "profiles"):
+        if profile not in (None, "cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profile mode: {profile}")
+        self.profile_mode = profile
+        self.profile_dir = profile_dir
+        self.records: List[SpanRecord] = []
+        self.counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    # --- Recording --- #
+
+    @contextmanager
+    def span(self, name: str, **tags: Any) -> Iterator[Span]:
+        record = SpanRecord(
+            name=name,
+            start_ns=time.perf_counter_ns(),
+            end_ns=0,
+            pid=os.getpid(),
+            tid=threading.get_ident(),
+            tags=tags,
+        )
+        try:
+            yield Span(record)
+        finally:
+            record.end_ns = time.perf_counter_ns()
+            with self._lock:
+                self.records.append(record)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def merge(self, records: List[SpanRecord], counters: Optional[Dict[str, float]] = None) -> None:
+        """Add spans / counters collected elsewhere (e.g. in a worker process)."""
+        with self._lock:
+            self.records.extend(records)
+            for k, v in (counters or {}).items():
+                self.counters[k] += v
+
+    # --- Profiling --- #
+
+    @contextmanager
+    def profile(self, symbol: str) -> Iterator[None]:
+        """
+        Capture a cProfile / pyinstrument profile of the enclosed block
+        into profile_dir/<symbol>.prof (or .html). No-op unless the tracer
+        was created with a profile mode.
+        """
+        if self.profile_mode is None:
+            yield
+            return
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stem = os.path.join(self.profile_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", symbol))
+
+        if self.profile_mode == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(stem + ".prof")
+        else:
+            try:
+                from pyinstrument import Profiler
+            except ImportError as exc:
+                raise ImportError(
+                    "profile='pyinstrument' needs the pyinstrument package "
+                    "(pip install pyinstrument)"
+                ) from exc
+
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(stem + ".html", "w") as fh:
+                    fh.write(profiler.output_html())
+
+    # --- Output --- #
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per span name: calls, total / mean / max seconds, share of
+        traced wall time and the summed counters of that stage.
+        """
+        if not self.records:
+            return pd.DataFrame()
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for rec in self.records:
+            row = rows.setdefault(
+                rec.name, {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+            )
+            d = rec.duration_s
+            row["calls"] += 1
+            row["total_s"] += d
+            row["max_s"] = max(row["max_s"], d)
+            for k, v in rec.counters.items():
+                row[k] = row.get(k, 0) + v
+
+        wall_s = (
+            max(r.end_ns for r in self.records) - min(r.start_ns for r in self.records)
+        ) / 1e9
+
+        table = pd.DataFrame.from_dict(rows, orient="index")
+        table["mean_s"] = table["total_s"] / table["calls"]
+        table["pct_wall"] = 100 * table["total_s"] / wall_s if wall_s > 0 else 0.0
+        first = ["calls", "total_s", "mean_s", "max_s", "pct_wall"]
+        table = table[first + [c for c in table.columns if c not in first]]
+        return table.sort_values("total_s", ascending=False)
+
+    def print_summary(self) -> None:
+        table = self.summary()
+        print("\n=== Pipeline timing summary ===")
+        if table.empty:
+            print("(no spans recorded)")
+            return
+        print(f"{'stage':28s} {'calls':>6s} {'total s':>10s} {'mean ms':>10s} "
+              f"{'max ms':>10s} {'% wall':>7s}")
+        extra = [c for c in table.columns if c not in ("calls", "total_s", "mean_s", "max_s", "pct_wall")]
+        for name, row in table.iterrows():
+            counters = "  ".join(
+                f"{c}={row[c]:.0f}" for c in extra if pd.notna(row[c])
+            )
+            print(
+                f"{name:28s} {int(row['calls']):6d} {row['total_s']:10.3f} "
+                f"{row['mean_s'] * 1e3:10.2f} {row['max_s'] * 1e3:10.2f} "
+                f"{row['pct_wall']:6.1f}%  {counters}"
+            )
+        for k, v in sorted(self.counters.items()):
+            print(f"{k:28s} {v:10.0f}")
+
+    def to_chrome_trace(self, path: str) -> None:
+        """
+        Write spans in Chrome trace-event format ("X" complete events),
+        loadable in chrome://tracing, Perfetto or speedscope.
+        """
+        events = []
+        for rec in self.records:
+            args = {k: (v if isinstance(v, (int, float, str, bool)) else str(v))
+                    for k, v in rec.tags.items()}
+            args.update(rec.counters)
+            events.append(
+                {
+                    "name": rec.name,
+                    "ph": "X",
+                    "ts": (rec.start_ns - self._origin_ns) / 1e3,
+                    "dur": (rec.end_ns - rec.start_ns) / 1e3,
+                    "pid": rec.pid,
+                    "tid": rec.tid,
+                    "args": args,
+                }
+            )
+        with open(path, "w") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+
+
+_current: Tracer | NullTracer = NullTracer()
+
+
+def get_tracer() -> Tracer | NullTracer:
+    return _current
+
+
+def set_tracer(tracer: Tracer | NullTracer | None) -> None:
+    global _current
+    _current = tracer if tracer is not None else NullTracer()
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer] = None) -> Iterator[Tracer]:
+    """Install `tracer` (or a fresh Tracer) for the duration of the block."""
+    previous = _current
+    tracer = tracer if tracer is not None else Tracer()
+    set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -19,15 +19,329 @@ class Trade:
     exit_reason: str
 
 
+# One row per closed trade. Symbols and exit reasons are stored as small
+# integer codes into the log's own category lists; timestamps as int64 ns.
+TRADE_DTYPE = np.dtype(
+    [
+        ("symbol", np.int32),
+        ("entry_ts", np.int64),
+        ("exit_ts", np.int64),
+        ("direction", np.int8),
+        ("entry_price", np.float64),
+        ("exit_price", np.float64),
+        ("size", np.float64),
+        ("pnl", np.float64),
+        ("return_pct", np.float64),
+        ("exit_reason", np.int16),
+    ]
+)
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _ts_value(ts) -> int:
+    if ts is None:
+        return _NAT
+    return pd.Timestamp(ts).value
+
+
+class TradeLog:
+    """
+    Columnar, append-only log of closed trades backed by a NumPy structured
+    array (TRADE_DTYPE).
+
+    append() is O(1) amortised (capacity doubles when full), column access
+    (log.pnl, log.exit_reason_codes, ...) returns array views without
+    building Python objects, and group_counts() / group_mean() aggregate
+    by exit reason, symbol or direction with np.bincount.
+
+    Iterating or indexing still yields Trade objects (slicing a list of
+    them), so code written against a list of Trade keeps working.
+    """
+
+    def __init__(self, capacity: int = 64, tz=None):
+        self._data = np.empty(max(int(capacity), 1), dtype=TRADE_DTYPE)
+        self._n = 0
+        self.symbols: List[str] = []
+        self.exit_reasons: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+        self._reason_codes: Dict[str, int] = {}
+        self.tz = tz
+
+    # --- Building --- #
+
+    @staticmethod
+    def _code(value: str, table: List[str], codes: Dict[str, int]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = len(table)
+            table.append(value)
+            codes[value] = code
+        return code
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._n + extra
+        if needed <= len(self._data):
+            return
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=TRADE_DTYPE)
+        grown[: self._n] = self._data[: self._n]
+        self._data = grown
+
+    def append(
+        self,
+        symbol: str,
+        entry_date,
+        exit_date,
+        direction: int,
+        entry_price: float,
+        exit_price: float,
+        size: float,
+        pnl: float,
+        return_pct: float,
+        exit_reason: str,
+    ) -> None:
+        if self._n == len(self._data):
+            self._reserve(1)
+        if self.tz is None and exit_date is not None:
+            self.tz = getattr(exit_date, "tzinfo", None)
+        self._data[self._n] = (
+            self._code(symbol, self.symbols, self._symbol_codes),
+            _ts_value(entry_date),
+            _ts_value(exit_date),
+            direction,
+            entry_price,
+            exit_price,
+            size,
+            pnl,
+            return_pct,
+            self._code(exit_reason, self.exit_reasons, self._reason_codes),
+        )
+        self._n += 1
+
+    def add(self, trade: Trade) -> None:
+        self.append(
+            trade.symbol,
+            trade.entry_date,
+            trade.exit_date,
+            trade.direction,
+            trade.entry_price,
+            trade.exit_price,
+            trade.size,
+            trade.pnl,
+            trade.return_pct,
+            trade.exit_reason,
+        )
+
+    def extend(self, other: "TradeLog") -> None:
+        """Append all rows of another log, remapping its category codes."""
+        n = len(other)
+        if n == 0:
+            return
+        self._reserve(n)
+        rows = other.data.copy()
+        sym_map = np.array(
+            [self._code(s, self.symbols, self._symbol_codes) for s in other.symbols],
+            dtype=np.int32,
+        )
+        reason_map = np.array(
+            [self._code(r, self.exit_reasons, self._reason_codes) for r in other.exit_reasons],
+            dtype=np.int16,
+        )
+        rows["symbol"] = sym_map[rows["symbol"]]
+        rows["exit_reason"] = reason_map[rows["exit_reason"]]
+        self._data[self._n : self._n + n] = rows
+        self._n += n
+        if self.tz is None:
+            self.tz = other.tz
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> "TradeLog":
+        if isinstance(trades, TradeLog):
+            return trades
+        trades = list(trades)
+        log = cls(capacity=len(trades))
+        for t in trades:
+            log.add(t)
+        return log
+
+    @classmethod
+    def concat(cls, logs: Iterable["TradeLog"]) -> "TradeLog":
+        logs = [cls.from_trades(log) for log in logs]
+        out = cls(capacity=sum(len(log) for log in logs))
+        for log in logs:
+            out.extend(log)
+        return out
+
+    # --- Columns --- #
+
+    @property
+    def data(self) -> np.ndarray:
+        """Structured array view of the filled rows."""
+        return self._data[: self._n]
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return self.data["pnl"]
+
+    @property
+    def return_pct(self) -> np.ndarray:
+        return self.data["return_pct"]
+
+    @property
+    def direction(self) -> np.ndarray:
+        return self.data["direction"]
+
+    @property
+    def exit_reason_codes(self) -> np.ndarray:
+        return self.data["exit_reason"]
+
+    @property
+    def symbol_codes(self) -> np.ndarray:
+        return self.data["symbol"]
+
+    @property
+    def entry_ts(self) -> np.ndarray:
+        return self.data["entry_ts"]
+
+    @property
+    def exit_ts(self) -> np.ndarray:
+        return self.data["exit_ts"]
+
+    def holding_days(self) -> np.ndarray:
+        return (self.exit_ts - self.entry_ts) / 86_400e9
+
+    # --- Group-by helpers --- #
+
+    def _keys(self, by: str) -> Tuple[np.ndarray, List]:
+        if by == "exit_reason":
+            return self.exit_reason_codes.astype(np.intp), self.exit_reasons
+        if by == "symbol":
+            return self.symbol_codes.astype(np.intp), self.symbols
+        if by == "direction":
+            # -1 / 1 -> 0 / 2 so bincount indices are non-negative
+            return (self.direction.astype(np.intp) + 1), [-1, 0, 1]
+        raise ValueError(f"Unknown group key: {by}")
+
+    def group_counts(self, by: str = "exit_reason") -> Dict:
+        codes, labels = self._keys(by)
+        counts = np.bincount(codes, minlength=len(labels))
+        return {labels[i]: int(c) for i, c in enumerate(counts) if c > 0}
+
+    def group_sum(self, values: np.ndarray, by: str = "exit_reason") -> Dict:
+        codes, labels = self._keys(by)
+        counts = np.bincount(codes, minlength=len(labels))
+        sums = np.bincount(codes, weights=values, minlength=len(labels))
+        return {labels[i]: float(sums[i]) for i in range(len(labels)) if counts[i] > 0}
+
+    def group_mean(self, values: np.ndarray, by: str = "exit_reason") -> Dict:
+        """{label: (count, mean of values)} for every group present."""
+        codes, labels = self._keys(by)
+        counts = np.bincount(codes, minlength=len(labels))
+        sums = np.bincount(codes, weights=values, minlength=len(labels))
+        return {
+            labels[i]: (int(counts[i]), float(sums[i] / counts[i]))
+            for i in range(len(labels))
+            if counts[i] > 0
+        }
+
+    # --- Row access / compatibility --- #
+
+    def _timestamp(self, value: int):
+        if value == _NAT:
+            return None
+        ts = pd.Timestamp(value)
+        return ts.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else ts
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __bool__(self) -> bool:
+        return self._n > 0
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Trade, List[Trade]]:
+        # Slices return a list of Trade, as slicing the old List[Trade] did
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("TradeLog index out of range")
+        row = self._data[i]
+        return Trade(
+            symbol=self.symbols[row["symbol"]],
+            entry_date=self._timestamp(int(row["entry_ts"])),
+            exit_date=self._timestamp(int(row["exit_ts"])),
+            direction=int(row["direction"]),
+            entry_price=float(row["entry_price"]),
+            exit_price=float(row["exit_price"]),
+            size=float(row["size"]),
+            pnl=float(row["pnl"]),
+            return_pct=float(row["return_pct"]),
+            exit_reason=self.exit_reasons[row["exit_reason"]],
+        )
+
+    def __iter__(self) -> Iterator[Trade]:
+        for i in range(self._n):
+            yield self[i]
+
+    def to_frame(self) -> pd.DataFrame:
+        data = self.data
+        # _NAT is numpy's NaT bit pattern, so missing times come back as NaT
+        entry = pd.DatetimeIndex(data["entry_ts"].view("M8[ns]"))
+        exit_ = pd.DatetimeIndex(data["exit_ts"].view("M8[ns]"))
+        if self.tz is not None:
+            entry = entry.tz_localize("UTC").tz_convert(self.tz)
+            exit_ = exit_.tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame(
+            {
+                "symbol": pd.Categorical.from_codes(data["symbol"], self.symbols),
+                "entry_date": entry,
+                "exit_date": exit_,
+                "direction": data["direction"],
+                "entry_price": data["entry_price"],
+                "exit_price": data["exit_price"],
+                "size": data["size"],
+                "pnl": data["pnl"],
+                "return_pct": data["return_pct"],
+                "exit_reason": pd.Categorical.from_codes(data["exit_reason"], self.exit_reasons),
+            }
+        )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_data"] = self.data.copy()  # drop unused capacity
+        return state
+
+
 @dataclass
 class BacktestResult:
     symbol: str
     equity_curve: pd.Series
-    trades: List[Trade]
+    trades: TradeLog
     stats: Dict[str, float]
     benchmark_curve: pd.Series | None = None
 
 
+def _periods_per_year(index_ns: np.ndarray | None) -> float:
+    """Bars per year inferred from the median spacing of int64 ns timestamps."""
+    if index_ns is None or len(index_ns) < 2:
+        return 252.0
+    median_days = float(np.median(np.diff(index_ns))) / 86400e9
+    if median_days <= 0 or np.isnan(median_days):
+        return 252.0
+    return 252.0 / median_days
+
+
+def _index_ns(equity_curve: pd.Series) -> np.ndarray | None:
+    index = equity_curve.index
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8
+    return None
+
+
 def _annualised_sharpe(equity_curve: pd.Series) -> float:
     """
     Compute an annualised Sharpe ratio from an equity curve.
@@ -37,42 +351,167 @@ def _annualised_sharpe(equity_curve: pd.Series) -> float:
     """
     if equity_curve is None or len(equity_curve) < 3:
         return 0.0
+    values = equity_curve.to_numpy(dtype=float)
+    returns = values[1:] / values[:-1] - 1.0
+    returns = returns[~np.isnan(returns)]
+    if returns.size < 2:
+        return 0.0
+    std = returns.std(ddof=1)
+    if std == 0 or np.isnan(std):
+        return 0.0
+    return float(returns.mean() / std * np.sqrt(_periods_per_year(_index_ns(equity_curve))))
 
-    returns = equity_curve.pct_change().dropna()
-    if returns.std() == 0 or np.isnan(returns.std()):
+
+def _exposure(index_ns: np.ndarray | None, n_bars: int, trades: TradeLog) -> float:
+    """
+    Fraction of bars with an open position. Each trade covers the bars from
+    its entry up to (not including) its exit; overlapping trades count once.
+    """
+    if index_ns is None or n_bars == 0 or len(trades) == 0:
         return 0.0
+    entry = trades.entry_ts
+    exit_ = trades.exit_ts
+    valid = (entry != _NAT) & (exit_ != _NAT)
+    if not valid.any():
+        return 0.0
+    first = np.searchsorted(index_ns, entry[valid], side="left")
+    last = np.searchsorted(index_ns, exit_[valid], side="left")
+    delta = np.bincount(first, minlength=n_bars + 1)[: n_bars + 1]
+    delta = delta - np.bincount(last, minlength=n_bars + 1)[: n_bars + 1]
+    open_count = np.cumsum(delta[:n_bars])
+    return float(np.count_nonzero(open_count > 0) / n_bars)
+
+
+def equity_metrics(
+    equity: np.ndarray,
+    index_ns: np.ndarray | None = None,
+    trades: TradeLog | None = None,
+) -> Dict[str, float]:
+    """
+    Extended risk / return metrics from one pass over a NumPy equity array.
+
+    equity   : float array of account equity per bar
+    index_ns : int64 ns timestamps of the bars (DatetimeIndex.asi8), used to
+               infer bars per year and the calendar length for CAGR. Without
+               it, bars are assumed daily (252 / year).
+    trades   : optional TradeLog for exposure and expectancy.
+
+    Drawdown lengths are in bars; an episode runs from the first bar below
+    the running peak until the bar that sets a new peak (or the last bar).
+    """
+    equity = np.asarray(equity, dtype=float)
+    n = equity.size
+    if n == 0:
+        return {}
+
+    periods_per_year = _periods_per_year(index_ns)
+    start_equity = equity[0]
+    end_equity = equity[-1]
 
-    # Infer period length in days
-    idx = equity_curve.index.to_series()
-    deltas = idx.diff().dropna()
-    if deltas.empty:
-        periods_per_year = 252.0
+    # Returns
+    returns = equity[1:] / equity[:-1] - 1.0 if n > 1 else np.empty(0)
+    if returns.size > 1:
+        mean_ret = returns.mean()
+        std_ret = returns.std(ddof=1)
+        downside = np.minimum(returns, 0.0)
+        downside_dev = np.sqrt(np.mean(downside * downside))
     else:
-        median_days = deltas.dt.total_seconds().median() / 86400.0
-        if median_days <= 0 or np.isnan(median_days):
-            periods_per_year = 252.0
-        else:
-            periods_per_year = 252.0 / median_days
+        mean_ret = std_ret = downside_dev = 0.0
+    ann = np.sqrt(periods_per_year)
+    volatility = std_ret * ann
+    if downside_dev > 0:
+        sortino = mean_ret / downside_dev * ann
+    else:
+        sortino = float("inf") if mean_ret > 0 else 0.0
 
-    sharpe = (returns.mean() / returns.std()) * np.sqrt(periods_per_year)
-    return float(sharpe)
+    # Growth
+    if index_ns is not None and n > 1:
+        years = (index_ns[-1] - index_ns[0]) / (365.25 * 86400e9)
+    else:
+        years = (n - 1) / periods_per_year
+    growth = end_equity / start_equity if start_equity > 0 else np.nan
+    if years > 0 and growth > 0:
+        cagr = growth ** (1.0 / years) - 1.0
+    else:
+        cagr = 0.0
 
+    # Drawdowns
+    peak = np.maximum.accumulate(equity)
+    dd = equity / peak - 1.0
+    max_dd = dd.min()
+    ulcer = np.sqrt(np.mean((dd * 100.0) ** 2))
+    if max_dd < 0:
+        calmar = cagr / abs(max_dd)
+    else:
+        calmar = float("inf") if cagr > 0 else 0.0
+
+    in_dd = dd < 0
+    edges = np.diff(in_dd.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.size:
+        lengths = ends - starts
+        depths = np.minimum.reduceat(dd, starts)
+        dd_count = int(starts.size)
+        avg_dd_depth = float(depths.mean())
+        avg_dd_bars = float(lengths.mean())
+        max_dd_bars = int(lengths.max())
+    else:
+        dd_count, avg_dd_depth, avg_dd_bars, max_dd_bars = 0, 0.0, 0.0, 0
 
-def calculate_stats(equity_curve: pd.Series, trades: List[Trade]) -> dict:
+    # Trades
+    if trades is not None and len(trades) > 0:
+        expectancy = float(trades.pnl.mean())
+        expectancy_pct = float(trades.return_pct.mean() * 100)
+        exposure = _exposure(index_ns, n, trades)
+    else:
+        expectancy = expectancy_pct = exposure = 0.0
+
+    return {
+        "cagr_pct": float(cagr * 100),
+        "volatility_pct": float(volatility * 100),
+        "sortino_ratio": float(sortino),
+        "calmar_ratio": float(calmar),
+        "ulcer_index": float(ulcer),
+        "num_drawdowns": dd_count,
+        "avg_drawdown_pct": avg_dd_depth * 100,
+        "avg_drawdown_bars": avg_dd_bars,
+        "max_drawdown_bars": max_dd_bars,
+        "exposure_pct": exposure * 100,
+        "expectancy": expectancy,
+        "expectancy_pct": expectancy_pct,
+    }
+
+
+def calculate_stats(
+    equity_curve: pd.Series,
+    trades: TradeLog | List[Trade],
+    extended: bool = True,
+) -> dict:
+    """
+    Summary statistics for one equity curve and its closed trades.
+
+    With extended=True (default) the equity_metrics() keys are added:
+    CAGR, volatility, Sortino, Calmar, ulcer index, drawdown count / depth /
+    duration, exposure and expectancy.
+    """
     if equity_curve.empty:
         return {}
 
-    start_equity = float(equity_curve.iloc[0])
-    end_equity = float(equity_curve.iloc[-1])
+    if not isinstance(trades, TradeLog):
+        trades = TradeLog.from_trades(trades)
+
+    equity = equity_curve.to_numpy(dtype=float)
+    start_equity = float(equity[0])
+    end_equity = float(equity[-1])
     total_return = (end_equity / start_equity) - 1.0
 
     # Max drawdown
-    running_max = equity_curve.cummax()
-    drawdown = (equity_curve - running_max) / running_max
-    max_dd = float(drawdown.min())
+    running_max = np.maximum.accumulate(equity)
+    max_dd = float(((equity - running_max) / running_max).min())
 
     # Trade-based stats
-    pnls = np.array([t.pnl for t in trades]) if trades else np.array([])
+    pnls = trades.pnl
     wins = pnls[pnls > 0]
     losses = pnls[pnls < 0]
 
@@ -100,6 +539,8 @@ def calculate_stats(equity_curve: pd.Series, trades: List[Trade]) -> dict:
         "profit_factor": profit_factor,
         "sharpe_ratio": sharpe_ratio,
     }
+    if extended:
+        stats.update(equity_metrics(equity, _index_ns(equity_curve), trades))
     return stats
 
 
@@ -0,0 +1,166 @@
+"""
+Portfolio aggregation of per-symbol equity curves on NumPy arrays.
+
+The timestamps of all curves are merged once into a sorted int64 array;
+each curve is then forward-filled onto it with a searchsorted lookup and
+added into a single accumulator, so memory stays O(bars) instead of the
+O(bars x symbols) DataFrame that pd.DataFrame(dict_of_series) builds.
+
+As in the original equal-weight portfolio, every curve is normalised to
+its value at the first portfolio timestamp. A symbol with no bar at or
+before that timestamp has no defined starting value and is left out.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .metrics import BacktestResult, TradeLog, calculate_stats
+
+Weighting = Union[str, Mapping[str, float]]
+
+WEIGHTING_SCHEMES = ("equal", "inverse_vol")
+
+
+def _curve_arrays(curve: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    if not curve.index.is_monotonic_increasing:
+        curve = curve.sort_index()
+    index = pd.DatetimeIndex(curve.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC")
+    return index.asi8, curve.to_numpy(dtype=float)
+
+
+def _merged_index(curves: Mapping[str, pd.Series], timestamps: List[np.ndarray]) -> pd.DatetimeIndex:
+    merged = np.unique(np.concatenate(timestamps))
+    tzs = {getattr(c.index, "tz", None) for c in curves.values()}
+    names = {c.index.name for c in curves.values()}
+    name = names.pop() if len(names) == 1 else None
+
+    index = pd.DatetimeIndex(merged.view("M8[ns]"), name=name)
+    if len(tzs) == 1:
+        tz = tzs.pop()
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+    elif any(tz is not None for tz in tzs):
+        index = index.tz_localize("UTC")
+    return index
+
+
+def _forward_fill_onto(ts: np.ndarray, values: np.ndarray, merged: np.ndarray) -> np.ndarray:
+    """Value of the curve at each merged timestamp (last bar at or before it)."""
+    pos = np.searchsorted(ts, merged, side="right") - 1
+    out = values[np.maximum(pos, 0)]
+    out[pos < 0] = np.nan
+    return out
+
+
+def _bar_volatility(values: np.ndarray) -> float:
+    if values.size < 3:
+        return np.nan
+    returns = values[1:] / values[:-1] - 1.0
+    return float(np.std(returns, ddof=1))
+
+
+def _weights(
+    symbols: List[str],
+    arrays: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    weighting: Weighting,
+) -> np.ndarray:
+    if isinstance(weighting, Mapping):
+        raw = np.array([float(weighting.get(sym, 0.0)) for sym in symbols])
+    elif weighting == "equal":
+        raw = np.ones(len(symbols))
+    elif weighting == "inverse_vol":
+        vols = np.array([_bar_volatility(arrays[sym][1]) for sym in symbols])
+        raw = np.where((vols > 0) & np.isfinite(vols), 1.0 / vols, 0.0)
+    else:
+        raise ValueError(
+            f"Unknown weighting '{weighting}'. Use one of {WEIGHTING_SCHEMES} "
+            "or a mapping of symbol -> weight."
+        )
+    if (raw < 0).any():
+        raise ValueError("Portfolio weights must be non-negative")
+    return raw
+
+
+def aggregate_equity(
+    curves: Mapping[str, pd.Series],
+    initial_capital: float,
+    weighting: Weighting = "equal",
+) -> Tuple[pd.Series, Dict[str, float]]:
+    """
+    Weighted, buy-and-hold combination of equity curves.
+
+    weighting : "equal", "inverse_vol" (1 / std of each curve's bar
+        returns) or a mapping of symbol -> fixed weight. Weights are
+        renormalised to sum to 1 over the symbols that are included.
+
+    Returns the portfolio equity Series (scaled to initial_capital) and the
+    weights actually used.
+    """
+    curves = {sym: c for sym, c in curves.items() if c is not None and not c.empty}
+    if not curves:
+        raise ValueError("No equity curves to aggregate")
+
+    symbols = list(curves)
+    arrays = {sym: _curve_arrays(curves[sym]) for sym in symbols}
+    index = _merged_index(curves, [arrays[sym][0] for sym in symbols])
+    merged = index.asi8 if index.tz is None else index.tz_convert("UTC").asi8
+
+    if isinstance(weighting, Mapping):
+        unknown = set(weighting) - set(symbols)
+        if unknown:
+            raise ValueError(f"Weights given for unknown symbols: {', '.join(sorted(unknown))}")
+
+    first_ts = merged[0]
+    included = [sym for sym in symbols if arrays[sym][0][0] <= first_ts]
+    raw = _weights(included, arrays, weighting)
+    total = raw.sum()
+    if total <= 0:
+        raise ValueError("Portfolio weights sum to zero")
+    weights = raw / total
+
+    port_norm = np.zeros(merged.size)
+    for sym, w in zip(included, weights):
+        if w == 0:
+            continue
+        ts, values = arrays[sym]
+        filled = _forward_fill_onto(ts, values, merged)
+        port_norm += filled * (w / filled[0])
+
+    port_equity = pd.Series(port_norm * initial_capital, index=index)
+    return port_equity, dict(zip(included, weights.tolist()))
+
+
+def build_portfolio(
+    results: Mapping[str, BacktestResult],
+    initial_capital: float,
+    weighting: Weighting = "equal",
+    portfolio_name: Optional[str] = None,
+) -> BacktestResult:
+    """Portfolio BacktestResult from per-symbol results (all trades kept)."""
+    if not results:
+        raise ValueError("No results provided to build_portfolio")
+
+    port_equity, _ = aggregate_equity(
+        {sym: res.equity_curve for sym, res in results.items()},
+        initial_capital,
+        weighting,
+    )
+    all_trades = TradeLog.concat(res.trades for res in results.values())
+    stats = calculate_stats(port_equity, all_trades)
+
+    if portfolio_name is None:
+        scheme = "fixed" if isinstance(weighting, Mapping) else weighting
+        portfolio_name = f"PORTFOLIO_{scheme.upper()}_WEIGHT"
+
+    return BacktestResult(
+        symbol=portfolio_name,
+        equity_curve=port_equity,
+        trades=all_trades,
+        stats=stats,
+    )
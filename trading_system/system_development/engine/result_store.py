@@ -0,0 +1,345 @@
+"""
+Content-addressed store for backtest results.
+
+Each BacktestResult is saved under a hash of everything that determines it:
+strategy name, code version, StrategyParams, symbol, date range, interval
+and a fingerprint of the input price data. Re-running an identical backtest
+can then load the stored result instead of recomputing it, and stored runs
+can be queried / compared without re-executing anything.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import pickle
+import sqlite3
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .metrics import BacktestResult
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Stable hash of a price DataFrame (index, columns and values).
+    """
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def code_version(*objects: Any) -> str:
+    """
+    Hash the source files of the given modules / functions / classes.
+
+    Pass everything whose code affects a backtest result (strategy rules,
+    backtest loop, engine indicators and metrics); any edit to those files
+    produces a new version and therefore a new result key.
+    """
+    h = hashlib.sha256()
+    for obj in objects:
+        path = inspect.getfile(obj)
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()[:16]
+
+
+def _params_dict(params: Any) -> Dict[str, Any]:
+    if is_dataclass(params):
+        return asdict(params)
+    return dict(params or {})
+
+
+def make_result_key(
+    strategy: str,
+    version: str,
+    params: Any,
+    symbol: str,
+    start: str | None,
+    end: str | None,
+    interval: str,
+    fingerprint: str,
+) -> str:
+    """
+    Build the content address for one backtest run.
+    """
+    payload = {
+        "strategy": strategy,
+        "code_version": version,
+        "params": _params_dict(params),
+        "symbol": symbol,
+        "start": None if start is None else str(start),
+        "end": None if end is None else str(end),
+        "interval": interval,
+        "data_fingerprint": fingerprint,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def make_lineage_key(
+    strategy: str,
+    version: str,
+    params: Any,
+    symbol: str,
+    start: str | None,
+    interval: str,
+) -> str:
+    """
+    Key for a resumable backtest: like make_result_key() but without the end
+    date and data fingerprint, which change every time new bars arrive.
+    """
+    payload = {
+        "strategy": strategy,
+        "code_version": version,
+        "params": _params_dict(params),
+        "symbol": symbol,
+        "start": None if start is None else str(start),
+        "interval": interval,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    SQLite-backed store of BacktestResult objects keyed by make_result_key().
+
+    Metadata (strategy, symbol, params, stats, ...) is kept in plain columns
+    so runs can be listed and compared via query(); the full result
+    (equity curve, trades, stats, benchmark) is pickled into a blob column
+    and only unpickled by get() / load_equity_curves().
+    """
+
+    def __init__(self, db_path: str = "backtest_results.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.row_factory = sqlite3.Row
+        self.ensure_schema()
+
+    def close(self):
+        self._conn.close()
+
+    # --- Schema --- #
+
+    def ensure_schema(self):
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                code_version TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                start TEXT,
+                end TEXT,
+                interval TEXT NOT NULL,
+                params TEXT NOT NULL,
+                data_fingerprint TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                payload BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_strategy_symbol "
+            "ON results (strategy, symbol)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                lineage_key TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                code_version TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                last_bar TEXT NOT NULL,
+                bars INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                payload BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    # --- Read / write --- #
+
+    def __contains__(self, key: str) -> bool:
+        cur = self._conn.execute("SELECT 1 FROM results WHERE key = ?", (key,))
+        return cur.fetchone() is not None
+
+    def get(self, key: str) -> Optional[BacktestResult]:
+        cur = self._conn.execute("SELECT payload FROM results WHERE key = ?", (key,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row["payload"])
+
+    def put(
+        self,
+        key: str,
+        result: BacktestResult,
+        strategy: str,
+        version: str,
+        params: Any,
+        start: str | None,
+        end: str | None,
+        interval: str,
+        fingerprint: str,
+    ) -> None:
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO results (
+                key, strategy, code_version, symbol, start, end, interval,
+                params, data_fingerprint, stats, created_at, payload
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key,
+                strategy,
+                version,
+                result.symbol,
+                None if start is None else str(start),
+                None if end is None else str(end),
+                interval,
+                json.dumps(_params_dict(params), sort_keys=True, default=str),
+                fingerprint,
+                json.dumps(result.stats, default=float),
+                datetime.utcnow().isoformat(),
+                pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        self._conn.commit()
+
+    # --- Resumable snapshots --- #
+
+    def get_snapshot(self, lineage_key: str) -> Optional[Any]:
+        cur = self._conn.execute(
+            "SELECT payload FROM snapshots WHERE lineage_key = ?", (lineage_key,)
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row["payload"])
+
+    def put_snapshot(
+        self,
+        lineage_key: str,
+        snapshot: Any,
+        strategy: str,
+        version: str,
+    ) -> None:
+        """
+        Save a BacktestSnapshot (see engine.continuation), replacing the
+        previous one for the same lineage.
+        """
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO snapshots (
+                lineage_key, strategy, code_version, symbol, interval,
+                last_bar, bars, updated_at, payload
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                lineage_key,
+                strategy,
+                version,
+                snapshot.result.symbol,
+                snapshot.interval,
+                str(snapshot.last_ts),
+                snapshot.state.bars,
+                datetime.utcnow().isoformat(),
+                pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        self._conn.commit()
+
+    def delete_snapshot(self, lineage_key: str) -> None:
+        self._conn.execute("DELETE FROM snapshots WHERE lineage_key = ?", (lineage_key,))
+        self._conn.commit()
+
+    # --- Query API --- #
+
+    def query(
+        self,
+        strategy: Optional[str] = None,
+        symbol: Optional[str] = None,
+        interval: Optional[str] = None,
+        code_version: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        List stored runs as a DataFrame, one row per key, with metadata,
+        every stats entry as its own column and every parameter as a
+        'param_<name>' column. Nothing is unpickled or recomputed.
+        """
+        clauses: List[str] = []
+        args: List[Any] = []
+        for column, value in (
+            ("strategy", strategy),
+            ("symbol", symbol),
+            ("interval", interval),
+            ("code_version", code_version),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+
+        sql = (
+            "SELECT key, strategy, code_version, symbol, start, end, interval, "
+            "params, data_fingerprint, stats, created_at FROM results"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at"
+
+        records: List[Dict[str, Any]] = []
+        for row in self._conn.execute(sql, args).fetchall():
+            record = {k: row[k] for k in row.keys() if k not in ("params", "stats")}
+            record.update(json.loads(row["stats"]))
+            for name, value in json.loads(row["params"]).items():
+                record[f"param_{name}"] = value
+            records.append(record)
+
+        if not records:
+            return pd.DataFrame()
+        return pd.DataFrame.from_records(records).set_index("key")
+
+    def compare(
+        self,
+        keys: Iterable[str],
+        metrics: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Side-by-side stats for the given keys (rows = metrics, columns = keys).
+        """
+        keys = list(keys)
+        table = self.query()
+        if table.empty:
+            return table
+        table = table.loc[[k for k in keys if k in table.index]]
+        if metrics is not None:
+            table = table[metrics]
+        return table.T
+
+    def load_equity_curves(self, keys: Iterable[str]) -> pd.DataFrame:
+        """
+        Stored equity curves for the given keys, aligned on a common index.
+        """
+        curves: Dict[str, pd.Series] = {}
+        for key in keys:
+            result = self.get(key)
+            if result is not None:
+                curves[key] = result.equity_curve
+        return pd.DataFrame(curves).sort_index()
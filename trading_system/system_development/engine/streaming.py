@@ -0,0 +1,262 @@
+"""
+Out-of-core backtesting over an iterator of bar chunks.
+
+Instead of one DataFrame holding the whole history, the bars arrive as
+consecutive chunks (from BarStore.iter_chunks, iter_frame_chunks, or any
+generator of OHLCV frames in time order). Per chunk:
+
+  1. indicators continue from a CoreIndicatorState,
+  2. the strategy's signal rules run over the chunk plus a short tail of
+     already prepared rows (enough for its rolling windows / shifts),
+  3. the shared kernel (engine.backtest.simulate) continues from the
+     PositionState, emitting that chunk's equity and closed trades.
+
+A strategy plugs in through a ChunkRules factory, chunk_rules(symbol,
+params), naming its prepare_chunk, warm-up columns, ADX exit level and
+long-only rule; stream_backtest() and backtest_stream() are the driver
+every strategy shares.
+
+Memory is bounded by the chunk size, not the length of the history.
+Indicator values and trades match a single pass over the concatenated
+frame; rolling means in the signal rules may differ in the last bits
+because they are re-summed from the start of each tail.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtest import PositionState, simulate
+from .indicators import CoreIndicatorState, add_core_indicators
+from .metrics import BacktestResult, TradeLog, calculate_stats
+from .streaming_metrics import StreamingMetrics
+
+
+@dataclass
+class ChunkState:
+    """What signal preparation carries from one chunk to the next."""
+
+    indicators: CoreIndicatorState = field(default_factory=CoreIndicatorState)
+    tail: Optional[pd.DataFrame] = None  # last prepared rows of the previous chunk
+
+
+@dataclass
+class StreamState:
+    """Full state of a streaming backtest between chunks."""
+
+    chunk: ChunkState
+    position: PositionState
+    bars: int = 0  # bars simulated so far (after warm-up)
+    first_close: Optional[float] = None  # for the buy & hold benchmark
+    last_bar: Optional[pd.Series] = None  # last raw bar consumed (any chunk)
+
+
+@dataclass
+class ChunkResult:
+    equity: pd.Series  # equity per simulated bar of this chunk
+    trades: TradeLog  # trades closed during this chunk
+    benchmark: pd.Series  # buy & hold curve for the same bars
+
+
+@dataclass(frozen=True)
+class ChunkRules:
+    """A strategy's part of a streaming backtest (see run_stream)."""
+
+    prepare: Callable[[pd.DataFrame, Any, ChunkState], pd.DataFrame]
+    required: List[str]
+    adx_exit_level: float
+    long_only: bool = False
+
+
+# A strategy's chunk_rules(symbol, params)
+ChunkRulesFactory = Callable[[str, Any], ChunkRules]
+
+
+def new_stream_state(params: Any) -> StreamState:
+    """Empty StreamState for a fresh run with `params.initial_capital`."""
+    return StreamState(
+        chunk=ChunkState(),
+        position=PositionState(equity=params.initial_capital),
+    )
+
+
+def iter_frame_chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Split an in-memory frame into consecutive row chunks."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def prepare_chunk(
+    chunk: pd.DataFrame,
+    params: Any,
+    state: ChunkState,
+    add_signals: Callable[[pd.DataFrame, Any], pd.DataFrame],
+    lookback: int,
+) -> pd.DataFrame:
+    """
+    Indicators + signals for one chunk.
+
+    add_signals : the strategy's signal rules, run on a frame that already
+                  has the core indicator columns
+    lookback    : rows of history those rules look back over (rolling
+                  window lengths, shifts); that many prepared rows are
+                  kept in state.tail and prepended to the next chunk
+    """
+    df = add_core_indicators(
+        chunk,
+        ema_fast=params.ema_fast,
+        ema_slow=params.ema_slow,
+        rsi_period=params.rsi_period,
+        atr_period=params.atr_period,
+        adx_period=params.adx_period,
+        state=state.indicators,
+    )
+
+    n_tail = 0
+    if state.tail is not None and lookback > 0:
+        n_tail = len(state.tail)
+        df = pd.concat([state.tail, df])
+
+    df = add_signals(df, params)
+    state.tail = df.iloc[-lookback:].copy() if lookback > 0 else None
+    return df.iloc[n_tail:]
+
+
+def run_stream(
+    chunks: Iterable[pd.DataFrame],
+    symbol: str,
+    params: Any,
+    prepare: Callable[[pd.DataFrame, Any, ChunkState], pd.DataFrame],
+    required: List[str],
+    adx_exit_level: float,
+    long_only: bool = False,
+    state: Optional[StreamState] = None,
+) -> Iterator[ChunkResult]:
+    """
+    Backtest a stream of bar chunks, yielding one ChunkResult per chunk.
+
+    prepare        : the strategy's prepare_chunk(chunk, params, ChunkState)
+    required       : columns that must be non-NaN for a bar to be traded
+                     (the strategy's warm-up subset)
+    adx_exit_level : passed to engine.backtest.simulate
+    long_only      : zero out short signals
+    state          : resume from an earlier StreamState (updated in place)
+    """
+    if state is None:
+        state = new_stream_state(params)
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if state.last_bar is not None and chunk.index[0] <= state.last_bar.name:
+            raise ValueError(
+                f"Chunk starting {chunk.index[0]} does not follow the last bar "
+                f"already consumed ({state.last_bar.name})"
+            )
+        state.last_bar = chunk.iloc[-1].copy()
+        df = prepare(chunk, params, state.chunk)
+        if long_only:
+            signal = df["Signal"].to_numpy()
+            if (signal < 0).any():
+                df = df.assign(Signal=np.where(signal < 0, 0, signal))
+        df = df.dropna(subset=required)
+
+        trades = TradeLog(tz=getattr(df.index, "tz", None))
+        equity, trades, _ = simulate(
+            df, symbol, params, adx_exit_level, state=state.position, trades=trades
+        )
+        state.bars += len(df)
+
+        index = df.index.rename(None)
+        close = df["Close"].astype(float)
+        if state.first_close is None and len(close):
+            state.first_close = float(close.iloc[0])
+        if state.first_close is not None:
+            benchmark = params.initial_capital * (close / state.first_close)
+        else:
+            benchmark = close
+
+        yield ChunkResult(
+            equity=pd.Series(equity, index=index),
+            trades=trades,
+            benchmark=benchmark,
+        )
+
+
+def stream_backtest(
+    chunk_rules: ChunkRulesFactory,
+    chunks: Iterable[pd.DataFrame],
+    symbol: str,
+    params: Any,
+    state: Optional[StreamState] = None,
+) -> Iterator[ChunkResult]:
+    """run_stream() with the rules chunk_rules(symbol, params) gives."""
+    rules = chunk_rules(symbol, params)
+    return run_stream(
+        chunks,
+        symbol,
+        params,
+        prepare=rules.prepare,
+        required=rules.required,
+        adx_exit_level=rules.adx_exit_level,
+        long_only=rules.long_only,
+        state=state,
+    )
+
+
+def backtest_stream(
+    chunk_rules: ChunkRulesFactory,
+    symbol: str,
+    chunks: Iterable[pd.DataFrame],
+    params: Any,
+    keep_equity: bool = True,
+) -> BacktestResult:
+    """
+    Run stream_backtest() to the end and collect a BacktestResult.
+
+    With keep_equity=False only trades are kept and the stats come from
+    StreamingMetrics, so memory does not grow with the number of bars;
+    the result's equity_curve then holds just the final bar.
+    """
+    equity_parts: List[pd.Series] = []
+    benchmark_parts: List[pd.Series] = []
+    trade_logs: List[TradeLog] = []
+    metrics = None if keep_equity else StreamingMetrics()
+    last_equity = None
+
+    for part in stream_backtest(chunk_rules, chunks, symbol, params):
+        trade_logs.append(part.trades)
+        if keep_equity:
+            equity_parts.append(part.equity)
+            benchmark_parts.append(part.benchmark)
+        else:
+            for ts, value in zip(part.equity.index, part.equity.to_numpy()):
+                metrics.update(ts, value)
+            for pnl in part.trades.pnl:
+                metrics.add_trade(float(pnl))
+            if len(part.equity):
+                last_equity = part.equity.iloc[-1:]
+
+    trades = TradeLog.concat(trade_logs)
+    if keep_equity:
+        equity_series = pd.concat(equity_parts) if equity_parts else pd.Series(dtype=float)
+        benchmark_curve = pd.concat(benchmark_parts) if benchmark_parts else None
+        stats = calculate_stats(equity_series, trades)
+    else:
+        equity_series = last_equity if last_equity is not None else pd.Series(dtype=float)
+        benchmark_curve = None
+        stats = metrics.snapshot()
+
+    return BacktestResult(
+        symbol=symbol,
+        equity_curve=equity_series,
+        trades=trades,
+        stats=stats,
+        benchmark_curve=benchmark_curve,
+    )
@@ -0,0 +1,285 @@
+"""
+Incremental performance metrics for bar-by-bar use (live trading, long
+simulations) where recomputing calculate_stats over the full equity curve
+on every bar is too expensive.
+
+Every update is O(1):
+
+    metrics = StreamingMetrics(window=500)
+    for ts, equity in stream:
+        metrics.update(ts, equity)
+        ...
+        snap = metrics.snapshot()   # cheap, any time
+    metrics.add_trade(pnl)          # when a trade closes
+
+Keys in snapshot() follow calculate_stats() where they overlap, so the
+final snapshot of a full run agrees with calculate_stats() on the same
+curve up to float rounding.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """Welford's online mean / variance."""
+
+    __slots__ = ("n", "mean", "_m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1), 0.0 with fewer than two values."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class RollingStats:
+    """
+    Mean / variance over the last `window` values, kept in a ring buffer.
+
+    Adding a value and evicting the oldest are single Welford-style steps,
+    so push() is O(1) regardless of the window length.
+    """
+
+    __slots__ = ("window", "_buf", "_pos", "n", "mean", "_m2")
+
+    def __init__(self, window: int):
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.window = int(window)
+        self._buf = np.zeros(self.window)
+        self._pos = 0
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float) -> None:
+        if self.n == self.window:
+            old = self._buf[self._pos]
+            new_mean = self.mean + (x - old) / self.n
+            self._m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self._m2 += delta * (x - self.mean)
+        self._buf[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+
+    @property
+    def full(self) -> bool:
+        return self.n == self.window
+
+    @property
+    def variance(self) -> float:
+        if self.n < 2:
+            return 0.0
+        return max(self._m2, 0.0) / (self.n - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def values(self) -> np.ndarray:
+        """Buffered values, oldest first."""
+        if self.n < self.window:
+            return self._buf[: self.n].copy()
+        return np.roll(self._buf, -self._pos)
+
+
+class DrawdownTracker:
+    """Running peak, current / maximum drawdown and drawdown durations (bars)."""
+
+    __slots__ = ("peak", "drawdown", "max_drawdown", "bars_in_drawdown",
+                 "max_drawdown_bars", "num_drawdowns", "_ulcer_sq", "_n")
+
+    def __init__(self):
+        self.peak = -math.inf
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.bars_in_drawdown = 0
+        self.max_drawdown_bars = 0
+        self.num_drawdowns = 0
+        self._ulcer_sq = 0.0
+        self._n = 0
+
+    def push(self, equity: float) -> None:
+        self._n += 1
+        if equity >= self.peak:
+            self.peak = equity
+            self.drawdown = 0.0
+            self.bars_in_drawdown = 0
+            return
+        if self.bars_in_drawdown == 0:
+            self.num_drawdowns += 1
+        self.bars_in_drawdown += 1
+        self.max_drawdown_bars = max(self.max_drawdown_bars, self.bars_in_drawdown)
+        self.drawdown = equity / self.peak - 1.0
+        self.max_drawdown = min(self.max_drawdown, self.drawdown)
+        self._ulcer_sq += (self.drawdown * 100.0) ** 2
+
+    @property
+    def ulcer_index(self) -> float:
+        return math.sqrt(self._ulcer_sq / self._n) if self._n else 0.0
+
+
+class StreamingMetrics:
+    """
+    Bar-by-bar equity metrics: full-history and rolling-window Sharpe,
+    Sortino, volatility, drawdowns and trade stats.
+
+    periods_per_year : bars per year for annualisation. If None it is
+        inferred, as calculate_stats does, from the median spacing of the
+        first `infer_bars` timestamps and then frozen.
+    window : length of the rolling Sharpe / volatility window in bars.
+    """
+
+    def __init__(
+        self,
+        periods_per_year: Optional[float] = None,
+        window: int = 252,
+        infer_bars: int = 64,
+    ):
+        self.periods_per_year = periods_per_year
+        self._infer_bars = infer_bars
+        self._deltas: List[int] = []
+
+        self.returns = RunningStats()
+        self.rolling = RollingStats(window)
+        self.drawdowns = DrawdownTracker()
+        self._downside_sq = 0.0
+
+        self.start_equity: Optional[float] = None
+        self.last_equity: Optional[float] = None
+        self.last_ts: Optional[pd.Timestamp] = None
+        self.num_bars = 0
+
+        self.num_trades = 0
+        self._wins = RunningStats()
+        self._losses = RunningStats()
+        self._pnl_sum = 0.0
+
+    # --- Updates --- #
+
+    def update(self, ts, equity: float) -> None:
+        """Feed the equity at the close of one bar."""
+        equity = float(equity)
+        if self.start_equity is None:
+            self.start_equity = equity
+        else:
+            r = equity / self.last_equity - 1.0 if self.last_equity else 0.0
+            self.returns.push(r)
+            self.rolling.push(r)
+            if r < 0:
+                self._downside_sq += r * r
+            self._observe_spacing(ts)
+
+        self.drawdowns.push(equity)
+        self.last_equity = equity
+        self.last_ts = ts
+        self.num_bars += 1
+
+    def _observe_spacing(self, ts) -> None:
+        if self.periods_per_year is not None or ts is None or self.last_ts is None:
+            return
+        self._deltas.append(pd.Timestamp(ts).value - pd.Timestamp(self.last_ts).value)
+        if len(self._deltas) >= self._infer_bars:
+            self.periods_per_year = self._inferred_periods()
+            self._deltas = []
+
+    def _inferred_periods(self) -> float:
+        if not self._deltas:
+            return 252.0
+        median_days = float(np.median(self._deltas)) / 86400e9
+        return 252.0 / median_days if median_days > 0 else 252.0
+
+    def add_trade(self, pnl: float) -> None:
+        """Record a closed trade's PnL."""
+        self.num_trades += 1
+        self._pnl_sum += pnl
+        if pnl > 0:
+            self._wins.push(pnl)
+        elif pnl < 0:
+            self._losses.push(pnl)
+
+    # --- Queries --- #
+
+    @property
+    def annualisation(self) -> float:
+        ppy = self.periods_per_year
+        if ppy is None:
+            ppy = self._inferred_periods()
+        return math.sqrt(ppy)
+
+    @property
+    def sharpe(self) -> float:
+        std = self.returns.std
+        if self.returns.n < 2 or std == 0:
+            return 0.0
+        return self.returns.mean / std * self.annualisation
+
+    @property
+    def rolling_sharpe(self) -> float:
+        std = self.rolling.std
+        if self.rolling.n < 2 or std == 0:
+            return 0.0
+        return self.rolling.mean / std * self.annualisation
+
+    @property
+    def sortino(self) -> float:
+        if self.returns.n < 2:
+            return 0.0
+        downside_dev = math.sqrt(self._downside_sq / self.returns.n)
+        if downside_dev == 0:
+            return math.inf if self.returns.mean > 0 else 0.0
+        return self.returns.mean / downside_dev * self.annualisation
+
+    def snapshot(self) -> Dict[str, float]:
+        if self.start_equity is None:
+            return {}
+        dd = self.drawdowns
+        n_wins, n_losses = self._wins.n, self._losses.n
+        gross_profit = self._wins.mean * n_wins
+        gross_loss = self._losses.mean * n_losses
+        return {
+            "start_equity": self.start_equity,
+            "end_equity": self.last_equity,
+            "total_return_pct": (self.last_equity / self.start_equity - 1.0) * 100,
+            "max_drawdown_pct": dd.max_drawdown * 100,
+            "current_drawdown_pct": dd.drawdown * 100,
+            "num_trades": self.num_trades,
+            "win_rate_pct": n_wins / self.num_trades * 100 if self.num_trades else 0.0,
+            "avg_win": self._wins.mean,
+            "avg_loss": self._losses.mean,
+            "profit_factor": gross_profit / abs(gross_loss) if gross_loss != 0 else math.inf,
+            "sharpe_ratio": self.sharpe,
+            "rolling_sharpe": self.rolling_sharpe,
+            "sortino_ratio": self.sortino,
+            "volatility_pct": self.returns.std * self.annualisation * 100,
+            "rolling_volatility_pct": self.rolling.std * self.annualisation * 100,
+            "ulcer_index": dd.ulcer_index,
+            "num_drawdowns": dd.num_drawdowns,
+            "max_drawdown_bars": dd.max_drawdown_bars,
+            "expectancy": self._pnl_sum / self.num_trades if self.num_trades else 0.0,
+            "num_bars": self.num_bars,
+        }
@@ -6,10 +6,15 @@ import numpy as np
 import pandas as pd
 
 from engine.indicators import add_core_indicators
+from engine.streaming import ChunkState, prepare_chunk as _prepare_chunk
 from .config import StrategyParams
 
 
-def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
+def prepare_dataframe(
+    df: pd.DataFrame,
+    params: StrategyParams,
+    inplace: bool = False,
+) -> pd.DataFrame:
     """
     Volatility breakout strategy:
 
@@ -36,6 +41,9 @@ def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
           * same low-vol condition
           * Close breaks below prior donchian_low
           * ADX >= adx_trend_threshold
+
+    With inplace=True the indicator and signal columns are added to `df`
+    itself instead of to a copy.
     """
 
     # --- Add core indicators (EMA, ATR, ADX, etc.) ---
@@ -46,9 +54,17 @@ def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
         rsi_period=params.rsi_period,
         atr_period=params.atr_period,
         adx_period=params.adx_period,
+        inplace=inplace,
     )
 
-    df = df.copy()
+    return add_signals(df, params)
+
+
+def add_signals(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
+    """
+    Trend / entry columns and Signal, on a frame that already has the core
+    indicators. Writes into `df` and returns it.
+    """
 
     # --- Trend filter from EMA_slow ---
     df["Trend"] = np.where(df["Close"] > df["EMA_Slow"], 1,
@@ -100,3 +116,20 @@ def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
     df.loc[short_breakout, "Signal"] = -1
 
     return df
+
+
+def signal_lookback(params: StrategyParams) -> int:
+    """Rows of history add_signals() looks back over (Donchian + shift, ATR MA)."""
+    return max(params.donchian_lookback + 1, params.vol_lookback)
+
+
+def prepare_chunk(
+    chunk: pd.DataFrame,
+    params: StrategyParams,
+    state: ChunkState,
+) -> pd.DataFrame:
+    """
+    prepare_dataframe() for one chunk of a longer history; indicator and
+    signal state is carried in `state` (see engine.streaming).
+    """
+    return _prepare_chunk(chunk, params, state, add_signals, signal_lookback(params))
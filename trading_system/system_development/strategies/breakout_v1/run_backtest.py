@@ -2,26 +2,170 @@
 
 from __future__ import annotations
 
-from typing import List, Dict
-import matplotlib.pyplot as plt
-import numpy as np
+import sys
+from typing import Dict, Iterable, Iterator
 import pandas as pd
-from collections import Counter
 
+from engine.backtest import simulate
+from engine.continuation import update_backtest as _update_backtest
 from engine.data_loader import download_price_data
+from engine.indicators import drop_warmup
+from engine.instrumentation import get_tracer
 from engine.metrics import (
-    Trade,
     BacktestResult,
+    TradeLog,
     calculate_stats,
     print_stats,
 )
+from engine import backtest as _backtest, indicators as _indicators, metrics as _metrics
+from engine import streaming as _streaming
+from engine.portfolio import Weighting, build_portfolio
+from engine.result_store import (
+    ResultStore,
+    code_version,
+    data_fingerprint,
+    make_result_key,
+)
+from engine.streaming import ChunkResult, ChunkRules, StreamState, backtest_stream
+from . import config as _config, rules as _rules
 from .config import StrategyParams, DEFAULT_PARAMS, INDEX_SYMBOLS, FX_SYMBOLS
-from .rules import prepare_dataframe
+from .rules import prepare_chunk, prepare_dataframe
+
+STRATEGY_NAME = "breakout_v1"
+
+# Indicator columns that must be defined before a bar can be traded
+WARMUP_COLUMNS = ["Close", "High", "Low", "EMA_Slow", "ATR", "ADX"]
 
 # By default, indices are long-only for this strategy
 LONG_ONLY_SYMBOLS = ["^GSPC", "^NDX", "^FTSE"]
 
 
+def _code_version() -> str:
+    """Hash of every source file that affects a breakout_v1 result."""
+    return code_version(
+        sys.modules[__name__], _config, _rules, _backtest, _indicators, _metrics
+    )
+
+
+def _snapshot_version() -> str:
+    """_code_version() plus the streaming state layout stored in snapshots."""
+    return code_version(
+        sys.modules[__name__], _config, _rules, _backtest, _indicators, _metrics, _streaming
+    )
+
+
+def _plot_equity(
+    symbol: str,
+    equity_series: pd.Series,
+    benchmark_curve: pd.Series | None,
+    show_benchmark: bool,
+) -> None:
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 4))
+    plt.plot(equity_series, label="Strategy")
+    if show_benchmark and benchmark_curve is not None:
+        bh = benchmark_curve.reindex(equity_series.index).ffill()
+        plt.plot(bh, linestyle="--", alpha=0.8, label="Buy & Hold")
+    plt.title(f"Equity curve - {symbol} (breakout_v1)")
+    plt.xlabel("Date")
+    plt.ylabel("Equity")
+    if show_benchmark:
+        plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+def run_backtest_loop(
+    df: pd.DataFrame,
+    symbol: str,
+    params: StrategyParams,
+) -> tuple[pd.Series, TradeLog]:
+    """
+    Bar-by-bar breakout_v1 simulation over an already prepared DataFrame
+    (indicators + Signal, warm-up rows dropped). Returns the equity curve
+    and the TradeLog of closed trades; does no I/O.
+    Trend exits fire when ADX drops below params.adx_period (the ADX
+    lookback, as in the original loop).
+    """
+    equity, trades, _ = simulate(df, symbol, params, adx_exit_level=params.adx_period)
+    return pd.Series(equity, index=df.index.rename(None)), trades
+
+
+def chunk_rules(symbol: str, params: StrategyParams) -> ChunkRules:
+    """
+    How breakout_v1 prepares and trades each chunk of a streaming
+    backtest (see engine.streaming).
+    Trend exits fire when ADX drops below params.adx_period (the ADX
+    lookback, as in the original loop).
+    """
+    return ChunkRules(
+        prepare=prepare_chunk,
+        required=WARMUP_COLUMNS,
+        adx_exit_level=params.adx_period,
+        long_only=params.long_only and (symbol in LONG_ONLY_SYMBOLS),
+    )
+
+
+def stream_backtest(
+    chunks: Iterable[pd.DataFrame],
+    symbol: str,
+    params: StrategyParams | None = None,
+    state: StreamState | None = None,
+) -> Iterator[ChunkResult]:
+    """
+    Out-of-core breakout_v1 backtest: consume OHLCV chunks in time order and
+    yield each chunk's equity and closed trades (see engine.streaming).
+    Pass a StreamState to continue an earlier stream.
+    """
+    if params is None:
+        params = DEFAULT_PARAMS
+    return _streaming.stream_backtest(chunk_rules, chunks, symbol, params, state)
+
+
+def backtest_symbol_stream(
+    symbol: str,
+    chunks: Iterable[pd.DataFrame],
+    params: StrategyParams | None = None,
+    keep_equity: bool = True,
+) -> BacktestResult:
+    """Run stream_backtest() to the end (see engine.streaming.backtest_stream)."""
+    if params is None:
+        params = DEFAULT_PARAMS
+    return backtest_stream(chunk_rules, symbol, chunks, params, keep_equity)
+
+
+def update_backtest(
+    symbol: str,
+    store: ResultStore,
+    params: StrategyParams | None = None,
+    start: str = "2015-01-01",
+    end: str | None = None,
+    interval: str = "1d",
+    verbose: bool = False,
+) -> BacktestResult:
+    """
+    Incremental breakout_v1 backtest: resume the run stored in `store` for
+    these params / symbol / start / interval and simulate only the bars
+    that arrived since, instead of the whole history (see
+    engine.continuation). The first call runs the full history.
+    """
+    if params is None:
+        params = DEFAULT_PARAMS
+    return _update_backtest(
+        chunk_rules,
+        store,
+        STRATEGY_NAME,
+        _snapshot_version(),
+        symbol,
+        params,
+        start=start,
+        end=end,
+        interval=interval,
+        verbose=verbose,
+    )
+
+
 def backtest_symbol(
     symbol: str,
     params: StrategyParams | None = None,
@@ -31,6 +175,7 @@ def backtest_symbol(
     plot: bool = False,
     verbose: bool = True,
     show_benchmark: bool = False,
+    store: ResultStore | None = None,
 ) -> BacktestResult:
     """
     Run the breakout_v1 backtest for a single symbol.
@@ -38,21 +183,47 @@ def backtest_symbol(
     Uses ATR-based position sizing and supports two exit modes:
       - fixed_rr    (stop + fixed multiple TP)
       - trend_follow (stop + trend / EMA exit, optionally with trailing)
+
+    If a ResultStore is given, the result is keyed on strategy, code version,
+    params, symbol, date range and a fingerprint of the downloaded data; an
+    identical earlier run is loaded from the store instead of recomputed.
     """
     if params is None:
         params = DEFAULT_PARAMS
 
     # --- Load data and build signals ---
-    raw = download_price_data(symbol, start=start, end=end, interval=interval)
-    df = prepare_dataframe(raw, params)
-
-    # Drop rows where indicators not fully defined
-    df = df.dropna(subset=["Close", "High", "Low", "EMA_Slow", "ATR", "ADX"]).copy()
+    tracer = get_tracer()
+    with tracer.span("download_price_data", symbol=symbol, interval=interval) as span:
+        raw = download_price_data(symbol, start=start, end=end, interval=interval)
+        span.count("bars", len(raw))
+
+    if store is not None:
+        version = _code_version()
+        fingerprint = data_fingerprint(raw)
+        key = make_result_key(
+            STRATEGY_NAME, version, params, symbol, start, end, interval, fingerprint
+        )
+        cached = store.get(key)
+        tracer.count("store_hits" if cached is not None else "store_misses")
+        if cached is not None:
+            if verbose:
+                print(f"\nLoaded stored result for {symbol} (key {key[:12]})")
+            if plot:
+                _plot_equity(symbol, cached.equity_curve, cached.benchmark_curve, show_benchmark)
+            return cached
+
+    with tracer.span("prepare_dataframe", symbol=symbol):
+        # raw is only needed for the fingerprint above, so let the
+        # indicators be written into it rather than into a copy.
+        df = prepare_dataframe(raw, params, inplace=True)
 
     # Enforce long-only if configured
     if params.long_only and (symbol in LONG_ONLY_SYMBOLS):
         df.loc[df["Signal"] < 0, "Signal"] = 0
 
+    # Drop rows where indicators not fully defined (a row slice, not a copy)
+    df = drop_warmup(df, WARMUP_COLUMNS)
+
     # --- Buy & hold benchmark ---
     first_close = float(df["Close"].iloc[0])
     benchmark_curve = params.initial_capital * (df["Close"] / first_close)
@@ -61,169 +232,34 @@ def backtest_symbol(
         print(f"\nSignal counts for {symbol}:")
         print(df["Signal"].value_counts(dropna=False))
 
-    # ===== Core backtest =====
-    equity = params.initial_capital  # realised equity
-    equity_curve: List[float] = []
-    dates: List[pd.Timestamp] = []
-
-    trades: List[Trade] = []
-    position = 0  # 0 flat, 1 long, -1 short
-    entry_price = 0.0
-    stop_price = 0.0
-    tp_price: float | None = None
-    size = 0.0
-    entry_date: pd.Timestamp | None = None
-
-    for idx, row in df.iterrows():
-        dates.append(idx)
-
-        close = float(row["Close"])
-        high = float(row["High"])
-        low = float(row["Low"])
-        adx = float(row["ADX"])
-        ema_slow = float(row["EMA_Slow"])
-        atr_val = float(row["ATR"])
-
-        if position == 0:
-            # ---- FLAT: check for new entry ----
-            signal = int(row["Signal"])
-            if signal != 0 and atr_val > 0:
-                stop_distance = params.stop_atr_mult * atr_val
-                risk_amount = equity * params.risk_per_trade
-                size = risk_amount / stop_distance
-
-                entry_price = close
-                if signal == 1:
-                    stop_price = entry_price - stop_distance
-                    if params.exit_mode == "fixed_rr":
-                        tp_price = entry_price + params.tp_atr_mult * atr_val
-                    else:
-                        tp_price = None
-                else:
-                    stop_price = entry_price + stop_distance
-                    if params.exit_mode == "fixed_rr":
-                        tp_price = entry_price - params.tp_atr_mult * atr_val
-                    else:
-                        tp_price = None
-
-                position = signal
-                entry_date = idx
-
-        else:
-            # ---- IN A TRADE: manage position ----
-            exit_price = None
-            exit_reason = None
-
-            # Optionally trail stop in trend_follow mode
-            if params.exit_mode == "trend_follow" and params.trail_stops:
-                if position == 1:
-                    new_stop = close - params.stop_atr_mult * atr_val
-                    stop_price = max(stop_price, new_stop)
-                else:
-                    new_stop = close + params.stop_atr_mult * atr_val
-                    stop_price = min(stop_price, new_stop)
-
-            if position == 1:
-                # Long trade
-                if low <= stop_price:
-                    exit_price = stop_price
-                    exit_reason = "stop"
-                elif params.exit_mode == "fixed_rr" and tp_price is not None and high >= tp_price:
-                    exit_price = tp_price
-                    exit_reason = "tp"
-                elif (adx < params.adx_period) or (close < ema_slow):
-                    # trend exit: ADX fades or price back below EMA_slow
-                    exit_price = close
-                    exit_reason = "trend_exit"
-            else:
-                # Short trade
-                if high >= stop_price:
-                    exit_price = stop_price
-                    exit_reason = "stop"
-                elif params.exit_mode == "fixed_rr" and tp_price is not None and low <= tp_price:
-                    exit_price = tp_price
-                    exit_reason = "tp"
-                elif (adx < params.adx_period) or (close > ema_slow):
-                    exit_price = close
-                    exit_reason = "trend_exit"
-
-            if exit_price is not None:
-                pnl = (exit_price - entry_price) * size * position
-                equity += pnl  # realised PnL only
-
-                trades.append(
-                    Trade(
-                        symbol=symbol,
-                        entry_date=entry_date,
-                        exit_date=idx,
-                        direction=position,
-                        entry_price=entry_price,
-                        exit_price=exit_price,
-                        size=size,
-                        pnl=pnl,
-                        return_pct=pnl / equity if equity != 0 else 0.0,
-                        exit_reason=exit_reason,
-                    )
-                )
-
-                # Reset position state
-                position = 0
-                entry_price = stop_price = 0.0
-                tp_price = None
-                size = 0.0
-                entry_date = None
-
-        # ---- Compute equity for this bar (cash vs mtm) ----
-        if position == 0:
-            unrealised = 0.0
-        else:
-            unrealised = (close - entry_price) * size * position
-
-        equity_mtm = equity + unrealised
-
-        if params.equity_mode.lower() == "mtm":
-            equity_curve.append(equity_mtm)
-        else:
-            equity_curve.append(equity)
-
-    equity_series = pd.Series(equity_curve, index=dates)
-    stats = calculate_stats(equity_series, trades)
+    with tracer.span("backtest_loop", symbol=symbol) as span:
+        equity_series, trades = run_backtest_loop(df, symbol, params)
+        span.count("bars", len(df))
+        span.count("trades", len(trades))
+
+    with tracer.span("calculate_stats", symbol=symbol):
+        stats = calculate_stats(equity_series, trades)
 
     if verbose and trades:
-        holding_days = np.array(
-            [(t.exit_date - t.entry_date).total_seconds() / 86400.0 for t in trades]
-        )
+        # Holding time in days for each trade
+        holding_days = trades.holding_days()
+
         avg_all = float(holding_days.mean())
         print(f"\nExit breakdown for {symbol}:")
         print(f"  All trades       : {len(trades):4d} trades, "
               f"avg holding {avg_all:6.2f} days")
 
-        reason_counts = Counter(t.exit_reason for t in trades)
-        for reason, count in reason_counts.items():
-            reason_durations = holding_days[
-                [i for i, t in enumerate(trades) if t.exit_reason == reason]
-            ]
-            avg_reason = float(reason_durations.mean()) if len(reason_durations) else 0.0
+        for reason, (count, avg_reason) in trades.group_mean(holding_days).items():
             print(
                 f"  {reason:<14s}: {count:4d} trades, "
                 f"avg holding {avg_reason:6.2f} days"
             )
 
     if plot:
-        plt.figure(figsize=(10, 4))
-        plt.plot(equity_series, label="Strategy")
-        if show_benchmark and benchmark_curve is not None:
-            bh = benchmark_curve.reindex(equity_series.index).ffill()
-            plt.plot(bh, linestyle="--", alpha=0.8, label="Buy & Hold")
-        plt.title(f"Equity curve - {symbol} (breakout_v1)")
-        plt.xlabel("Date")
-        plt.ylabel("Equity")
-        if show_benchmark:
-            plt.legend()
-        plt.tight_layout()
-        plt.show()
-
-    return BacktestResult(
+        with tracer.span("plot", symbol=symbol):
+            _plot_equity(symbol, equity_series, benchmark_curve, show_benchmark)
+
+    result = BacktestResult(
         symbol=symbol,
         equity_curve=equity_series,
         trades=trades,
@@ -231,37 +267,44 @@ def backtest_symbol(
         benchmark_curve=benchmark_curve,
     )
 
+    if store is not None:
+        store.put(
+            key,
+            result,
+            strategy=STRATEGY_NAME,
+            version=version,
+            params=params,
+            start=start,
+            end=end,
+            interval=interval,
+            fingerprint=fingerprint,
+        )
+
+    return result
+
 
 def build_portfolio_result(
     results: Dict[str, BacktestResult],
     params: StrategyParams,
-    portfolio_name: str = "PORTFOLIO_EQUAL_WEIGHT",
+    portfolio_name: str | None = None,
+    weighting: Weighting = "equal",
 ) -> BacktestResult:
     """
-    Combine individual symbol equity curves into a single equal-weight portfolio.
+    Combine individual symbol equity curves into a single portfolio.
+
+    weighting : "equal" (default), "inverse_vol" or a dict of
+    symbol -> fixed weight; see engine.portfolio.aggregate_equity.
+    The default name is PORTFOLIO_<SCHEME>_WEIGHT, e.g.
+    PORTFOLIO_EQUAL_WEIGHT.
     """
     if not results:
         raise ValueError("No results provided to build_portfolio_result")
 
-    eq_df = pd.DataFrame({sym: res.equity_curve for sym, res in results.items()}).sort_index()
-    eq_df = eq_df.ffill().dropna(how="all")
-
-    eq_norm = eq_df / eq_df.iloc[0]
-    port_norm = eq_norm.mean(axis=1)
-
-    port_equity = port_norm * params.initial_capital
-
-    all_trades: List[Trade] = []
-    for res in results.values():
-        all_trades.extend(res.trades)
-
-    stats = calculate_stats(port_equity, all_trades)
-
-    return BacktestResult(
-        symbol=portfolio_name,
-        equity_curve=port_equity,
-        trades=all_trades,
-        stats=stats,
+    return build_portfolio(
+        results,
+        initial_capital=params.initial_capital,
+        weighting=weighting,
+        portfolio_name=portfolio_name,
     )
 
 
@@ -273,6 +316,8 @@ def run_backtest_for_default_universe(
     plot: bool = False,
     portfolio: bool = True,
     show_benchmark: bool = False,
+    store: ResultStore | None = None,
+    weighting: Weighting = "equal",
 ) -> Dict[str, BacktestResult]:
     """
     Run breakout_v1 across the default index universe (and optional FX).
@@ -282,26 +327,32 @@ def run_backtest_for_default_universe(
 
     symbols = INDEX_SYMBOLS + FX_SYMBOLS
     results: Dict[str, BacktestResult] = {}
+    tracer = get_tracer()
 
     for sym in symbols:
         print(f"\n=== Running breakout_v1 backtest for {sym} ===")
-        result = backtest_symbol(
-            symbol=sym,
-            params=params,
-            start=start,
-            end=end,
-            interval=interval,
-            plot=plot,
-            verbose=True,
-            show_benchmark=show_benchmark,
-        )
+        with tracer.span("backtest_symbol", symbol=sym), tracer.profile(sym):
+            result = backtest_symbol(
+                symbol=sym,
+                params=params,
+                start=start,
+                end=end,
+                interval=interval,
+                plot=plot,
+                verbose=True,
+                show_benchmark=show_benchmark,
+                store=store,
+            )
         results[sym] = result
 
     if portfolio and results:
-        portfolio_result = build_portfolio_result(results, params)
+        with tracer.span("build_portfolio_result"):
+            portfolio_result = build_portfolio_result(results, params, weighting=weighting)
         print_stats(portfolio_result.symbol, portfolio_result.stats)
 
         if plot:
+            import matplotlib.pyplot as plt
+
             plt.figure(figsize=(10, 4))
             plt.plot(
                 portfolio_result.equity_curve,
@@ -1,11 +1,107 @@
-from .trend_pullback_v1 import run_backtest as tp_backtest
-from .trend_pullback_v1.config import StrategyParams as TPParams
+"""
+Registry of development strategies.
 
-from .breakout_v1 import run_backtest as bo_backtest
-from .breakout_v1.config import StrategyParams as BOParams
+Strategies are resolved lazily by name: nothing under a strategy package is
+imported until that strategy is first used, and only the parts needed are
+loaded (getting the params class imports config.py only, not the backtest
+module). Resolved modules are cached by importlib, so later lookups are free.
 
-STRATEGIES = {
-    "trend_pullback_v1": (tp_backtest.run_backtest_for_default_universe, TPParams),
-    "breakout_v1": (bo_backtest.run_backtest_for_default_universe, BOParams),
+    run_fn, ParamsCls = STRATEGIES["trend_pullback_v1"]   # as before
+    spec = get_strategy("breakout_v1")                     # richer access
+    spec.backtest_symbol("^GSPC", params=spec.params_cls(), plot=False)
+"""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Callable, Dict, Iterator, List, Mapping, Tuple
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    name: str
+    package: str  # subpackage of strategies/ holding config.py, rules.py, run_backtest.py
+
+    def _module(self, module: str) -> ModuleType:
+        return importlib.import_module(f".{self.package}.{module}", __package__)
+
+    @property
+    def config(self) -> ModuleType:
+        return self._module("config")
+
+    @property
+    def run_backtest(self) -> ModuleType:
+        return self._module("run_backtest")
+
+    @property
+    def params_cls(self) -> type:
+        return self.config.StrategyParams
+
+    @property
+    def default_symbols(self) -> List[str]:
+        return list(self.config.INDEX_SYMBOLS) + list(self.config.FX_SYMBOLS)
+
+    @property
+    def run_universe(self) -> Callable:
+        return self.run_backtest.run_backtest_for_default_universe
+
+    @property
+    def backtest_symbol(self) -> Callable:
+        return self.run_backtest.backtest_symbol
+
+    @property
+    def backtest_symbol_stream(self) -> Callable:
+        return self.run_backtest.backtest_symbol_stream
+
+    @property
+    def update_backtest(self) -> Callable:
+        return self.run_backtest.update_backtest
+
+    @property
+    def build_portfolio_result(self) -> Callable:
+        return self.run_backtest.build_portfolio_result
+
+
+_SPECS: Dict[str, StrategySpec] = {
+    "trend_pullback_v1": StrategySpec("trend_pullback_v1", "trend_pullback_v1"),
+    "breakout_v1": StrategySpec("breakout_v1", "breakout_v1"),
     # add others here
-}
\ No newline at end of file
+}
+
+
+def get_strategy(name: str) -> StrategySpec:
+    try:
+        return _SPECS[name]
+    except KeyError:
+        raise KeyError(
+            f"Unknown strategy '{name}'. Available: {', '.join(sorted(_SPECS))}"
+        ) from None
+
+
+def list_strategies() -> List[str]:
+    return list(_SPECS)
+
+
+class _LazyStrategies(Mapping[str, Tuple[Callable, type]]):
+    """
+    Read-only mapping name -> (run_backtest_for_default_universe, StrategyParams),
+    importing a strategy only when its entry is accessed.
+    """
+
+    def __getitem__(self, name: str) -> Tuple[Callable, type]:
+        spec = get_strategy(name)
+        return spec.run_universe, spec.params_cls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_SPECS)
+
+    def __len__(self) -> int:
+        return len(_SPECS)
+
+    def __contains__(self, name: object) -> bool:
+        return name in _SPECS
+
+
+STRATEGIES: Mapping[str, Tuple[Callable, type]] = _LazyStrategies()
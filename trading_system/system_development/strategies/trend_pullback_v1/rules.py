@@ -2,10 +2,15 @@ import numpy as np
 import pandas as pd
 
 from engine.indicators import add_core_indicators
+from engine.streaming import ChunkState, prepare_chunk as _prepare_chunk
 from .config import StrategyParams
 
 
-def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
+def prepare_dataframe(
+    df: pd.DataFrame,
+    params: StrategyParams,
+    inplace: bool = False,
+) -> pd.DataFrame:
     """
     EMA-only trend regime + selectable entry modes.
 
@@ -37,6 +42,9 @@ def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
            (today Close > EMA_Fast and yesterday Close <= EMA_Fast)
 
     Shorts are symmetric conditions for downtrend.
+
+    With inplace=True the indicator and signal columns are added to `df`
+    itself instead of to a copy.
     """
 
     # --- Add indicators ---
@@ -47,9 +55,17 @@ def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
         rsi_period=params.rsi_period,
         atr_period=params.atr_period,
         adx_period=params.adx_period,
+        inplace=inplace,
     )
 
-    df = df.copy()
+    return add_signals(df, params)
+
+
+def add_signals(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
+    """
+    Trend / entry columns and Signal, on a frame that already has the core
+    indicators. Writes into `df` and returns it.
+    """
 
     # --- Trend regime from EMA_Slow and its slope ---
     ema_slow = df["EMA_Slow"]
@@ -116,4 +132,21 @@ def prepare_dataframe(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
     df.loc[long_condition, "Signal"] = 1
     df.loc[short_condition, "Signal"] = -1
 
-    return df
\ No newline at end of file
+    return df
+
+
+def signal_lookback(params: StrategyParams) -> int:
+    """Rows of history add_signals() looks back over (one-bar shifts)."""
+    return 1
+
+
+def prepare_chunk(
+    chunk: pd.DataFrame,
+    params: StrategyParams,
+    state: ChunkState,
+) -> pd.DataFrame:
+    """
+    prepare_dataframe() for one chunk of a longer history; indicator and
+    signal state is carried in `state` (see engine.streaming).
+    """
+    return _prepare_chunk(chunk, params, state, add_signals, signal_lookback(params))
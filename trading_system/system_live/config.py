@@ -22,6 +22,51 @@ class StrategyRuntimeConfig:
     capital_allocation: float    # fraction of capital allocated to this strategy, e.g. 1.0
     risk_per_trade: float        # fraction of allocated capital to risk per trade, e.g. 0.01
     mode: str = "paper"          # "paper" or "live"
+    instruments: Optional[List[str]] = None  # subset of SystemConfig.instruments (None = all)
+
+
+@dataclass
+class ProviderResilienceConfig:
+    """
+    Timeouts / retries / rate limits around the data provider (data/resilience.py).
+
+    One call can take up to worst_case_seconds(): every attempt running
+    into call_timeout_seconds (and, with a rate limit, waiting as long
+    again for a token) plus the longest backoff sleeps. With the defaults
+    that is 3 x 20s + 1.5s, more than SystemConfig.fetch_timeout_seconds;
+    fetch_all would abandon such a call while it kept retrying and
+    updating the breaker in the background. So the runner passes
+    fetch_timeout_seconds to the provider as a whole-call deadline: no
+    retry starts once it is spent, and waits are cut to what is left.
+    """
+    call_timeout_seconds: Optional[float] = 20.0  # per attempt
+    attempts: int = 3                             # tries per call, with jittered backoff
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    breaker_failures: int = 3                     # consecutive failed calls before a symbol is skipped
+    breaker_reset_seconds: float = 300.0
+    rate_per_second: Optional[float] = None       # global token bucket (None = unlimited)
+    rate_burst: int = 5
+    empty_ttl_seconds: float = 3600.0             # skip symbols that returned no data for this long
+
+    def worst_case_seconds(self) -> Optional[float]:
+        """Longest one provider call can take without a deadline (None = unbounded)."""
+        if self.call_timeout_seconds is None:
+            return None
+        attempts = max(self.attempts, 1)
+        per_attempt = self.call_timeout_seconds * (2 if self.rate_per_second else 1)
+        backoff = sum(
+            min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (k - 1))
+            for k in range(1, attempts)
+        )
+        return attempts * per_attempt + backoff
+
+
+@dataclass
+class PaperConfig:
+    """Simulated fills for strategies with mode="paper" (execution/paper.py)."""
+    slippage_bps: float = 2.0      # adverse slippage on entries and stop exits
+    slippage_points: float = 0.0   # plus a fixed offset in price points
 
 
 @dataclass
@@ -31,11 +76,36 @@ class SystemConfig:
 
     For v1, you can simply edit DEFAULT_CONFIG in this file, or
     later implement reading from a JSON/YAML config file.
+
+    Several strategy instances (each with its own timeframe, capital
+    allocation and instrument subset) can run in one process; their bars
+    are fetched once per (symbol, timeframe), or once per symbol at
+    base_timeframe and resampled.
     """
     db_path: str
     data_provider: str               # "yahoo" or "dummy"
     instruments: List[InstrumentConfig]
-    strategy: StrategyRuntimeConfig
+    strategy: Optional[StrategyRuntimeConfig] = None
+    strategies: List[StrategyRuntimeConfig] = field(default_factory=list)  # further strategy instances
+    base_timeframe: Optional[str] = None     # fetch this once per symbol and resample for coarser strategies
+    fetch_workers: int = 16                  # concurrent provider.get_ohlcv calls per cycle
+    fetch_timeout_seconds: Optional[float] = 30.0  # per-instrument fetch timeout, also caps provider retries (None = wait)
+    cache_bars: bool = True                  # keep a rolling bar window per instrument (data/cache.py)
+    resilience: Optional[ProviderResilienceConfig] = field(default_factory=ProviderResilienceConfig)
+    paper: PaperConfig = field(default_factory=PaperConfig)
+    monitor_seconds: Optional[float] = 60.0  # daemon: check open trades' stops / targets this often (None = off)
+    monitor_timeframe: str = "1m"            # bars the trade monitor checks
+    record_metrics: bool = True              # per-cycle timings / counters -> cycle_metrics table
+    metrics_textfile: Optional[str] = None   # also write Prometheus text format here, e.g. "trading_live.prom"
+
+    def get_strategies(self) -> List[StrategyRuntimeConfig]:
+        """All strategy instances to run: `strategy` (if set) then `strategies`."""
+        return ([self.strategy] if self.strategy is not None else []) + list(self.strategies)
+
+    def get_strategy_instruments(self, strategy: StrategyRuntimeConfig) -> List[str]:
+        if strategy.instruments is not None:
+            return list(strategy.instruments)
+        return [i.symbol for i in self.instruments]
 
     def get_instrument_config(self, symbol: str) -> Optional[InstrumentConfig]:
         for inst in self.instruments:
@@ -53,7 +123,7 @@ DEFAULT_CONFIG = SystemConfig(
         InstrumentConfig(symbol="ES_FAKE", point_value=1.0),
     ],
     strategy=StrategyRuntimeConfig(
-        strategy_name="example_strategy",
+        strategy_name="trend_pullback_v1",
         timeframe="4h",
         capital=10_000.0,
         capital_allocation=1.0,
@@ -0,0 +1,172 @@
+# system_live/data/cache.py
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_provider import MarketDataProvider
+
+
+class BarWindow:
+    """
+    Fixed-capacity ring buffer of the most recent bars for one
+    (symbol, timeframe): int64 timestamps plus a float64 value matrix.
+
+    Appending only writes the new rows; once full, the oldest bars are
+    overwritten. to_frame() rebuilds a DataFrame with the original
+    columns, dtypes and index name.
+    """
+
+    def __init__(self, capacity: int, template: pd.DataFrame):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.columns = template.columns
+        self.dtypes = template.dtypes
+        self.index_name = template.index.name
+        self._ts = np.zeros(capacity, dtype=np.int64)
+        self._values = np.full((capacity, len(self.columns)), np.nan)
+        self._head = 0  # slot the next bar is written to
+        self.size = 0
+
+    @property
+    def last_ts(self) -> Optional[pd.Timestamp]:
+        if self.size == 0:
+            return None
+        return pd.Timestamp(self._ts[(self._head - 1) % self.capacity])
+
+    def _write(self, ts: np.ndarray, values: np.ndarray) -> None:
+        n = len(ts)
+        if n > self.capacity:
+            ts, values = ts[-self.capacity:], values[-self.capacity:]
+            n = self.capacity
+        slots = (self._head + np.arange(n)) % self.capacity
+        self._ts[slots] = ts
+        self._values[slots] = values
+        self._head = (self._head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def merge(self, df: pd.DataFrame) -> int:
+        """
+        Merge bars from `df` (same columns, DatetimeIndex). A bar with the
+        current tail's timestamp replaces it (an in-progress bar that has
+        since moved on); older bars are ignored; newer bars are appended.
+        Returns the number of bars appended.
+        """
+        if df is None or df.empty:
+            return 0
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        ts = pd.DatetimeIndex(df.index).asi8
+        values = df.reindex(columns=self.columns).to_numpy(dtype=np.float64)
+
+        if self.size:
+            tail = self._ts[(self._head - 1) % self.capacity]
+            same = np.flatnonzero(ts == tail)
+            if len(same):
+                self._values[(self._head - 1) % self.capacity] = values[same[-1]]
+            newer = ts > tail
+            ts, values = ts[newer], values[newer]
+
+        self._write(ts, values)
+        return len(ts)
+
+    def to_frame(self, n: Optional[int] = None) -> pd.DataFrame:
+        """The last `n` bars (all cached bars if None), oldest first."""
+        n = self.size if n is None else min(n, self.size)
+        slots = (self._head - n + np.arange(n)) % self.capacity
+        index = pd.DatetimeIndex(self._ts[slots].view("M8[ns]"), name=self.index_name)
+        df = pd.DataFrame(self._values[slots], index=index, columns=self.columns)
+        return df.astype(self.dtypes.to_dict(), copy=False)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0          # served from the window plus a tail-only fetch
+    misses: int = 0        # full provider fetch (cold / window too small)
+    bars_fetched: int = 0  # rows returned by the wrapped provider
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "bars_fetched": self.bars_fetched}
+
+
+@dataclass
+class CachingProvider:
+    """
+    MarketDataProvider wrapper keeping a BarWindow per (symbol, timeframe).
+
+    The first call for a key does a normal get_ohlcv() and fills the
+    window. Later calls ask the wrapped provider only for bars since the
+    cached tail (get_ohlcv_since, when it has one), merge them into the
+    window and return the last `lookback` bars from memory. Providers
+    without get_ohlcv_since are fetched in full every time.
+
+    Each window keeps `headroom` x lookback bars so a strategy that
+    asks for a slightly longer lookback does not force a refetch.
+    """
+
+    provider: MarketDataProvider
+    headroom: float = 2.0
+    stats: CacheStats = field(default_factory=CacheStats)
+    _windows: Dict[Tuple[str, str], BarWindow] = field(default_factory=dict, repr=False)
+    _lookbacks: Dict[Tuple[str, str], int] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        lookback: int,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        key = (symbol, timeframe)
+        window = self._windows.get(key)
+        fetch_since = getattr(self.provider, "get_ohlcv_since", None)
+
+        covered = window is not None and (
+            window.size >= lookback or lookback <= self._lookbacks.get(key, 0)
+        )
+        if covered and fetch_since is not None:
+            since = window.last_ts.to_pydatetime()
+            fresh = fetch_since(symbol=symbol, timeframe=timeframe, since=since, now=now)
+            window.merge(fresh)
+            self._count(hit=True, bars=0 if fresh is None else len(fresh))
+            return window.to_frame(lookback)
+
+        df = self.provider.get_ohlcv(symbol=symbol, timeframe=timeframe, lookback=lookback, now=now)
+        self._count(hit=False, bars=0 if df is None else len(df))
+        if df is None or df.empty:
+            return df
+
+        window = BarWindow(max(int(lookback * self.headroom), lookback), df)
+        window.merge(df)
+        with self._lock:
+            self._windows[key] = window
+            self._lookbacks[key] = lookback
+        return window.to_frame(lookback)
+
+    def close(self) -> None:
+        close = getattr(self.provider, "close", None)
+        if close is not None:
+            close()
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop cached windows (all, or just those of `symbol`)."""
+        with self._lock:
+            for key in list(self._windows):
+                if symbol is None or key[0] == symbol:
+                    del self._windows[key]
+                    self._lookbacks.pop(key, None)
+
+    def _count(self, hit: bool, bars: int) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            self.stats.bars_fetched += bars
@@ -4,10 +4,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Protocol, Optional
+from typing import TYPE_CHECKING, Protocol, Optional
 
 import pandas as pd
 
+if TYPE_CHECKING:
+    from ..config import ProviderResilienceConfig
+
 
 class MarketDataProvider(Protocol):
     def get_ohlcv(
@@ -20,6 +23,22 @@ class MarketDataProvider(Protocol):
         ...
 
 
+class IncrementalMarketDataProvider(MarketDataProvider, Protocol):
+    """
+    Provider that can also fetch only the bars at or after `since`
+    (used by data.cache.CachingProvider to top up its window).
+    """
+
+    def get_ohlcv_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: datetime,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        ...
+
+
 @dataclass
 class DummyProvider:
     """
@@ -39,15 +58,43 @@ class DummyProvider:
         if now is None:
             now = datetime.utcnow()
 
+        delta = self._bar_length(timeframe)
+        dates = [now - i * delta for i in range(lookback)][::-1]
+        return self._bars(dates)
+
+    def get_ohlcv_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: datetime,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        if now is None:
+            now = datetime.utcnow()
+
+        delta = self._bar_length(timeframe)
+        n = max(int((now - since) / delta) + 1, 0)
+        dates = [now - i * delta for i in range(n)][::-1]
+        return self._bars(dates)
+
+    @staticmethod
+    def _bar_length(timeframe: str) -> timedelta:
         # crude mapping of timeframe -> bar length
         tf_map = {
+            "1m": timedelta(minutes=1),
+            "5m": timedelta(minutes=5),
+            "15m": timedelta(minutes=15),
             "4h": timedelta(hours=4),
             "1h": timedelta(hours=1),
             "1d": timedelta(days=1),
         }
-        delta = tf_map.get(timeframe, timedelta(hours=4))
+        return tf_map.get(timeframe, timedelta(hours=4))
 
-        dates = [now - i * delta for i in range(lookback)][::-1]
+    @staticmethod
+    def _bars(dates) -> pd.DataFrame:
+        import numpy as np
+
+        lookback = len(dates)
         prices = np.cumsum(np.random.normal(0, 1, size=lookback)) + 100.0
 
         df = pd.DataFrame(
@@ -70,6 +117,8 @@ class YahooFinanceProvider:
     NOTE: yfinance must be installed in your environment.
     """
 
+    timeout: float = 10.0  # seconds, passed to yf.download
+
     def get_ohlcv(
         self,
         symbol: str,
@@ -77,27 +126,54 @@ class YahooFinanceProvider:
         lookback: int,
         now: Optional[datetime] = None,
     ) -> pd.DataFrame:
+        if now is None:
+            now = datetime.utcnow()
+        # Rough start date: lookback * timeframe length
+        # we’ll just pull a bit more and trim
+        period = "60d"  # safe default; you can refine
+        if timeframe.endswith("m"):
+            period = "7d"  # Yahoo only serves minute bars for the last few days
+
+        data = self._download(symbol, timeframe, period=period, timeout=self.timeout)
+        if data.empty:
+            return data
+
+        if len(data) > lookback:
+            data = data.iloc[-lookback:]
+        return data
+
+    def get_ohlcv_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: datetime,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        data = self._download(symbol, timeframe, start=since, timeout=self.timeout)
+        if data.empty:
+            return data
+        return data[data.index >= since]
+
+    @staticmethod
+    def _download(symbol: str, timeframe: str, **kwargs) -> pd.DataFrame:
         import yfinance as yf
 
         # Map timeframe to yfinance interval
         interval_map = {
+            "1m": "1m",
+            "5m": "5m",
+            "15m": "15m",
             "1h": "60m",
             "4h": "4h",
             "1d": "1d",
         }
         interval = interval_map.get(timeframe, "4h")
 
-        if now is None:
-            now = datetime.utcnow()
-        # Rough start date: lookback * timeframe length
-        # we’ll just pull a bit more and trim
-        period = "60d"  # safe default; you can refine
-
         data = yf.download(
             tickers=symbol,
-            period=period,
             interval=interval,
             progress=False,
+            **kwargs,
         )
 
         if data.empty:
@@ -114,18 +190,72 @@ class YahooFinanceProvider:
             }
         )
 
-        if len(data) > lookback:
-            data = data.iloc[-lookback:]
-
         data.index = data.index.tz_localize(None)
         data.index.name = "timestamp"
         return data
 
 
-def get_market_data_provider(name: str) -> MarketDataProvider:
+def get_market_data_provider(
+    name: str,
+    cache: bool = False,
+    resilience: Optional["ProviderResilienceConfig"] = None,
+    deadline: Optional[float] = None,
+) -> MarketDataProvider:
+    """
+    Build a provider by name, wrapped as in wrap_provider().
+    """
     if name == "yahoo":
-        return YahooFinanceProvider()
+        provider = YahooFinanceProvider()
     elif name == "dummy":
-        return DummyProvider()
+        provider = DummyProvider()
     else:
         raise ValueError(f"Unknown data provider: {name}")
+    return wrap_provider(provider, cache=cache, resilience=resilience, deadline=deadline)
+
+
+def wrap_provider(
+    provider: MarketDataProvider,
+    cache: bool = False,
+    resilience: Optional["ProviderResilienceConfig"] = None,
+    deadline: Optional[float] = None,
+) -> MarketDataProvider:
+    """
+    With `resilience`, wrap `provider` in a ResilientProvider (timeouts,
+    retries, circuit breaker, rate limit); with cache=True, wrap the
+    result in a CachingProvider.
+
+    `deadline` caps one whole call including retries; pass the fetch
+    timeout (SystemConfig.fetch_timeout_seconds) so calls end when
+    fetch_all stops waiting for them.
+    """
+    if resilience is not None:
+        from .resilience import CircuitBreaker, ResilientProvider, RetryPolicy, TokenBucket
+
+        if resilience.call_timeout_seconds is not None and isinstance(provider, YahooFinanceProvider):
+            provider.timeout = resilience.call_timeout_seconds
+        provider = ResilientProvider(
+            provider,
+            call_timeout=resilience.call_timeout_seconds,
+            retry=RetryPolicy(
+                attempts=resilience.attempts,
+                base_delay=resilience.backoff_base_seconds,
+                max_delay=resilience.backoff_max_seconds,
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=resilience.breaker_failures,
+                reset_seconds=resilience.breaker_reset_seconds,
+            ),
+            limiter=(
+                TokenBucket(rate=resilience.rate_per_second, burst=resilience.rate_burst)
+                if resilience.rate_per_second
+                else None
+            ),
+            deadline=deadline,
+            empty_ttl_seconds=resilience.empty_ttl_seconds,
+        )
+
+    if cache:
+        from .cache import CachingProvider
+
+        return CachingProvider(provider)
+    return provider
@@ -0,0 +1,292 @@
+# system_live/data/resilience.py
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .data_provider import MarketDataProvider
+
+
+class ProviderError(RuntimeError):
+    """A provider call failed after all retries."""
+
+
+class ProviderTimeout(ProviderError, TimeoutError):
+    """A single provider call exceeded its timeout."""
+
+
+class CircuitOpenError(ProviderError):
+    """Calls for this symbol are suspended after repeated failures."""
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: before retry k (1-based) sleep
+    uniform(0, min(max_delay, base_delay * 2**(k-1))) seconds.
+    """
+    attempts: int = 3            # total tries, including the first
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, retry: int, rng: random.Random) -> float:
+        return rng.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** (retry - 1))))
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Per-symbol breaker: after `failure_threshold` consecutive failed calls
+    the symbol is skipped for `reset_seconds`; then one trial call is let
+    through (half-open) and its outcome closes or re-opens the breaker.
+    """
+    failure_threshold: int = 3
+    reset_seconds: float = 300.0
+    clock: Callable[[], float] = time.monotonic
+    _failures: Dict[str, int] = field(default_factory=dict)
+    _opened_at: Dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def allow(self, symbol: str) -> bool:
+        with self._lock:
+            opened = self._opened_at.get(symbol)
+            if opened is None:
+                return True
+            if self.clock() - opened >= self.reset_seconds:
+                # half-open: let one call through, re-open on failure
+                self._opened_at[symbol] = self.clock()
+                return True
+            return False
+
+    def record_success(self, symbol: str) -> None:
+        with self._lock:
+            self._failures.pop(symbol, None)
+            self._opened_at.pop(symbol, None)
+
+    def record_failure(self, symbol: str) -> bool:
+        """Returns True if this failure opened (or re-opened) the breaker."""
+        with self._lock:
+            n = self._failures.get(symbol, 0) + 1
+            self._failures[symbol] = n
+            if n >= self.failure_threshold:
+                self._opened_at[symbol] = self.clock()
+                return True
+            return False
+
+    def is_open(self, symbol: str) -> bool:
+        return symbol in self._opened_at
+
+
+@dataclass
+class TokenBucket:
+    """Global rate limiter: `rate` calls per second on average, bursts up to `burst`."""
+    rate: float
+    burst: int = 1
+    clock: Callable[[], float] = time.monotonic
+    sleep: Callable[[float], None] = time.sleep
+    _tokens: float = field(default=-1.0, repr=False)
+    _updated: float = field(default=0.0, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError("rate must be positive")
+        self._tokens = float(self.burst)
+        self._updated = self.clock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to `timeout` seconds (forever if None)."""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self.sleep(wait)
+
+
+@dataclass
+class ResilienceStats:
+    calls: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    failures: int = 0            # calls that failed after all retries
+    circuit_rejections: int = 0
+    circuit_opens: int = 0
+    empty_cache_hits: int = 0
+    rate_limited: int = 0        # calls that could not get a token in time
+
+
+@dataclass
+class ResilientProvider:
+    """
+    MarketDataProvider wrapper that keeps one bad ticker or a slow
+    upstream from stalling a cycle:
+
+    - call_timeout: each attempt runs on a worker thread and is abandoned
+      after this many seconds (raises ProviderTimeout internally)
+    - retry: jittered exponential backoff between attempts
+    - breaker: per-symbol circuit breaker; open symbols fail fast with
+      CircuitOpenError
+    - limiter: optional global TokenBucket, one token per attempt
+    - deadline: budget for one whole call (attempts, token waits and
+      backoff). No retry starts once it is spent and each wait is cut to
+      what is left, so a call gives up (and updates the breaker) no later
+      than the fetch_all timeout that abandons it
+    - empty_ttl_seconds: a symbol whose get_ohlcv came back empty is
+      answered with an empty frame, without calling upstream, for this
+      long (negative cache)
+
+    Errors surface as ProviderError subclasses, which fetch_all reports
+    per instrument.
+    """
+
+    provider: MarketDataProvider
+    call_timeout: Optional[float] = 20.0
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    limiter: Optional[TokenBucket] = None
+    deadline: Optional[float] = None
+    empty_ttl_seconds: float = 3600.0
+    max_workers: int = 32
+    clock: Callable[[], float] = time.monotonic
+    sleep: Callable[[float], None] = time.sleep
+    seed: Optional[int] = None
+    stats: ResilienceStats = field(default_factory=ResilienceStats)
+    _empty_until: Dict[Tuple[str, str], float] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="provider")
+        if not hasattr(self.provider, "get_ohlcv_since"):
+            # Hide the incremental API when the wrapped provider lacks it
+            # (CachingProvider looks it up with getattr).
+            self.get_ohlcv_since = None
+
+    def get_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        lookback: int,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        key = (symbol, timeframe)
+        with self._lock:
+            until = self._empty_until.get(key)
+            if until is not None and self.clock() < until:
+                self.stats.empty_cache_hits += 1
+                return pd.DataFrame()
+
+        df = self._call(
+            self.provider.get_ohlcv,
+            dict(symbol=symbol, timeframe=timeframe, lookback=lookback, now=now),
+        )
+        with self._lock:
+            if df is None or df.empty:
+                self._empty_until[key] = self.clock() + self.empty_ttl_seconds
+            else:
+                self._empty_until.pop(key, None)
+        return df
+
+    def get_ohlcv_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: datetime,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        # No negative caching here: "no bars since the tail" is normal.
+        return self._call(
+            self.provider.get_ohlcv_since,
+            dict(symbol=symbol, timeframe=timeframe, since=since, now=now),
+        )
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- Internals --- #
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + n)
+
+    def _attempt(self, fn: Callable[..., Any], kwargs: Dict[str, Any], timeout: Optional[float]) -> Any:
+        if timeout is None:
+            return fn(**kwargs)
+        future = self._pool.submit(fn, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._count("timeouts")
+            raise ProviderTimeout(f"call exceeded {timeout:g}s") from None
+
+    def _call(self, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+        symbol = kwargs["symbol"]
+        self._count("calls")
+        if not self.breaker.allow(symbol):
+            self._count("circuit_rejections")
+            raise CircuitOpenError(f"circuit open for {symbol}")
+
+        started = self.clock()
+
+        def remaining() -> Optional[float]:
+            if self.deadline is None:
+                return None
+            return self.deadline - (self.clock() - started)
+
+        def wait_limit() -> Optional[float]:
+            left = remaining()
+            if left is None:
+                return self.call_timeout
+            return left if self.call_timeout is None else min(self.call_timeout, left)
+
+        last_exc: Optional[BaseException] = None
+        for attempt in range(1, max(self.retry.attempts, 1) + 1):
+            if attempt > 1:
+                left = remaining()
+                if left is not None and left <= 0:
+                    break
+                self._count("retries")
+                delay = self.retry.delay(attempt - 1, self._rng)
+                self.sleep(delay if left is None else min(delay, left))
+                left = remaining()
+                if left is not None and left <= 0:
+                    break
+            if self.limiter is not None and not self.limiter.acquire(timeout=wait_limit()):
+                self._count("rate_limited")
+                last_exc = ProviderError("rate limiter: no token within the call timeout")
+                continue
+            try:
+                result = self._attempt(fn, kwargs, wait_limit())
+            except Exception as exc:
+                last_exc = exc
+                continue
+            self.breaker.record_success(symbol)
+            return result
+
+        self._count("failures")
+        if self.breaker.record_failure(symbol):
+            self._count("circuit_opens")
+        if isinstance(last_exc, ProviderError):
+            raise last_exc
+        raise ProviderError(f"{type(last_exc).__name__}: {last_exc}") from last_exc
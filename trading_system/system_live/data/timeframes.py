@@ -0,0 +1,108 @@
+# system_live/data/timeframes.py
+
+from __future__ import annotations
+
+import math
+import re
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Union
+
+import pandas as pd
+
+# A timeframe string ("15m", "4h", "1d") or the bar length itself.
+Timeframe = Union[str, timedelta]
+
+_TIMEFRAME_RE = re.compile(r"^(\d+)\s*(m|min|h|d|w)$", re.IGNORECASE)
+_UNIT_SECONDS = {"m": 60, "min": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+_EPOCH = datetime(1970, 1, 1)
+
+_OHLCV_AGG = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "adj_close": "last",
+    "volume": "sum",
+}
+
+
+def timeframe_to_timedelta(timeframe: Timeframe) -> timedelta:
+    """'15m' / '1h' / '4h' / '1d' -> timedelta."""
+    if isinstance(timeframe, timedelta):
+        return timeframe
+    match = _TIMEFRAME_RE.match(timeframe.strip())
+    if match is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+    n, unit = int(match.group(1)), match.group(2).lower()
+    if n <= 0:
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+    return timedelta(seconds=n * _UNIT_SECONDS[unit])
+
+
+def common_step(timeframes: Iterable[Timeframe]) -> timedelta:
+    """Longest bar length every timeframe is a multiple of (their GCD)."""
+    seconds = [int(timeframe_to_timedelta(tf).total_seconds()) for tf in timeframes]
+    if not seconds:
+        raise ValueError("No timeframes given")
+    return timedelta(seconds=math.gcd(*seconds))
+
+
+def resample_factor(timeframe: Timeframe, base: Timeframe) -> Optional[int]:
+    """How many `base` bars make one `timeframe` bar, or None if not a multiple."""
+    step = timeframe_to_timedelta(timeframe)
+    base_step = timeframe_to_timedelta(base)
+    if step < base_step or step % base_step:
+        return None
+    return step // base_step
+
+
+def last_bar_close(now: datetime, timeframe: Timeframe) -> datetime:
+    """
+    Most recent bar close at or before `now` (naive UTC).
+
+    Bars are aligned to the Unix epoch, i.e. 4h bars close at 00:00,
+    04:00, ... UTC and daily bars at midnight UTC.
+    """
+    step = timeframe_to_timedelta(timeframe)
+    return _EPOCH + ((now - _EPOCH) // step) * step
+
+
+def is_bar_close(ts: datetime, timeframe: Timeframe) -> bool:
+    return last_bar_close(ts, timeframe) == ts
+
+
+def bar_closes_between(
+    after: Optional[datetime],
+    until: datetime,
+    timeframe: Timeframe,
+) -> List[datetime]:
+    """
+    Bar closes in (after, until], oldest first. With after=None only the
+    latest close is returned (nothing to catch up on a first start).
+    """
+    step = timeframe_to_timedelta(timeframe)
+    latest = last_bar_close(until, step)
+    if after is None:
+        return [latest]
+    closes = []
+    t = last_bar_close(after, step) + step
+    while t <= latest:
+        closes.append(t)
+        t += step
+    return closes
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: Timeframe) -> pd.DataFrame:
+    """
+    Aggregate lower-timeframe OHLCV bars (open, high, low, close, volume
+    columns; index = bar open time) into `timeframe` bars aligned to the
+    epoch, like the daemon's schedule. Buckets without bars are dropped;
+    the last bucket may be incomplete if its bars are still arriving.
+    """
+    step = timeframe_to_timedelta(timeframe)
+    agg = {col: how for col, how in _OHLCV_AGG.items() if col in df.columns}
+    out = df.resample(step, origin="epoch", label="left", closed="left").agg(agg)
+    out = out.dropna(subset=["close"])
+    out.index.name = df.index.name
+    return out
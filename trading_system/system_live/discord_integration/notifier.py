@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import List
 
-from ..execution.trade_types import ProposedTrade, Signal
+from ..execution.trade_types import ProposedTrade, Signal, TradeExit
 
 
 def notify_new_entry_signal(signal: Signal, trade: ProposedTrade) -> None:
@@ -29,3 +29,14 @@ def notify_exit_signal(signal: Signal, affected_trade_ids: List[int]) -> None:
         f" {signal.strategy_name} {signal.instrument} {signal.direction}"
         f" price={signal.price:.2f} trades={affected_trade_ids}"
     )
+
+
+def notify_trade_closed(exit: TradeExit) -> None:
+    """
+    Placeholder for Discord notification when a trade hits its stop or target.
+    """
+    print(
+        "[DISCORD PLACEHOLDER] CLOSED:"
+        f" {exit.strategy_name} {exit.instrument} {exit.direction} trade={exit.trade_id}"
+        f" {exit.reason} price={exit.exit_price:.2f} pnl={exit.realised_pnl:.2f}"
+    )
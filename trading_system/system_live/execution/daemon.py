@@ -0,0 +1,172 @@
+# system_live/execution/daemon.py
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from ..config import SystemConfig
+from ..data.data_provider import MarketDataProvider
+from ..data.timeframes import bar_closes_between, common_step, last_bar_close
+from .monitor import TradeMonitor
+from .runner import RunnerContext, run_cycle
+
+
+@dataclass
+class LiveDaemon:
+    """
+    Long-running live runner.
+
+    Keeps one RunnerContext (DB connection, provider, strategy instance)
+    alive, wakes `settle_seconds` after each bar close (of the finest
+    step that covers every strategy timeframe, see `step`) and runs one
+    cycle per close; run_cycle skips strategies whose bar has not
+    closed. The last processed close is persisted in the DB, so after
+    downtime the closes that were missed (at most `max_catch_up`, oldest
+    dropped first) are replayed in order before waiting for the next one.
+
+    Between cycles, a TradeMonitor (config.monitor_seconds) closes open
+    trades of live-mode strategies whose stop or target was hit (paper
+    trades are closed by the runner's PaperEngine).
+
+    clock / sleep (and the provider) are injectable for tests, replays
+    and load tests.
+    """
+
+    config: SystemConfig
+    settle_seconds: float = 30.0
+    max_catch_up: int = 50
+    clock: Callable[[], datetime] = datetime.utcnow
+    sleep: Callable[[float], None] = time.sleep
+    max_sleep_seconds: float = 60.0
+    provider: Optional[MarketDataProvider] = None  # default: built from config.data_provider
+    ctx: Optional[RunnerContext] = None
+    monitor: Optional[TradeMonitor] = None
+    _stopping: bool = field(default=False, init=False, repr=False)
+
+    @property
+    def step(self) -> timedelta:
+        """
+        Wake-up period: the GCD of all strategy timeframes, so every
+        strategy's bar closes are hit.
+        """
+        return common_step(s.timeframe for s in self.config.get_strategies())
+
+    @property
+    def state_key(self) -> str:
+        return f"last_bar_close:{int(self.step.total_seconds())}s"
+
+    # --- Lifecycle --- #
+
+    def start(self) -> None:
+        if self.ctx is None:
+            self.ctx = RunnerContext.from_config(self.config, provider=self.provider)
+        if self.monitor is None and self.config.monitor_seconds:
+            self.monitor = TradeMonitor(
+                config=self.config,
+                db=self.ctx.db,
+                provider=self.ctx.provider,
+                timeframe=self.config.monitor_timeframe,
+                interval_seconds=self.config.monitor_seconds,
+                clock=self.clock,
+                paper_instances=frozenset(
+                    run.instance_id for run in self.ctx.runs if run.runtime.mode == "paper"
+                ),
+            )
+
+    def stop(self) -> None:
+        """Ask run_forever() to return after the current cycle / sleep."""
+        self._stopping = True
+
+    def close(self) -> None:
+        if self.ctx is not None:
+            self.ctx.close()
+            self.ctx = None
+        self.monitor = None
+
+    # --- State --- #
+
+    def last_processed(self) -> Optional[datetime]:
+        value = self.ctx.db.get_state(self.state_key)
+        return datetime.fromisoformat(value) if value else None
+
+    # --- Scheduling --- #
+
+    def next_wakeup(self, now: datetime) -> datetime:
+        """First (bar close + settle delay) strictly after `now`."""
+        settle = timedelta(seconds=self.settle_seconds)
+        close = last_bar_close(now - settle, self.step) + self.step
+        return close + settle
+
+    def pending_closes(self, now: datetime) -> List[datetime]:
+        """Bar closes that have settled by `now` but were not processed yet."""
+        settled = now - timedelta(seconds=self.settle_seconds)
+        closes = bar_closes_between(self.last_processed(), settled, self.step)
+        if len(closes) > self.max_catch_up:
+            print(
+                f"[WARN] {len(closes)} bar closes missed; "
+                f"catching up the last {self.max_catch_up} only."
+            )
+            closes = closes[-self.max_catch_up:]
+        return closes
+
+    def catch_up(self) -> int:
+        """Run one cycle per pending bar close. Returns the number of cycles run."""
+        self.start()
+        closes = self.pending_closes(self.clock())
+        ran = 0
+        for close in closes:
+            if self._stopping:
+                break
+            print(f"[INFO] Cycle for bar close {close.isoformat()}Z")
+            try:
+                # marked processed in the cycle's own transaction
+                metrics = run_cycle(
+                    self.ctx, now=close, bar_close=close,
+                    state={self.state_key: close.isoformat()},
+                )
+            except Exception as exc:  # keep the daemon alive; retry on next wake-up
+                print(f"[ERROR] Cycle for {close.isoformat()}Z failed: {type(exc).__name__}: {exc}")
+                return ran
+            print(f"[INFO] Cycle done in {metrics.summary()}")
+            ran += 1
+        return ran
+
+    def check_trades(self) -> int:
+        """Run the trade monitor once. Returns the number of trades closed."""
+        try:
+            exits = self.monitor.check(self.clock())
+        except Exception as exc:  # keep the daemon alive; retry on next check
+            print(f"[ERROR] Trade monitor failed: {type(exc).__name__}: {exc}")
+            return 0
+        if exits:
+            print(f"[INFO] Monitor closed {len(exits)} trade(s)")
+        return len(exits)
+
+    def _sleep_until(self, target: datetime) -> None:
+        # Sleep in slices so stop(), wall-clock jumps and monitor checks are noticed.
+        while not self._stopping:
+            now = self.clock()
+            remaining = (target - now).total_seconds()
+            if remaining <= 0:
+                return
+            if self.monitor is not None:
+                due = self.monitor.seconds_until_due(now)
+                if due <= 0:
+                    self.check_trades()
+                    continue
+                remaining = min(remaining, due)
+            self.sleep(min(remaining, self.max_sleep_seconds))
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stopping:
+                self.catch_up()
+                wakeup = self.next_wakeup(self.clock())
+                print(f"[INFO] Next cycle at {wakeup.isoformat()}Z")
+                self._sleep_until(wakeup)
+        finally:
+            self.close()
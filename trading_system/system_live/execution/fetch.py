@@ -0,0 +1,107 @@
+# system_live/execution/fetch.py
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..data.data_provider import MarketDataProvider
+
+
+@dataclass(frozen=True)
+class FetchRequest:
+    """One provider.get_ohlcv call: bars of `symbol` at `timeframe`."""
+    symbol: str
+    timeframe: str
+    lookback: int
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one provider.get_ohlcv call."""
+    symbol: str
+    df: Optional[pd.DataFrame] = None
+    error: Optional[str] = None
+    elapsed_s: float = 0.0
+    timed_out: bool = False
+
+
+def fetch_all(
+    provider: MarketDataProvider,
+    requests: List[FetchRequest],
+    now: Optional[datetime] = None,
+    workers: int = 16,
+    timeout_seconds: Optional[float] = 30.0,
+) -> Dict[Tuple[str, str], FetchResult]:
+    """
+    Run all fetch requests, up to `workers` at a time.
+
+    Each fetch gets `timeout_seconds` from the moment a worker starts it;
+    a fetch that overruns is reported as an error and abandoned (the
+    thread cannot be interrupted, but the cycle no longer waits for it).
+    Provider exceptions are caught and reported per request.
+
+    Returns {(symbol, timeframe): FetchResult} for every request, in
+    `requests` order, so callers can process instruments deterministically.
+    """
+    results: Dict[FetchRequest, FetchResult] = {}
+
+    def fetch(req: FetchRequest, started: Dict[FetchRequest, float]) -> FetchResult:
+        started[req] = time.monotonic()
+        try:
+            df = provider.get_ohlcv(
+                symbol=req.symbol,
+                timeframe=req.timeframe,
+                lookback=req.lookback,
+                now=now,
+            )
+            return FetchResult(req.symbol, df=df, elapsed_s=time.monotonic() - started[req])
+        except Exception as exc:  # one bad instrument must not sink the cycle
+            return FetchResult(
+                req.symbol,
+                error=f"{type(exc).__name__}: {exc}",
+                elapsed_s=time.monotonic() - started[req],
+                timed_out=isinstance(exc, TimeoutError),
+            )
+
+    if workers <= 1 or len(requests) <= 1:
+        return {(r.symbol, r.timeframe): fetch(r, {}) for r in requests}
+
+    started: Dict[FetchRequest, float] = {}
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(requests)), thread_name_prefix="fetch")
+    pending: Dict[Future, FetchRequest] = {pool.submit(fetch, r, started): r for r in requests}
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=_poll_interval(timeout_seconds), return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[pending.pop(fut)] = fut.result()
+
+            if timeout_seconds is None:
+                continue
+            clock = time.monotonic()
+            for fut, req in list(pending.items()):
+                t0 = started.get(req)
+                if t0 is not None and clock - t0 > timeout_seconds and not fut.done():
+                    del pending[fut]
+                    results[req] = FetchResult(
+                        req.symbol,
+                        error=f"timed out after {timeout_seconds:g}s",
+                        elapsed_s=clock - t0,
+                        timed_out=True,
+                    )
+    finally:
+        # Don't block the cycle on abandoned (timed out) fetches.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return {(r.symbol, r.timeframe): results[r] for r in requests}
+
+
+def _poll_interval(timeout_seconds: Optional[float]) -> Optional[float]:
+    if timeout_seconds is None:
+        return None
+    return min(0.25, max(timeout_seconds / 10.0, 0.01))
@@ -0,0 +1,196 @@
+# system_live/execution/metrics.py
+
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Stages timed per instrument (and summed per cycle).
+STAGES = ("fetch", "paper", "indicators", "signals", "db", "notify")
+
+# Counters recorded per cycle.
+COUNTERS = (
+    "instruments",
+    "signals",
+    "entry_signals",
+    "exit_signals",
+    "trades",
+    "paper_fills",
+    "paper_closes",
+    "provider_errors",
+    "provider_timeouts",
+    "no_data",
+    "cache_hits",
+    "cache_misses",
+)
+
+
+@dataclass
+class CycleMetrics:
+    """
+    Timings and counters of one live cycle.
+
+        metrics = CycleMetrics(bar_close=bar_close)
+        with metrics.time("signals", strategy.name, symbol):
+            signals = strategy.generate_signals(df_ind, open_for_inst)
+        metrics.count("signals", len(signals))
+        metrics.finish()
+    """
+
+    bar_close: Optional[datetime] = None
+    cycle_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    duration_s: float = 0.0
+    counters: Dict[str, float] = field(default_factory=lambda: {c: 0 for c in COUNTERS})
+    stage_s: Dict[str, float] = field(default_factory=lambda: {s: 0.0 for s in STAGES})
+    # (strategy, instrument) -> stage -> seconds; strategy is "" for shared fetches
+    instrument_s: Dict[Tuple[str, str], Dict[str, float]] = field(
+        default_factory=lambda: defaultdict(dict)
+    )
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    @contextmanager
+    def time(self, stage: str, strategy: str = "", instrument: str = "") -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - t0, strategy, instrument)
+
+    def add_time(self, stage: str, seconds: float, strategy: str = "", instrument: str = "") -> None:
+        """Record a stage duration; per-instrument when `instrument` is set."""
+        if instrument:
+            per = self.instrument_s[(strategy, instrument)]
+            per[stage] = per.get(stage, 0.0) + seconds
+        if stage != "fetch":  # cycle-level fetch is wall time, set by the runner
+            self.stage_s[stage] = self.stage_s.get(stage, 0.0) + seconds
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self) -> "CycleMetrics":
+        self.duration_s = time.perf_counter() - self._t0
+        return self
+
+    def summary(self) -> str:
+        c = self.counters
+        errors = c["provider_errors"] + c["provider_timeouts"]
+        return (
+            f"{self.duration_s:.2f}s (fetch {self.stage_s['fetch']:.2f}s), "
+            f"instruments={c['instruments']:g} signals={c['signals']:g} "
+            f"trades={c['trades']:g} provider_errors={errors:g}"
+        )
+
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        total = self.counters["cache_hits"] + self.counters["cache_misses"]
+        return self.counters["cache_hits"] / total if total else None
+
+    def rows(self) -> List[Tuple[Any, ...]]:
+        """
+        Long-format rows for TradingDatabase.insert_cycle_metrics:
+        (cycle_id, started_at, bar_close, strategy, instrument, name, value)
+        """
+        started = self.started_at.isoformat()
+        bar_close = self.bar_close.isoformat() if self.bar_close else None
+        rows: List[Tuple[Any, ...]] = [
+            (self.cycle_id, started, bar_close, None, None, "cycle_seconds", self.duration_s)
+        ]
+        rows += [
+            (self.cycle_id, started, bar_close, None, None, f"{stage}_seconds", value)
+            for stage, value in self.stage_s.items()
+        ]
+        rows += [
+            (self.cycle_id, started, bar_close, None, None, name, value)
+            for name, value in self.counters.items()
+        ]
+        for (strategy, instrument), stages in self.instrument_s.items():
+            rows += [
+                (self.cycle_id, started, bar_close, strategy or None, instrument, f"{stage}_seconds", value)
+                for stage, value in stages.items()
+            ]
+        return rows
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: Any) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+@dataclass
+class MetricsExporter:
+    """
+    Keeps running totals across cycles and writes them, plus the last
+    cycle's timings, as a Prometheus text-format file (for the node
+    exporter's textfile collector or any local scraper).
+
+    The file is written to a temporary name and renamed, so a scraper
+    never sees a half-written file.
+    """
+
+    textfile: Optional[str] = None
+    prefix: str = "trading_live"
+    cycles: int = 0
+    totals: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    last: Optional[CycleMetrics] = None
+
+    def observe(self, metrics: CycleMetrics) -> None:
+        self.cycles += 1
+        for name, value in metrics.counters.items():
+            self.totals[name] += value
+        self.last = metrics
+        if self.textfile:
+            self.write(self.textfile)
+
+    def render(self) -> str:
+        p = self.prefix
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, Any], float]]):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{p}_{name}{_labels(**labels)} {float(value)!r}")
+
+        metric("cycles_total", "counter", "Live cycles run.", [({}, self.cycles)])
+        for name in COUNTERS:
+            metric(f"{name}_total", "counter", f"Running total of {name.replace('_', ' ')}.",
+                   [({}, self.totals.get(name, 0))])
+
+        m = self.last
+        if m is not None:
+            metric("last_cycle_timestamp_seconds", "gauge", "Unix time the last cycle started.",
+                   [({}, (m.started_at - datetime(1970, 1, 1)).total_seconds())])
+            metric("cycle_duration_seconds", "gauge", "Wall time of the last cycle.",
+                   [({}, m.duration_s)])
+            metric("stage_duration_seconds", "gauge", "Time per stage in the last cycle.",
+                   [({"stage": s}, v) for s, v in m.stage_s.items()])
+            ratio = m.cache_hit_ratio
+            if ratio is not None:
+                metric("cache_hit_ratio", "gauge", "Bar cache hit ratio in the last cycle.",
+                       [({}, ratio)])
+            metric("instrument_stage_seconds", "gauge", "Time per instrument and stage in the last cycle.",
+                   [
+                       ({"strategy": strategy, "instrument": inst, "stage": stage}, v)
+                       for (strategy, inst), stages in sorted(m.instrument_s.items())
+                       for stage, v in stages.items()
+                   ])
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(self.render())
+        os.replace(tmp, path)
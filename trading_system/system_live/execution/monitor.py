@@ -0,0 +1,239 @@
+# system_live/execution/monitor.py
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import SystemConfig
+from ..data.data_provider import MarketDataProvider
+from ..data.timeframes import timeframe_to_timedelta
+from ..discord_integration import notifier
+from ..storage.db import TradingDatabase
+from .fetch import FetchRequest, fetch_all
+from .trade_types import Direction, TradeExit
+
+
+class _SortedLevels:
+    """Price levels sorted ascending, with the trade id of each level."""
+
+    def __init__(self, levels: List[float], ids: List[int]):
+        order = np.argsort(np.asarray(levels, dtype=np.float64), kind="stable")
+        self.levels = np.asarray(levels, dtype=np.float64)[order]
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+
+    def at_or_above(self, price: float) -> np.ndarray:
+        return self.ids[np.searchsorted(self.levels, price, side="left"):]
+
+    def at_or_below(self, price: float) -> np.ndarray:
+        return self.ids[:np.searchsorted(self.levels, price, side="right")]
+
+
+class LevelIndex:
+    """
+    Stop and target levels of one instrument's open trades, split by
+    direction and sorted, so the trades a bar breaches are found with a
+    binary search on its high / low instead of a scan over all trades:
+
+    - long stop hit:    stop   >= low
+    - long target hit:  target <= high
+    - short stop hit:   stop   <= high
+    - short target hit: target >= low
+    """
+
+    def __init__(self, trades: List[Dict]):
+        longs = [t for t in trades if t["direction"] == Direction.LONG.value]
+        shorts = [t for t in trades if t["direction"] == Direction.SHORT.value]
+        self.long_stops = _SortedLevels([t["stop_price"] for t in longs], [t["id"] for t in longs])
+        self.long_targets = _SortedLevels([t["target_price"] for t in longs], [t["id"] for t in longs])
+        self.short_stops = _SortedLevels([t["stop_price"] for t in shorts], [t["id"] for t in shorts])
+        self.short_targets = _SortedLevels([t["target_price"] for t in shorts], [t["id"] for t in shorts])
+
+    def breaches(self, high: float, low: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (ids whose stop is hit, ids whose target is hit) by a bar."""
+        stops = np.concatenate(
+            [self.long_stops.at_or_above(low), self.short_stops.at_or_below(high)]
+        )
+        targets = np.concatenate(
+            [self.long_targets.at_or_below(high), self.short_targets.at_or_above(low)]
+        )
+        return stops, targets
+
+
+@dataclass
+class TradeMonitor:
+    """
+    Checks open trades against their stop and target between strategy
+    cycles, on `timeframe` (1m by default) bars of the instruments that
+    have open trades only.
+
+    Each check() fetches the bars since the last one checked per trade
+    (the last bar is re-checked, as it may still be forming), walks them
+    in time order and closes every breached trade at its stop or target
+    price, in one batched DB update. A trade becomes eligible from the
+    close of the bar that opened it. If a bar hits both the stop and the
+    target, the stop wins (as in the system_development backtest, which
+    cannot tell which came first either).
+
+    Trades of the `paper_instances` (strategy instance ids, see
+    strategy_instance_id) are left to the PaperEngine (execution/paper.py),
+    which fills them with slippage on the strategy's own bars.
+    """
+
+    config: SystemConfig
+    db: TradingDatabase
+    provider: MarketDataProvider
+    timeframe: str = "1m"
+    interval_seconds: float = 60.0
+    max_lookback: int = 1440        # bars; older gaps (downtime) are not replayed
+    clock: Callable[[], datetime] = datetime.utcnow
+    paper_instances: FrozenSet[str] = frozenset()
+    _checked: Dict[int, datetime] = field(default_factory=dict, repr=False)
+    _indexes: Dict[str, Tuple[FrozenSet[int], LevelIndex]] = field(default_factory=dict, repr=False)
+    _last_run: Optional[datetime] = field(default=None, repr=False)
+
+    # --- Scheduling --- #
+
+    def seconds_until_due(self, now: Optional[datetime] = None) -> float:
+        if self._last_run is None:
+            return 0.0
+        elapsed = ((now or self.clock()) - self._last_run).total_seconds()
+        return max(self.interval_seconds - elapsed, 0.0)
+
+    # --- Checking --- #
+
+    def check(self, now: Optional[datetime] = None) -> List[TradeExit]:
+        """Close open trades whose stop / target was hit. Returns the exits."""
+        now = now or self.clock()
+        self._last_run = now
+        trades = [
+            t for t in self.db.get_open_trades_with_timeframe()
+            if t["strategy_instance"] not in self.paper_instances
+        ]
+        open_ids = {t["id"] for t in trades}
+        self._checked = {k: v for k, v in self._checked.items() if k in open_ids}
+        if not trades:
+            self._indexes.clear()
+            return []
+
+        by_instrument: Dict[str, List[Dict]] = {}
+        for t in trades:
+            by_instrument.setdefault(t["instrument"], []).append(t)
+        for symbol in list(self._indexes):
+            if symbol not in by_instrument:
+                del self._indexes[symbol]
+
+        bar = timeframe_to_timedelta(self.timeframe)
+        starts = {t["id"]: self._checked.get(t["id"]) or trade_active_from(t) for t in trades}
+        requests = []
+        for symbol, inst_trades in by_instrument.items():
+            since = min(starts[t["id"]] for t in inst_trades)
+            bars = math.ceil(max((now - since) / bar, 0)) + 2
+            requests.append(FetchRequest(symbol, self.timeframe, min(bars, self.max_lookback)))
+
+        fetched = fetch_all(
+            self.provider,
+            requests,
+            now=now,
+            workers=self.config.fetch_workers,
+            timeout_seconds=self.config.fetch_timeout_seconds,
+        )
+
+        exits: List[TradeExit] = []
+        for symbol, inst_trades in by_instrument.items():
+            result = fetched[(symbol, self.timeframe)]
+            if result.error is not None:
+                print(f"[WARN] Monitor fetch failed for {symbol}: {result.error}")
+                continue
+            if result.df is None or result.df.empty:
+                continue
+            exits += self._check_instrument(symbol, inst_trades, result.df, starts)
+
+        if exits:
+            self.db.close_trades(
+                [(e.trade_id, e.close_time, e.realised_pnl, e.exit_price, e.reason) for e in exits]
+            )
+            for e in exits:
+                self._checked.pop(e.trade_id, None)
+                notifier.notify_trade_closed(e)
+        return exits
+
+    def _index(self, symbol: str, trades: List[Dict]) -> LevelIndex:
+        ids = frozenset(t["id"] for t in trades)
+        cached = self._indexes.get(symbol)
+        if cached is None or cached[0] != ids:
+            cached = (ids, LevelIndex(trades))
+            self._indexes[symbol] = cached
+        return cached[1]
+
+    def _check_instrument(
+        self,
+        symbol: str,
+        trades: List[Dict],
+        df: pd.DataFrame,
+        starts: Dict[int, datetime],
+    ) -> List[TradeExit]:
+        first = min(starts[t["id"]] for t in trades)
+        df = df[df.index >= first]
+        if df.empty:
+            return []
+
+        index = self._index(symbol, trades)
+        by_id = {t["id"]: t for t in trades}
+        inst_cfg = self.config.get_instrument_config(symbol)
+        point_value = inst_cfg.point_value if inst_cfg else 1.0
+
+        times = df.index.to_pydatetime()
+        highs = df["high"].to_numpy(dtype=np.float64)
+        lows = df["low"].to_numpy(dtype=np.float64)
+        exits: List[TradeExit] = []
+        closed = set()
+        for ts, high, low in zip(times, highs, lows):
+            stop_ids, target_ids = index.breaches(high, low)
+            # stops first: a bar hitting both is counted as a stop-out
+            for reason, ids in (("stop", stop_ids), ("target", target_ids)):
+                for trade_id in ids.tolist():
+                    if trade_id in closed or ts < starts[trade_id]:
+                        continue
+                    closed.add(trade_id)
+                    exits.append(_exit(by_id[trade_id], reason, ts, point_value))
+
+        last = times[-1]
+        for t in trades:
+            if t["id"] not in closed and last >= starts[t["id"]]:
+                self._checked[t["id"]] = last
+        return exits
+
+
+def trade_active_from(trade: Dict) -> datetime:
+    """
+    When a trade starts: open_time is the signal bar's timestamp (its
+    open) and the entry is at that bar's close.
+    """
+    opened = datetime.fromisoformat(trade["open_time"])
+    if trade.get("timeframe"):
+        opened += timeframe_to_timedelta(trade["timeframe"])
+    return opened
+
+
+def _exit(trade: Dict, reason: str, ts: datetime, point_value: float) -> TradeExit:
+    direction = Direction(trade["direction"])
+    price = trade["stop_price"] if reason == "stop" else trade["target_price"]
+    sign = 1.0 if direction == Direction.LONG else -1.0
+    pnl = (price - trade["entry_price"]) * trade["size"] * point_value * sign
+    return TradeExit(
+        trade_id=trade["id"],
+        strategy_name=trade["strategy_name"],
+        instrument=trade["instrument"],
+        direction=direction,
+        reason=reason,
+        exit_price=price,
+        close_time=ts,
+        realised_pnl=pnl,
+        strategy_instance=trade["strategy_instance"],
+    )
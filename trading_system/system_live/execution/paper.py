@@ -0,0 +1,280 @@
+# system_live/execution/paper.py
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import SystemConfig
+from ..data.timeframes import timeframe_to_timedelta
+from ..storage.db import TradingDatabase
+from .fetch import FetchResult
+from .monitor import trade_active_from
+from .trade_types import Direction, TradeExit
+
+STATE_KEY = "paper_last_bar"
+
+
+@dataclass
+class SlippageModel:
+    """
+    Adverse slippage on market fills (entries at the open, stop exits):
+    `bps` basis points of the price plus a fixed `points` offset. Target
+    exits are limit orders and fill without slippage.
+    """
+    bps: float = 2.0
+    points: float = 0.0
+
+    def apply(self, price: np.ndarray, buy: np.ndarray) -> np.ndarray:
+        offset = price * (self.bps / 10_000.0) + self.points
+        return np.where(buy, price + offset, price - offset)
+
+
+@dataclass
+class PaperCycle:
+    """What one PaperEngine.process() call did."""
+    fills: int = 0
+    exits: List[TradeExit] = field(default_factory=list)
+    equity: Dict[str, float] = field(default_factory=dict)  # per strategy instance
+
+
+@dataclass
+class PaperEngine:
+    """
+    Simulated execution for strategies running with mode="paper".
+
+    Entry trades are inserted as "pending" by the runner. At the start of
+    each cycle, process() walks the bars fetched for the cycle (from the
+    bar cache) that it has not seen yet, per (strategy instance, symbol,
+    timeframe): instances due at different bar closes (e.g. 4h and 1d on
+    shared 1h bars) each check their own trades against every bar:
+
+    - pending trades fill at the open of the first bar after their signal
+      bar, plus slippage
+    - open (and just filled) trades are checked against stop and target,
+      bar by bar; a stop fills at the stop, or at the open if the bar
+      gapped through it, plus slippage; a target fills at the target (or
+      a better open). If one bar hits both, the stop wins
+    - a paper_equity row is appended per strategy: allocated capital +
+      realised PnL + open trades marked at the last close. Trades whose
+      bars could not be fetched this cycle keep their last mark; if a
+      strategy has such a trade with no mark yet (e.g. after a restart),
+      its row is skipped for the cycle rather than marking the trade flat
+
+    All trades of an (instance, symbol, timeframe) are resolved at once
+    with numpy (trades x new bars matrices), and fills, closes, equity and
+    the last bar seen are written in one transaction (or as part of the
+    caller's db.transaction()). The in-memory last bars and marks advance
+    only when that commits, so a rolled-back cycle is redone in full. The
+    caller notifies cycle.exits once committed.
+    """
+
+    config: SystemConfig
+    db: TradingDatabase
+    slippage: SlippageModel = field(default_factory=SlippageModel)
+    # "instance/symbol@source" -> last bar seen
+    _last_bar: Dict[str, datetime] = field(default_factory=dict, repr=False)
+    _marks: Dict[int, float] = field(default_factory=dict, repr=False)  # trade id -> unrealised PnL
+
+    def __post_init__(self):
+        value = self.db.get_state(STATE_KEY)
+        if value:
+            self._last_bar = {k: datetime.fromisoformat(v) for k, v in json.loads(value).items()}
+
+    def process(
+        self,
+        runs: List,
+        fetched: Dict[Tuple[str, str], FetchResult],
+        sources: Dict[Tuple[str, str], str],
+        as_of: datetime,
+    ) -> PaperCycle:
+        """
+        Fill / close the paper trades of `runs` (the strategies due this
+        cycle) on the complete bars up to `as_of` in `fetched`.
+        """
+        # per strategy instance (run.instance_id): instances of one strategy
+        # share its name but not their trades or capital
+        capital: Dict[str, float] = {}
+        names: Dict[str, str] = {}
+        for run in runs:
+            if run.runtime.mode == "paper":
+                capital[run.instance_id] = run.runtime.capital * run.runtime.capital_allocation
+                names[run.instance_id] = run.strategy.name
+        cycle = PaperCycle()
+        if not capital:
+            return cycle
+
+        trades = [
+            t for t in self.db.get_open_trades_with_timeframe(statuses=("pending", "open"))
+            if t["strategy_instance"] in capital
+        ]
+        # (instance, symbol, source or None)
+        groups: Dict[Tuple[str, str, Optional[str]], List[Dict]] = {}
+        for t in trades:
+            source = sources.get((t["timeframe"], t["instrument"]))
+            groups.setdefault((t["strategy_instance"], t["instrument"], source), []).append(t)
+
+        fills: List[Tuple[int, float]] = []
+        marks: Dict[int, Tuple[str, float]] = {}
+        unmarked = set()  # instances with an open trade of unknown value
+        last_bar = dict(self._last_bar)
+        for (instance, symbol, source), group in groups.items():
+            result = fetched.get((symbol, source))
+            df = None
+            if result is not None and result.df is not None and not result.df.empty:
+                df = result.df[result.df.index + timeframe_to_timedelta(source) <= as_of]
+            if df is None or df.empty:
+                # No bars this cycle: carry the open trades' last marks
+                for t in group:
+                    if t["status"] != "open":
+                        continue
+                    if t["id"] in self._marks:
+                        marks[t["id"]] = (t["strategy_instance"], self._marks[t["id"]])
+                    else:
+                        unmarked.add(t["strategy_instance"])
+                continue
+            key = f"{instance}/{symbol}@{source}"
+            g_fills, g_exits, g_marks = self._resolve(symbol, group, df, last_bar.get(key))
+            last_bar[key] = df.index[-1].to_pydatetime()
+            fills += g_fills
+            cycle.exits += g_exits
+            for trade_id, _, pnl in g_marks:
+                marks[trade_id] = (instance, pnl)
+        processed = {t["id"] for t in trades}
+        new_marks = {k: v for k, v in self._marks.items() if k not in processed}
+        new_marks.update((trade_id, pnl) for trade_id, (_, pnl) in marks.items())
+
+        unrealised = {instance: 0.0 for instance in capital}
+        open_count = {instance: 0 for instance in capital}
+        for instance, pnl in marks.values():
+            unrealised[instance] += pnl
+            open_count[instance] += 1
+
+        realised = self.db.get_realised_pnl()
+        for e in cycle.exits:
+            realised[e.strategy_instance] = realised.get(e.strategy_instance, 0.0) + e.realised_pnl
+        equity_rows = []
+        for instance, cap in capital.items():
+            if instance in unmarked:
+                print(f"[WARN] Paper equity of {instance} not recorded: no bars for some open trades")
+                continue
+            equity = cap + realised.get(instance, 0.0) + unrealised[instance]
+            cycle.equity[instance] = equity
+            equity_rows.append(
+                (as_of, names[instance], instance, equity, realised.get(instance, 0.0),
+                 unrealised[instance], open_count[instance])
+            )
+
+        self.db.apply_paper_cycle(
+            fills=fills,
+            closes=[
+                (e.trade_id, e.close_time, e.realised_pnl, e.exit_price, e.reason)
+                for e in cycle.exits
+            ],
+            equity=equity_rows,
+            state={STATE_KEY: json.dumps({k: v.isoformat() for k, v in last_bar.items()})},
+        )
+        self.db.on_commit(lambda: self._advance(last_bar, new_marks))
+        cycle.fills = len(fills)
+        return cycle
+
+    def _advance(self, last_bar: Dict[str, datetime], marks: Dict[int, float]):
+        self._last_bar = last_bar
+        self._marks = marks
+
+    def _resolve(
+        self,
+        symbol: str,
+        trades: List[Dict],
+        df: pd.DataFrame,
+        last_bar: Optional[datetime],
+    ) -> Tuple[List[Tuple[int, float]], List[TradeExit], List[Tuple[int, str, float]]]:
+        """
+        Returns (fills, exits, [(trade id, strategy instance, unrealised PnL) per trade still open]).
+        """
+        times = df.index.values
+        start = np.searchsorted(
+            times, np.array([trade_active_from(t) for t in trades], dtype="M8[ns]"), side="left"
+        )
+        if last_bar is not None:
+            start = np.maximum(start, np.searchsorted(times, np.datetime64(last_bar), side="right"))
+
+        # Only the bars at or after the earliest start matter
+        lo = min(int(start.min()), len(times) - 1)
+        times = times[lo:]
+        opens = df["open"].to_numpy(dtype=np.float64)[lo:]
+        highs = df["high"].to_numpy(dtype=np.float64)[lo:]
+        lows = df["low"].to_numpy(dtype=np.float64)[lo:]
+        closes = df["close"].to_numpy(dtype=np.float64)[lo:]
+        start = start - lo
+        n = len(times)
+
+        ids = np.array([t["id"] for t in trades], dtype=np.int64)
+        long = np.array([t["direction"] == Direction.LONG.value for t in trades])
+        sign = np.where(long, 1.0, -1.0)
+        entry = np.array([t["entry_price"] for t in trades], dtype=np.float64)
+        stop = np.array([t["stop_price"] for t in trades], dtype=np.float64)
+        target = np.array([t["target_price"] for t in trades], dtype=np.float64)
+        size = np.array([t["size"] for t in trades], dtype=np.float64)
+        pending = np.array([t["status"] == "pending" for t in trades])
+
+        inst_cfg = self.config.get_instrument_config(symbol)
+        point_value = inst_cfg.point_value if inst_cfg else 1.0
+
+        # Entries: next-bar open plus slippage
+        filled = pending & (start < n)
+        entry = np.where(filled, self.slippage.apply(opens[np.minimum(start, n - 1)], long), entry)
+        active = (~pending | filled) & (start < n)
+
+        # Stop / target hits: first bar at or after each trade's start
+        bars = np.arange(n)
+        valid = (bars[None, :] >= start[:, None]) & active[:, None]
+        long_col = long[:, None]
+        stop_hit = valid & np.where(
+            long_col, lows[None, :] <= stop[:, None], highs[None, :] >= stop[:, None]
+        )
+        target_hit = valid & np.where(
+            long_col, highs[None, :] >= target[:, None], lows[None, :] <= target[:, None]
+        )
+        first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), n)
+        first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), n)
+        is_stop = first_stop <= first_target
+        exit_bar = np.minimum(first_stop, first_target)
+        closed = exit_bar < n
+
+        exit_open = opens[np.minimum(exit_bar, n - 1)]
+        stop_fill = self.slippage.apply(
+            np.where(long, np.minimum(exit_open, stop), np.maximum(exit_open, stop)), ~long
+        )
+        target_fill = np.where(long, np.maximum(exit_open, target), np.minimum(exit_open, target))
+        exit_price = np.where(is_stop, stop_fill, target_fill)
+        pnl = (exit_price - entry) * size * point_value * sign
+
+        fills = [(int(i), float(p)) for i, p in zip(ids[filled], entry[filled])]
+        exits = [
+            TradeExit(
+                trade_id=int(ids[k]),
+                strategy_name=trades[k]["strategy_name"],
+                instrument=symbol,
+                direction=Direction.LONG if long[k] else Direction.SHORT,
+                reason="stop" if is_stop[k] else "target",
+                exit_price=float(exit_price[k]),
+                close_time=pd.Timestamp(times[exit_bar[k]]).to_pydatetime(),
+                realised_pnl=float(pnl[k]),
+                strategy_instance=trades[k]["strategy_instance"],
+            )
+            for k in np.flatnonzero(closed)
+        ]
+
+        still_open = ~closed & (~pending | filled)
+        mark = (closes[-1] - entry) * size * point_value * sign
+        marks = [
+            (int(ids[k]), trades[k]["strategy_instance"], float(mark[k]))
+            for k in np.flatnonzero(still_open)
+        ]
+        return fills, exits, marks
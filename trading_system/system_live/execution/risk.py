@@ -6,22 +6,27 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .trade_types import ProposedTrade, Signal, Direction
-from ..config import SystemConfig
+from ..config import StrategyRuntimeConfig, SystemConfig
 
 
 @dataclass
 class RiskManager:
     """
-    Simple risk manager:
+    Simple risk manager for one strategy instance:
     - risks a fixed % of allocated capital per trade
     - uses signal.entry_price & signal.stop_price to size the position
     """
 
     config: SystemConfig
+    strategy: Optional[StrategyRuntimeConfig] = None  # defaults to config.strategy
+
+    @property
+    def runtime(self) -> StrategyRuntimeConfig:
+        return self.strategy if self.strategy is not None else self.config.strategy
 
     def allocate_capital(self) -> float:
         """Capital allocated to this strategy instance."""
-        return self.config.strategy.capital * self.config.strategy.capital_allocation
+        return self.runtime.capital * self.runtime.capital_allocation
 
     def calculate_position_size(
         self,
@@ -37,7 +42,7 @@ class RiskManager:
             size (£/point) = risk_amount / stop_distance_points
         """
         allocated_capital = self.allocate_capital()
-        risk_per_trade = self.config.strategy.risk_per_trade
+        risk_per_trade = self.runtime.risk_per_trade
         risk_amount = allocated_capital * risk_per_trade
 
         inst_cfg = self.config.get_instrument_config(instrument_symbol)
@@ -86,5 +91,6 @@ class RiskManager:
             risk_amount=risk_amount,
             open_time=signal.timestamp,
             signal_id=signal.id,
+            strategy_instance=signal.strategy_instance,
         )
         return trade
@@ -2,17 +2,32 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
+import hashlib
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..config import SystemConfig
-from ..data.data_provider import get_market_data_provider
+import pandas as pd
+
+from ..config import StrategyRuntimeConfig, SystemConfig
+from ..data.data_provider import MarketDataProvider, get_market_data_provider
+from ..data.timeframes import is_bar_close, resample_factor, resample_ohlcv
 from ..discord_integration import notifier
 from ..storage.db import TradingDatabase
 from ..strategies import load_strategy
+from .fetch import FetchRequest, FetchResult, fetch_all
+from .metrics import CycleMetrics, MetricsExporter
+from .paper import PaperEngine, SlippageModel
 from .risk import RiskManager
-from .trade_types import Signal, SignalKind, Direction
+from .trade_types import ProposedTrade, Signal, SignalKind, Direction
+
+# (strategy name, instrument, send): a notification held back until the
+# cycle's writes are committed
+Notification = Tuple[str, str, Callable[[], None]]
 
 
 def group_open_trades_by_instrument(open_trades: List[Dict]) -> Dict[str, List[Dict]]:
@@ -22,82 +37,414 @@ def group_open_trades_by_instrument(open_trades: List[Dict]) -> Dict[str, List[D
     return grouped
 
 
+@dataclass
+class StrategyRun:
+    """One configured strategy instance with its own risk manager."""
+
+    runtime: StrategyRuntimeConfig
+    strategy: Any
+    risk_manager: RiskManager
+    instruments: List[str]
+
+    @property
+    def instance_id(self) -> str:
+        return strategy_instance_id(self.strategy)
+
+    @property
+    def lookback(self) -> int:
+        return self.strategy.get_required_lookback()
+
+
+@dataclass
+class RunnerContext:
+    """
+    Everything a live cycle needs that can outlive the cycle: the DB
+    connection, data provider, the strategy instances with their risk
+    managers and, if any strategy trades on paper, the PaperEngine.
+
+    run_once() builds a fresh context per call; the daemon
+    (execution/daemon.py) keeps one alive across cycles.
+    """
+
+    config: SystemConfig
+    db: TradingDatabase
+    provider: MarketDataProvider
+    runs: List[StrategyRun]
+    exporter: MetricsExporter = field(default_factory=MetricsExporter)
+    paper: Optional[PaperEngine] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: SystemConfig,
+        provider: Optional[MarketDataProvider] = None,
+    ) -> "RunnerContext":
+        """
+        provider: use this instead of building config.data_provider
+        (e.g. the replay harness's recorded bars), as is.
+        """
+        db = TradingDatabase(config.db_path)
+        runs = []
+        for runtime in config.get_strategies():
+            instruments = config.get_strategy_instruments(runtime)
+            strategy = load_strategy(
+                runtime.strategy_name, instruments=instruments, timeframe=runtime.timeframe
+            )
+            load_strategy_state(db, strategy)
+            runs.append(
+                StrategyRun(
+                    runtime=runtime,
+                    strategy=strategy,
+                    risk_manager=RiskManager(config=config, strategy=runtime),
+                    instruments=instruments,
+                )
+            )
+        if not runs:
+            raise ValueError("SystemConfig has no strategies to run")
+        claim_legacy_rows(db, runs)
+        paper = None
+        if any(run.runtime.mode == "paper" for run in runs):
+            paper = PaperEngine(
+                config=config,
+                db=db,
+                slippage=SlippageModel(
+                    bps=config.paper.slippage_bps, points=config.paper.slippage_points
+                ),
+            )
+        return cls(
+            config=config,
+            db=db,
+            provider=provider or get_market_data_provider(
+                config.data_provider,
+                cache=config.cache_bars,
+                resilience=config.resilience,
+                deadline=config.fetch_timeout_seconds,
+            ),
+            runs=runs,
+            exporter=MetricsExporter(textfile=config.metrics_textfile),
+            paper=paper,
+        )
+
+    def close(self) -> None:
+        close_provider = getattr(self.provider, "close", None)
+        if close_provider is not None:
+            close_provider()
+        self.db.close()
+
+
+def strategy_instance_id(strategy: Any) -> str:
+    """
+    Id of a configured strategy instance: several instances of one strategy
+    (same name) differ in timeframe and / or instrument subset. Signals,
+    trades and paper equity rows are keyed on it, so instances never see
+    each other's open trades.
+    """
+    instruments = ",".join(sorted(strategy.get_instruments()))
+    digest = hashlib.sha1(instruments.encode()).hexdigest()[:8]
+    return f"{strategy.name}:{strategy.timeframe}:{digest}"
+
+
+def strategy_state_key(strategy: Any) -> str:
+    return f"strategy_state:{strategy_instance_id(strategy)}"
+
+
+def claim_legacy_rows(db: TradingDatabase, runs: List[StrategyRun]) -> None:
+    """
+    Hand signals / trades from before strategy_instance existed to the
+    instance with their strategy name and signal timeframe, where exactly
+    one instance matches (others stay unowned and are not traded on).
+    """
+    pairs = Counter((run.strategy.name, run.runtime.timeframe) for run in runs)
+    for run in runs:
+        if pairs[(run.strategy.name, run.runtime.timeframe)] == 1:
+            db.claim_legacy_rows(run.strategy.name, run.runtime.timeframe, run.instance_id)
+
+
+def load_strategy_state(db: TradingDatabase, strategy: Any) -> None:
+    """Restore an incremental strategy's indicator state saved by save_strategy_state."""
+    if not hasattr(strategy, "set_state"):
+        return
+    value = db.get_state(strategy_state_key(strategy))
+    if value:
+        strategy.set_state(json.loads(value))
+
+
+def save_strategy_state(db: TradingDatabase, strategy: Any) -> None:
+    if hasattr(strategy, "get_state"):
+        db.set_state(strategy_state_key(strategy), json.dumps(strategy.get_state()))
+
+
+def plan_fetches(
+    runs: List[StrategyRun],
+    base_timeframe: Optional[str] = None,
+) -> Tuple[List[FetchRequest], Dict[Tuple[str, str], str]]:
+    """
+    One FetchRequest per (symbol, source timeframe) across all strategies.
+
+    A strategy whose timeframe is a multiple of base_timeframe reads the
+    symbol's base bars and resamples them; otherwise bars are fetched at
+    its own timeframe. Each request covers the longest lookback of the
+    strategies sharing it.
+
+    Returns (requests, {(strategy timeframe, symbol): source timeframe}).
+    """
+    lookbacks: Dict[Tuple[str, str], int] = {}
+    sources: Dict[Tuple[str, str], str] = {}
+    for run in runs:
+        tf = run.runtime.timeframe
+        factor = resample_factor(tf, base_timeframe) if base_timeframe else None
+        source = base_timeframe if factor else tf
+        # one extra coarse bar, as the first resampled bucket may be partial
+        needed = (run.lookback + 1) * factor if factor else run.lookback
+        for symbol in run.instruments:
+            sources[(tf, symbol)] = source
+            key = (symbol, source)
+            lookbacks[key] = max(lookbacks.get(key, 0), needed)
+
+    requests = [FetchRequest(symbol, tf, n) for (symbol, tf), n in lookbacks.items()]
+    return requests, sources
+
+
+def incremental_signals(
+    strategy: Any,
+    symbol: str,
+    df: pd.DataFrame,
+    open_for_inst: List[Dict],
+) -> List[Signal]:
+    """
+    Feed the bars of `df` the strategy has not seen yet to strategy.on_bar
+    and return the signals of the last one (earlier bars only advance its
+    indicators, as generate_signals only looks at the latest bar).
+
+    If the strategy's last bar is older than the start of `df` (downtime
+    longer than the lookback), its state for `symbol` is reset and
+    rebuilt from the whole window.
+    """
+    since = strategy.last_bar_time(symbol)
+    if since is not None and since < df.index[0]:
+        strategy.reset(symbol)
+        since = None
+    new_bars = df if since is None else df[df.index >= since]
+
+    signals: List[Signal] = []
+    for _, bar in new_bars.iterrows():
+        signals = strategy.on_bar(symbol, bar, open_for_inst)
+    return signals
+
+
 def run_once(config: SystemConfig) -> None:
+    """
+    Run a single live cycle with a freshly built RunnerContext.
+    """
+    ctx = RunnerContext.from_config(config)
+    try:
+        run_cycle(ctx, datetime.utcnow())
+    finally:
+        ctx.close()
+
+
+def run_cycle(
+    ctx: RunnerContext,
+    now: datetime,
+    bar_close: Optional[datetime] = None,
+    state: Optional[Dict[str, str]] = None,
+) -> CycleMetrics:
     """
     Run a single live cycle:
-    - For each instrument:
-        - Fetch data
+    - Fetch data once per (symbol, timeframe) for all strategies,
+      concurrently (see plan_fetches / fetch_all)
+    - Paper strategies: fill pending entries and close stop / target
+      hits on the new complete bars (see PaperEngine)
+    - For each strategy, then each of its instruments, in config order:
+        - Resample / trim the shared bars to the strategy's timeframe
         - Compute indicators
         - Generate signals
-        - For entry signals: size trade, persist, notify
+        - For entry signals: size trade, persist (as "pending" for paper
+          strategies), notify
         - For exit signals: persist, notify (no auto-close yet)
+
+    All writes of the cycle (paper fills / closes, signals, trades,
+    strategy state and the runner_state entries in `state`) are one
+    transaction, committed once after the last strategy; notifications
+    are sent only after the commit. If the cycle fails, nothing of it is
+    written and nothing is sent.
+
+    If bar_close is given, only strategies whose timeframe has a bar
+    closing then are run, and only bars that opened before it are used,
+    so signals are generated as of that bar close (the daemon uses this
+    to catch up bars missed while it was down).
+
+    Stage timings and counters are returned as CycleMetrics, stored in
+    the cycle_metrics table (config.record_metrics, a second, separate
+    commit that includes the notify timings) and exported through
+    ctx.exporter.
     """
 
-    db = TradingDatabase(config.db_path)
-    risk_manager = RiskManager(config=config)
-    provider = get_market_data_provider(config.data_provider)
+    config = ctx.config
+    metrics = CycleMetrics(bar_close=bar_close)
+    runs = ctx.runs
+    if bar_close is not None:
+        runs = [r for r in runs if is_bar_close(bar_close, r.runtime.timeframe)]
+    if not runs:
+        with ctx.db.transaction():
+            for key, value in (state or {}).items():
+                ctx.db.set_state(key, value)
+        return metrics.finish()
 
-    # Build strategy instance with list of symbols
-    instruments = [i.symbol for i in config.instruments]
-    strategy = load_strategy(config.strategy.strategy_name, instruments=instruments)
-    lookback = strategy.get_required_lookback()
+    cache_stats = getattr(ctx.provider, "stats", None)
+    cache_before = (cache_stats.hits, cache_stats.misses) if cache_stats else (0, 0)
 
-    now = datetime.utcnow()
+    # Fetch OHLCV (I/O bound, so concurrently); everything after is sequential
+    requests, sources = plan_fetches(runs, config.base_timeframe)
+    t0 = time.perf_counter()
+    fetched = fetch_all(
+        ctx.provider,
+        requests,
+        now=now,
+        workers=config.fetch_workers,
+        timeout_seconds=config.fetch_timeout_seconds,
+    )
+    metrics.stage_s["fetch"] = time.perf_counter() - t0
+    for (symbol, timeframe), result in fetched.items():
+        metrics.add_time("fetch", result.elapsed_s, instrument=f"{symbol}@{timeframe}")
+        if result.error is not None:
+            metrics.count("provider_timeouts" if result.timed_out else "provider_errors")
 
-    # Get open trades grouped by instrument
-    open_trades = db.get_open_trades(strategy_name=strategy.name)
-    open_trades_by_instrument = group_open_trades_by_instrument(open_trades)
+    if cache_stats:
+        metrics.count("cache_hits", cache_stats.hits - cache_before[0])
+        metrics.count("cache_misses", cache_stats.misses - cache_before[1])
 
-    for inst_cfg in config.instruments:
-        symbol = inst_cfg.symbol
+    notifications: List[Notification] = []
+    with ctx.db.transaction():
+        if ctx.paper is not None:
+            with metrics.time("paper"):
+                paper = ctx.paper.process(runs, fetched, sources, as_of=bar_close or now)
+            metrics.count("paper_fills", paper.fills)
+            metrics.count("paper_closes", len(paper.exits))
+            notifications += [
+                (e.strategy_name, e.instrument, partial(notifier.notify_trade_closed, e))
+                for e in paper.exits
+            ]
 
-        # Fetch OHLCV
-        df = provider.get_ohlcv(
-            symbol=symbol,
-            timeframe=config.strategy.timeframe,
-            lookback=lookback,
-            now=now,
-        )
+        for run in runs:
+            notifications += _run_strategy(ctx, run, fetched, sources, bar_close, metrics)
+
+        with metrics.time("db"):
+            for key, value in (state or {}).items():
+                ctx.db.set_state(key, value)
+        t_commit = time.perf_counter()
+    metrics.add_time("db", time.perf_counter() - t_commit)
+
+    for name, symbol, send in notifications:
+        with metrics.time("notify", name, symbol):
+            send()
+
+    metrics.finish()
+    if config.record_metrics:
+        ctx.db.insert_cycle_metrics(metrics.rows())
+    ctx.exporter.observe(metrics)
+    return metrics
+
+
+def _run_strategy(
+    ctx: RunnerContext,
+    run: StrategyRun,
+    fetched: Dict[Tuple[str, str], FetchResult],
+    sources: Dict[Tuple[str, str], str],
+    bar_close: Optional[datetime],
+    metrics: CycleMetrics,
+) -> List[Notification]:
+    """
+    Run one strategy over its instruments. Its signals and trades are
+    inserted in bulk at the end (inside run_cycle's transaction); returns
+    the notifications to send once they are committed.
+    """
+    db = ctx.db
+    strategy = run.strategy
+    risk_manager = run.risk_manager
+    timeframe = run.runtime.timeframe
+    trade_status = "pending" if ctx.paper is not None and run.runtime.mode == "paper" else "open"
+
+    # Get this instance's open trades grouped by instrument (paper entries
+    # awaiting their fill count as open)
+    open_trades = db.get_open_trades(strategy_instance=run.instance_id, include_pending=True)
+    open_trades_by_instrument = group_open_trades_by_instrument(open_trades)
+
+    entries: List[Tuple[Signal, Optional[ProposedTrade]]] = []
+    notifications: List[Notification] = []
+    for symbol in run.instruments:
+        metrics.count("instruments")
+        source = sources[(timeframe, symbol)]
+        result = fetched[(symbol, source)]
+        if result.error is not None:
+            print(f"[WARN] Fetch failed for {symbol}: {result.error}")
+            continue
+        df = result.df
+        if df is not None and bar_close is not None:
+            df = df[df.index < bar_close]
+        if df is not None and not df.empty and source != timeframe:
+            df = resample_ohlcv(df, timeframe)
         if df is None or df.empty:
             print(f"[WARN] No data returned for {symbol}")
+            metrics.count("no_data")
             continue
+        df = df.iloc[-run.lookback:]
 
-        # Compute indicators
-        df_ind = strategy.compute_indicators(df)
-
-        # Generate signals for this instrument
+        name = strategy.name
         open_for_inst = open_trades_by_instrument.get(symbol, [])
-        signals: List[Signal] = strategy.generate_signals(df_ind, open_for_inst)
+        if hasattr(strategy, "on_bar"):
+            # Incremental strategy: only the new bars are evaluated
+            # (indicators and signals in one step, timed as "signals")
+            with metrics.time("signals", name, symbol):
+                signals: List[Signal] = incremental_signals(strategy, symbol, df, open_for_inst)
+        else:
+            # Compute indicators
+            with metrics.time("indicators", name, symbol):
+                df_ind = strategy.compute_indicators(df)
+
+            # Generate signals for this instrument
+            with metrics.time("signals", name, symbol):
+                signals = strategy.generate_signals(df_ind, open_for_inst)
+        metrics.count("signals", len(signals))
 
         # Fill in instrument field and execute logic
         for sig in signals:
             sig.instrument = symbol
-
-            # Persist signal
-            sig_id = db.insert_signal(sig)
-            sig.id = sig_id
+            sig.strategy_instance = run.instance_id
+            trade = None
 
             if sig.kind == SignalKind.ENTRY:
+                metrics.count("entry_signals")
                 trade = risk_manager.build_proposed_trade(sig)
                 if trade is None:
-                    print(f"[INFO] Skipping trade build for signal {sig_id}: no valid stop/target or size.")
-                    continue
-
-                trade.signal_id = sig_id
-                trade_id = db.insert_trade(trade)
-                trade.id = trade_id
-                db.link_signal_to_trade(sig_id, trade_id)
-
-                # Notify via placeholder
-                notifier.notify_new_entry_signal(sig, trade)
+                    print(
+                        f"[INFO] Skipping trade build for {name} {symbol} signal at "
+                        f"{sig.timestamp.isoformat()}: no valid stop/target or size."
+                    )
+                else:
+                    metrics.count("trades")
+                    # Notify via placeholder
+                    notifications.append(
+                        (name, symbol, partial(notifier.notify_new_entry_signal, sig, trade))
+                    )
 
             elif sig.kind == SignalKind.EXIT:
+                metrics.count("exit_signals")
                 # For now, just notify about exit proposals.
                 affected_ids = [
                     t["id"]
                     for t in open_for_inst
                     if (sig.direction is None or t["direction"] == sig.direction.value)
                 ]
-                notifier.notify_exit_signal(sig, affected_ids)
+                notifications.append(
+                    (name, symbol, partial(notifier.notify_exit_signal, sig, affected_ids))
+                )
+
+            # Persisted (with its trade, if any) after the last instrument
+            entries.append((sig, trade))
 
-    db.close()
+    # Persist signals, their trades and the signal -> trade links at once
+    with metrics.time("db"):
+        db.insert_signals_and_trades(entries, trade_status=trade_status)
+        save_strategy_state(db, strategy)
+    return notifications
@@ -35,6 +35,7 @@ class Signal:
     metadata: Dict[str, Any] = field(default_factory=dict)
     id: Optional[int] = None
     linked_trade_id: Optional[int] = None
+    strategy_instance: Optional[str] = None  # set by the runner, see strategy_instance_id()
 
 
 @dataclass
@@ -53,3 +54,20 @@ class ProposedTrade:
     open_time: datetime
     signal_id: Optional[int] = None
     id: Optional[int] = None
+    strategy_instance: Optional[str] = None
+
+
+@dataclass
+class TradeExit:
+    """
+    An open trade whose stop or target was hit (see execution/monitor.py).
+    """
+    trade_id: int
+    strategy_name: str
+    instrument: str
+    direction: Direction
+    reason: str              # "stop" or "target"
+    exit_price: float
+    close_time: datetime
+    realised_pnl: float
+    strategy_instance: Optional[str] = None
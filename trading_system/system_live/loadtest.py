@@ -0,0 +1,316 @@
+# system_live/loadtest.py
+
+"""
+Load test of the live runner with N synthetic instruments.
+
+For each N, a LiveDaemon (real runner, strategy, risk, paper engine,
+SQLite DB in a temp directory) runs `cycles` bar closes on a simulated
+clock against a seeded SyntheticProvider, wrapped in the same resilience
+and cache layers as a live provider. Reported per N:
+
+- cycle latency percentiles (the first, cold cycle separately)
+- DB rows written per cycle and per second of cycle time
+- process RSS before / after, and its growth per cycle
+- notifier backlog: notifications per cycle against a delivery rate
+  (e.g. a Discord webhook), drained in simulated time between cycles
+
+    python -m trading_system.system_live.loadtest --sizes 10,100,1000,5000 --cycles 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import os
+import resource
+import tempfile
+import zlib
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import DEFAULT_CONFIG, InstrumentConfig, SystemConfig
+from .data.data_provider import wrap_provider
+from .data.timeframes import Timeframe, timeframe_to_timedelta
+from .discord_integration import notifier
+from .execution.daemon import LiveDaemon
+from .replay import ReplayClock, ReplayProvider
+
+ORIGIN = datetime(2024, 1, 1)
+
+
+class SyntheticProvider(ReplayProvider):
+    """
+    Deterministic random-walk bars for any symbol: the series of a symbol
+    depends only on (seed, symbol), and is generated on first use for
+    `periods` bars of `timeframe` from `start`.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        timeframe: Timeframe = "1h",
+        start: datetime = ORIGIN,
+        periods: int = 24 * 60,
+    ):
+        super().__init__({}, timeframe)
+        self.seed = seed
+        self.start = start
+        self.periods = periods
+
+    def bars(self, symbol: str) -> pd.DataFrame:
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+        n = self.periods
+        # slow-moving drift, so moving averages cross now and then
+        drift = np.repeat(rng.normal(0.0, 0.002, n // 50 + 1), 50)[:n]
+        close = 100.0 * np.exp(np.cumsum(drift + rng.normal(0.0, 0.006, n)))
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        wick = close * rng.uniform(0.0, 0.004, (2, n))
+        index = pd.date_range(self.start, periods=n, freq=self.timeframe, name="timestamp")
+        return pd.DataFrame(
+            {
+                "open": open_,
+                "high": np.maximum(open_, close) + wick[0],
+                "low": np.minimum(open_, close) - wick[1],
+                "close": close,
+                "volume": rng.integers(1_000, 10_000, n),
+            },
+            index=index,
+        )
+
+    def _frame(self, symbol: str, timeframe: str) -> Tuple[pd.DataFrame, np.ndarray]:
+        if symbol not in self._bars:
+            self._bars[symbol] = self.bars(symbol)
+        return super()._frame(symbol, timeframe)
+
+
+@dataclass
+class NotifierBacklog:
+    """
+    Notifications waiting for delivery at `rate_per_s`. Produced during a
+    cycle, delivered during the cycle and the simulated time after it.
+    """
+    rate_per_s: float
+    backlog: float = 0.0
+    max_backlog: float = 0.0
+    produced: int = 0
+
+    def cycle(self, produced: int, cycle_s: float, idle_s: float) -> float:
+        """Returns the backlog right after the cycle (before idle_s of draining)."""
+        self.produced += produced
+        self.backlog = max(self.backlog + produced - self.rate_per_s * cycle_s, 0.0)
+        after_cycle = self.backlog
+        self.max_backlog = max(self.max_backlog, after_cycle)
+        self.backlog = max(self.backlog - self.rate_per_s * idle_s, 0.0)
+        return after_cycle
+
+
+@contextlib.contextmanager
+def count_notifications() -> Iterator[List[int]]:
+    """
+    Replace the notifier's senders with counters for the duration; yields
+    a one-element list holding the number of notifications so far.
+    """
+    count = [0]
+    names = ("notify_new_entry_signal", "notify_exit_signal", "notify_trade_closed")
+    saved = {name: getattr(notifier, name) for name in names}
+
+    def send(*args, **kwargs):
+        count[0] += 1
+
+    try:
+        for name in names:
+            setattr(notifier, name, send)
+        yield count
+    finally:
+        for name, fn in saved.items():
+            setattr(notifier, name, fn)
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@dataclass
+class LoadResult:
+    instruments: int
+    cycles: int
+    cold_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    per_instrument_ms: float      # p50 / instruments
+    db_rows_per_cycle: float
+    db_rows_per_s: float          # rows written / cycle time
+    rss_start_mb: float
+    rss_end_mb: float
+    rss_growth_mb_per_cycle: float
+    signals: int
+    trades: int
+    notifications: int
+    max_notify_backlog: float
+    max_notify_drain_s: float     # time to deliver the worst post-cycle backlog
+
+
+def run_load(
+    instruments: int,
+    cycles: int = 10,
+    seed: int = 0,
+    config: SystemConfig = DEFAULT_CONFIG,
+    bar_timeframe: Timeframe = "1h",
+    notify_rate_per_s: float = 5.0,
+    db_dir: Optional[str] = None,
+) -> LoadResult:
+    """Run `cycles` daemon cycles over `instruments` synthetic instruments."""
+    symbols = [f"SYN{i:05d}" for i in range(instruments)]
+    with contextlib.ExitStack() as stack:
+        db_dir = db_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        config = replace(
+            config,
+            db_path=os.path.join(db_dir, f"loadtest_{instruments}.db"),
+            instruments=[InstrumentConfig(symbol=s) for s in symbols],
+            monitor_seconds=None,
+            metrics_textfile=None,
+        )
+        daemon = LiveDaemon(config=config, settle_seconds=0.0, max_catch_up=1)
+        # 100 bars of history at the coarsest strategy timeframe before the first cycle
+        warmup = max(timeframe_to_timedelta(s.timeframe) * 100 for s in config.get_strategies())
+        first = ORIGIN + warmup
+        step = daemon.step
+        periods = int((warmup + step * (cycles + 2)) / timeframe_to_timedelta(bar_timeframe))
+        provider = SyntheticProvider(seed=seed, timeframe=bar_timeframe, periods=periods)
+        daemon.provider = wrap_provider(
+            provider,
+            cache=config.cache_bars,
+            resilience=config.resilience,
+            deadline=config.fetch_timeout_seconds,
+        )
+
+        clock = ReplayClock(first - step)
+        daemon.clock = clock.now
+        daemon.sleep = clock.sleep
+        backlog = NotifierBacklog(rate_per_s=notify_rate_per_s)
+
+        durations: List[float] = []
+        rows: List[int] = []
+        signals = 0
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                count_notifications() as notified:
+            daemon.start()
+            conn = daemon.ctx.db._conn
+            rss_start = rss_mb()
+            for i in range(cycles):
+                clock.set(first + i * step)
+                changes, sent = conn.total_changes, notified[0]
+                if not daemon.catch_up():
+                    continue
+                metrics = daemon.ctx.exporter.last
+                durations.append(metrics.duration_s)
+                rows.append(conn.total_changes - changes)
+                signals += int(metrics.counters["signals"])
+                backlog.cycle(
+                    notified[0] - sent,
+                    metrics.duration_s,
+                    max(step.total_seconds() - metrics.duration_s, 0.0),
+                )
+            rss_end = rss_mb()
+            trades = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+            daemon.close()
+
+    if not durations:
+        raise RuntimeError("No cycles ran")
+    warm = np.array(durations[1:] or durations) * 1000.0
+    p50 = float(np.percentile(warm, 50))
+    return LoadResult(
+        instruments=instruments,
+        cycles=len(durations),
+        cold_ms=durations[0] * 1000.0,
+        p50_ms=p50,
+        p95_ms=float(np.percentile(warm, 95)),
+        p99_ms=float(np.percentile(warm, 99)),
+        max_ms=float(warm.max()),
+        per_instrument_ms=p50 / instruments,
+        db_rows_per_cycle=float(np.mean(rows)),
+        db_rows_per_s=sum(rows) / sum(durations),
+        rss_start_mb=rss_start,
+        rss_end_mb=rss_end,
+        rss_growth_mb_per_cycle=(rss_end - rss_start) / len(durations),
+        signals=signals,
+        trades=trades,
+        notifications=backlog.produced,
+        max_notify_backlog=backlog.max_backlog,
+        max_notify_drain_s=backlog.max_backlog / notify_rate_per_s,
+    )
+
+
+# --- CLI --- #
+
+_COLUMNS = [
+    ("instruments", "N", "{:d}"),
+    ("cold_ms", "cold ms", "{:.0f}"),
+    ("p50_ms", "p50 ms", "{:.0f}"),
+    ("p95_ms", "p95 ms", "{:.0f}"),
+    ("p99_ms", "p99 ms", "{:.0f}"),
+    ("per_instrument_ms", "ms/inst", "{:.2f}"),
+    ("db_rows_per_cycle", "rows/cyc", "{:.0f}"),
+    ("db_rows_per_s", "rows/s", "{:.0f}"),
+    ("rss_end_mb", "RSS MB", "{:.0f}"),
+    ("rss_growth_mb_per_cycle", "MB/cyc", "{:.2f}"),
+    ("signals", "signals", "{:d}"),
+    ("max_notify_backlog", "backlog", "{:.0f}"),
+    ("max_notify_drain_s", "drain s", "{:.1f}"),
+]
+
+
+def format_header() -> str:
+    return "  ".join(f"{title:>9}" for _, title, _ in _COLUMNS)
+
+
+def format_row(result: LoadResult) -> str:
+    values = asdict(result)
+    return "  ".join(f"{fmt.format(values[key]):>9}" for key, _, fmt in _COLUMNS)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the live runner with synthetic instruments.")
+    parser.add_argument("--sizes", default="10,100,500,1000,2000,5000",
+                        help="Comma-separated instrument counts.")
+    parser.add_argument("--cycles", type=int, default=10, help="Daemon cycles per size.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--notify-rate", type=float, default=5.0,
+                        help="Notifications the notifier can deliver per second.")
+    parser.add_argument("--output", default=None, help="Also write the results as CSV here.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results: List[LoadResult] = []
+    print(format_header(), flush=True)
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        results.append(
+            run_load(n, cycles=args.cycles, seed=args.seed, notify_rate_per_s=args.notify_rate)
+        )
+        print(format_row(results[-1]), flush=True)
+
+    if args.output:
+        with open(args.output, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(asdict(results[0])))
+            writer.writeheader()
+            writer.writerows(asdict(r) for r in results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
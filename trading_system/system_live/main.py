@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import argparse
+import signal
 from datetime import datetime
 from time import sleep
 
 from trading_system.system_live.config import DEFAULT_CONFIG, SystemConfig
+from trading_system.system_live.execution.daemon import LiveDaemon
 from trading_system.system_live.execution.runner import run_once
 
 
@@ -25,6 +27,24 @@ def parse_args() -> argparse.Namespace:
         default=60 * 60,  # 1 hour default
         help="Loop interval in seconds when --loop is used.",
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run as a daemon: one cycle per bar close of the strategy timeframes, "
+             "keeping DB / provider / strategy alive and catching up missed bars.",
+    )
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=30.0,
+        help="Daemon mode: wait this long after each bar close before running.",
+    )
+    parser.add_argument(
+        "--max-catch-up",
+        type=int,
+        default=50,
+        help="Daemon mode: most missed bar closes to replay after downtime.",
+    )
     return parser.parse_args()
 
 
@@ -32,7 +52,22 @@ def main():
     args = parse_args()
     config: SystemConfig = DEFAULT_CONFIG
 
-    if not args.loop:
+    if args.daemon:
+        daemon = LiveDaemon(
+            config=config,
+            settle_seconds=args.settle_seconds,
+            max_catch_up=args.max_catch_up,
+        )
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+        print(
+            f"[INFO] Running as daemon, step={daemon.step}, "
+            f"settle={args.settle_seconds}s."
+        )
+        try:
+            daemon.run_forever()
+        except KeyboardInterrupt:
+            pass
+    elif not args.loop:
         print(f"[INFO] Running single cycle at {datetime.utcnow().isoformat()}Z")
         run_once(config)
     else:
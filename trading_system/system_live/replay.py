@@ -0,0 +1,394 @@
+# system_live/replay.py
+
+"""
+Accelerated historical replay of the live pipeline.
+
+Drives the real runner (run_cycle), strategies, RiskManager, PaperEngine
+and TradingDatabase over recorded bars with a simulated clock: one cycle
+per bar close of the daemon's step, as fast as the CPU allows.
+
+    python -m trading_system.system_live.replay --bars data/1h --start 2024-01-01 --parity
+
+--bars is a directory of <symbol>.csv / <symbol>.parquet files (bar open
+timestamps as the first column / index, open/high/low/close/volume).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import DEFAULT_CONFIG, InstrumentConfig, SystemConfig
+from .data.cache import CachingProvider
+from .data.timeframes import (
+    Timeframe,
+    bar_closes_between,
+    common_step,
+    resample_ohlcv,
+    timeframe_to_timedelta,
+)
+from .execution.runner import RunnerContext, plan_fetches, run_cycle
+from .strategies import load_strategy
+
+
+class ReplayProvider:
+    """
+    MarketDataProvider over recorded bars. Only bars that are complete at
+    `now` are returned (bar open + bar length <= now); coarser timeframes
+    are resampled from the recorded ones once and kept.
+    """
+
+    def __init__(self, bars: Dict[str, pd.DataFrame], timeframe: Timeframe):
+        self.timeframe = timeframe_to_timedelta(timeframe)
+        self._frames: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._index: Dict[Tuple[str, str], np.ndarray] = {}
+        self._bars = {symbol: df.sort_index() for symbol, df in bars.items()}
+
+    def _frame(self, symbol: str, timeframe: str) -> Tuple[pd.DataFrame, np.ndarray]:
+        key = (symbol, timeframe)
+        if key not in self._frames:
+            df = self._bars.get(symbol)
+            if df is None:
+                df = pd.DataFrame()
+            elif timeframe_to_timedelta(timeframe) != self.timeframe:
+                df = resample_ohlcv(df, timeframe)
+            self._frames[key] = df
+            self._index[key] = pd.DatetimeIndex(df.index).asi8 if len(df) else np.zeros(0, np.int64)
+        return self._frames[key], self._index[key]
+
+    def _complete_until(self, index: np.ndarray, timeframe: str, now: datetime) -> int:
+        cutoff = pd.Timestamp(now - timeframe_to_timedelta(timeframe)).value
+        return int(np.searchsorted(index, cutoff, side="right"))
+
+    def get_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        lookback: int,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        df, index = self._frame(symbol, timeframe)
+        end = self._complete_until(index, timeframe, now) if now is not None else len(df)
+        return df.iloc[max(end - lookback, 0):end]
+
+    def get_ohlcv_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: datetime,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        df, index = self._frame(symbol, timeframe)
+        end = self._complete_until(index, timeframe, now) if now is not None else len(df)
+        start = int(np.searchsorted(index, pd.Timestamp(since).value, side="left"))
+        return df.iloc[start:max(end, start)]
+
+
+@dataclass
+class ReplayClock:
+    """Simulated UTC clock: now() / sleep() for anything that takes a clock."""
+    current: datetime
+
+    def now(self) -> datetime:
+        return self.current
+
+    def sleep(self, seconds: float) -> None:
+        self.current += timedelta(seconds=seconds)
+
+    def set(self, ts: datetime) -> None:
+        self.current = ts
+
+
+@dataclass
+class ReplayReport:
+    start: datetime
+    end: datetime
+    cycles: int = 0
+    wall_s: float = 0.0
+    cycle_s: List[float] = field(default_factory=list)
+    instrument_bars: int = 0     # (strategy, instrument) evaluations
+    signals: int = 0
+    entry_signals: int = 0
+    exit_signals: int = 0
+    trades: int = 0
+    closed_trades: int = 0
+    realised_pnl: float = 0.0
+    equity: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def cycles_per_s(self) -> float:
+        return self.cycles / self.wall_s if self.wall_s else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        return float(np.percentile(self.cycle_s, q)) * 1000.0 if self.cycle_s else 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"Replay {self.start.isoformat()} -> {self.end.isoformat()}: "
+            f"{self.cycles} cycles in {self.wall_s:.2f}s "
+            f"({self.cycles_per_s:.1f} cycles/s, "
+            f"{self.instrument_bars / self.wall_s if self.wall_s else 0.0:.0f} instrument-bars/s)",
+            f"  cycle ms: p50={self.percentile_ms(50):.2f} p95={self.percentile_ms(95):.2f} "
+            f"max={self.percentile_ms(100):.2f}",
+            f"  signals={self.signals} (entry={self.entry_signals} exit={self.exit_signals}) "
+            f"trades={self.trades} closed={self.closed_trades} realised_pnl={self.realised_pnl:.2f}",
+        ]
+        for name, equity in sorted(self.equity.items()):
+            lines.append(f"  paper equity {name}: {equity:.2f}")
+        return "\n".join(lines)
+
+
+def replay_config(config: SystemConfig, db_path: str = ":memory:") -> SystemConfig:
+    """
+    Copy of `config` for replaying: its own DB, sequential fetches (no
+    thread pool per cycle), no metrics textfile and no 1m trade monitor.
+    """
+    return replace(
+        config,
+        db_path=db_path,
+        fetch_workers=1,
+        fetch_timeout_seconds=None,
+        resilience=None,
+        metrics_textfile=None,
+        monitor_seconds=None,
+    )
+
+
+def replay(
+    config: SystemConfig,
+    bars: Dict[str, pd.DataFrame],
+    timeframe: Timeframe,
+    start: datetime,
+    end: datetime,
+    quiet: bool = True,
+) -> Tuple[ReplayReport, RunnerContext]:
+    """
+    Run one live cycle per bar close in (start, end] of the daemon step
+    (the GCD of the strategy timeframes), with `now` = the bar close.
+
+    `config` is used as is; see replay_config(). Returns the report and
+    the (still open) RunnerContext, whose DB holds the replayed signals
+    and trades. Strategy / notifier output is discarded when quiet.
+    """
+    provider = ReplayProvider(bars, timeframe)
+    ctx = RunnerContext.from_config(
+        config, provider=CachingProvider(provider) if config.cache_bars else provider
+    )
+    step = common_step(s.timeframe for s in config.get_strategies())
+    closes = bar_closes_between(start, end, step)
+    clock = ReplayClock(start)
+    report = ReplayReport(start=start, end=end)
+
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        for close in closes:
+            clock.set(close)
+            metrics = run_cycle(ctx, now=clock.now(), bar_close=close)
+            report.cycles += 1
+            report.cycle_s.append(metrics.duration_s)
+            report.instrument_bars += int(metrics.counters["instruments"])
+            report.signals += int(metrics.counters["signals"])
+            report.entry_signals += int(metrics.counters["entry_signals"])
+            report.exit_signals += int(metrics.counters["exit_signals"])
+    report.wall_s = time.perf_counter() - t0
+
+    conn = ctx.db._conn
+    report.trades = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+    report.closed_trades = conn.execute(
+        "SELECT COUNT(*) FROM trades WHERE status = 'closed'"
+    ).fetchone()[0]
+    report.realised_pnl = sum(ctx.db.get_realised_pnl().values())
+    for row in conn.execute(
+        "SELECT strategy_instance, equity FROM paper_equity ORDER BY rowid"
+    ):
+        report.equity[row["strategy_instance"]] = row["equity"]
+    return report, ctx
+
+
+# --- Parity check --- #
+
+SignalKey = Tuple[str, str, str, str, str, str, str]
+
+
+def _signal_key(strategy: str, instrument: str, kind: str, direction: Optional[str],
+                timestamp: datetime, price: float, stop: Optional[float]) -> SignalKey:
+    return (
+        strategy, instrument, kind, direction or "", timestamp.isoformat(),
+        f"{price:.6f}", f"{stop:.6f}" if stop is not None else "",
+    )
+
+
+@dataclass
+class ParityReport:
+    matched: int
+    live_only: List[SignalKey]
+    backtest_only: List[SignalKey]
+
+    @property
+    def ok(self) -> bool:
+        return not self.live_only and not self.backtest_only
+
+    def summary(self, limit: int = 10) -> str:
+        lines = [
+            f"Parity: {self.matched} signals match, {len(self.live_only)} live-only, "
+            f"{len(self.backtest_only)} backtest-only"
+        ]
+        lines += [f"  live only:     {k}" for k in self.live_only[:limit]]
+        lines += [f"  backtest only: {k}" for k in self.backtest_only[:limit]]
+        return "\n".join(lines)
+
+
+def parity_check(
+    ctx: RunnerContext,
+    bars: Dict[str, pd.DataFrame],
+    timeframe: Timeframe,
+    start: datetime,
+    end: datetime,
+) -> ParityReport:
+    """
+    Compare the signals of a replay (in ctx.db) with a backtest-style
+    pass: each strategy's compute_indicators() over the whole history
+    once, then generate_signals() bar by bar.
+
+    Entries depend on open trades, so the backtest pass is given the
+    replay's trades that were open when each bar's cycle ran (opened on
+    an earlier bar, not closed before the bar close). What is checked is
+    everything else that differs between the live path and a backtest:
+    windowed lookbacks, resampling, bar alignment and incremental
+    indicator state.
+    """
+    base = timeframe_to_timedelta(timeframe)
+    _, sources = plan_fetches(ctx.runs, ctx.config.base_timeframe)
+    conn = ctx.db._conn
+    live = {
+        _signal_key(r["strategy_instance"], r["instrument"], r["kind"], r["direction"],
+                    datetime.fromisoformat(r["timestamp"]), r["price"], r["stop_price"])
+        for r in conn.execute("SELECT * FROM signals")
+    }
+    trades = [dict(r) for r in conn.execute("SELECT * FROM trades")]
+    for t in trades:
+        t["_opened"] = datetime.fromisoformat(t["open_time"])
+        t["_closed"] = datetime.fromisoformat(t["close_time"]) if t["close_time"] else None
+
+    backtest = set()
+    for run in ctx.runs:
+        tf = run.runtime.timeframe
+        step = timeframe_to_timedelta(tf)
+        strategy = load_strategy(run.runtime.strategy_name, run.instruments, timeframe=tf)
+        for symbol in run.instruments:
+            df = bars.get(symbol)
+            if df is None or df.empty:
+                continue
+            if step != base:
+                df = resample_ohlcv(df.sort_index(), tf)
+            df = df[df.index + step <= end]
+            df_ind = strategy.compute_indicators(df)
+            # paper closes are resolved on the fetched (source) bars
+            source_step = timeframe_to_timedelta(sources[(tf, symbol)])
+            inst_trades = [
+                t for t in trades
+                if t["instrument"] == symbol and t["strategy_instance"] == run.instance_id
+            ]
+            for i in np.flatnonzero(df.index + step > start):
+                ts = df.index[i].to_pydatetime()
+                bar_close = ts + step
+                open_trades = [
+                    t for t in inst_trades
+                    if t["_opened"] < ts and (t["_closed"] is None or t["_closed"] + source_step > bar_close)
+                ]
+                for sig in strategy.generate_signals(df_ind.iloc[: i + 1], open_trades):
+                    backtest.add(_signal_key(
+                        run.instance_id, symbol, sig.kind.value,
+                        sig.direction.value if sig.direction else None,
+                        sig.timestamp, sig.price, sig.stop_price,
+                    ))
+
+    return ParityReport(
+        matched=len(live & backtest),
+        live_only=sorted(live - backtest),
+        backtest_only=sorted(backtest - live),
+    )
+
+
+# --- CLI --- #
+
+def load_bars(directory: str) -> Dict[str, pd.DataFrame]:
+    """<symbol>.csv / <symbol>.parquet files in `directory` -> {symbol: bars}."""
+    bars: Dict[str, pd.DataFrame] = {}
+    for name in sorted(os.listdir(directory)):
+        symbol, ext = os.path.splitext(name)
+        path = os.path.join(directory, name)
+        if ext == ".csv":
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+        elif ext == ".parquet":
+            df = pd.read_parquet(path)
+        else:
+            continue
+        index = pd.DatetimeIndex(df.index)
+        df.index = index.tz_convert(None) if index.tz is not None else index
+        df.index.name = "timestamp"
+        df.columns = [str(c).lower() for c in df.columns]
+        bars[symbol] = df
+    return bars
+
+
+def infer_timeframe(bars: Dict[str, pd.DataFrame]) -> pd.Timedelta:
+    """Most common spacing between consecutive bars."""
+    diffs = pd.concat([df.index.to_series().diff().dropna() for df in bars.values()])
+    return diffs.mode().iloc[0]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded bars through the live pipeline.")
+    parser.add_argument("--bars", required=True, help="Directory of <symbol>.csv / .parquet bar files.")
+    parser.add_argument("--timeframe", default=None, help="Recorded bar length, e.g. 1h (default: inferred).")
+    parser.add_argument("--start", default=None, help="First bar close to replay (default: first bar + 200 bars).")
+    parser.add_argument("--end", default=None, help="Last bar close to replay (default: end of data).")
+    parser.add_argument("--db", default=":memory:", help="DB for the replayed signals / trades.")
+    parser.add_argument("--parity", action="store_true", help="Compare signals with a backtest-style pass.")
+    parser.add_argument("--verbose", action="store_true", help="Show strategy / notifier output.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    bars = load_bars(args.bars)
+    if not bars:
+        raise SystemExit(f"No bar files in {args.bars}")
+    timeframe = args.timeframe or infer_timeframe(bars).to_pytimedelta()
+    first = min(df.index[0] for df in bars.values())
+    last = max(df.index[-1] for df in bars.values())
+    start = (
+        datetime.fromisoformat(args.start) if args.start
+        else (first + 200 * timeframe_to_timedelta(timeframe)).to_pydatetime()
+    )
+    end = datetime.fromisoformat(args.end) if args.end else (last + timeframe_to_timedelta(timeframe)).to_pydatetime()
+
+    config = replay_config(
+        replace(DEFAULT_CONFIG, instruments=[InstrumentConfig(symbol=s) for s in bars]),
+        db_path=args.db,
+    )
+    report, ctx = replay(config, bars, timeframe, start, end, quiet=not args.verbose)
+    try:
+        print(report.summary())
+        if args.parity:
+            parity = parity_check(ctx, bars, timeframe, start, end)
+            print(parity.summary())
+            return 0 if parity.ok else 1
+    finally:
+        ctx.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
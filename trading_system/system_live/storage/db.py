@@ -4,27 +4,167 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from contextlib import contextmanager
 from dataclasses import asdict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from ..execution.trade_types import Signal, ProposedTrade, Direction, SignalKind
 
+_CLOSE_TRADE_SQL = """
+    UPDATE trades
+    SET status = 'closed',
+        close_time = ?,
+        realised_pnl = ?,
+        exit_price = ?,
+        close_reason = ?
+    WHERE id = ? AND status = 'open'
+"""
+
+
+def _close_params(closes: List[tuple]) -> List[tuple]:
+    return [
+        (close_time.isoformat(), pnl, exit_price, reason, trade_id)
+        for trade_id, close_time, pnl, exit_price, reason in closes
+    ]
+
+
+_INSERT_SIGNAL_SQL = """
+    INSERT INTO signals (
+        strategy_name, instrument, timeframe, kind, direction, timestamp,
+        price, stop_price, target_price, metadata, linked_trade_id, strategy_instance
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_TRADE_SQL = """
+    INSERT INTO trades (
+        signal_id, strategy_name, instrument, direction,
+        entry_price, stop_price, target_price, size, risk_amount,
+        open_time, close_time, status, realised_pnl, strategy_instance
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _signal_params(signal: Signal) -> tuple:
+    return (
+        signal.strategy_name,
+        signal.instrument,
+        signal.timeframe,
+        signal.kind.value,
+        signal.direction.value if signal.direction else None,
+        signal.timestamp.isoformat(),
+        signal.price,
+        signal.stop_price,
+        signal.target_price,
+        json.dumps(signal.metadata or {}),
+        signal.linked_trade_id,
+        signal.strategy_instance,
+    )
+
+
+def _trade_params(trade: ProposedTrade, status: str) -> tuple:
+    return (
+        trade.signal_id,
+        trade.strategy_name,
+        trade.instrument,
+        trade.direction.value,
+        trade.entry_price,
+        trade.stop_price,
+        trade.target_price,
+        trade.size,
+        trade.risk_amount,
+        trade.open_time.isoformat(),
+        None,
+        status,
+        None,
+        trade.strategy_instance,
+    )
+
 
 class TradingDatabase:
     """
     Simple SQLite-based persistence for signals and trades.
+
+    Every write helper commits on its own, unless it runs inside
+    `with db.transaction():`, in which case everything in the block is
+    committed once at its end (or rolled back if it raises). The live
+    runner writes each cycle this way.
+
+    The DB runs in WAL mode with synchronous=NORMAL: a commit appends to
+    the write-ahead log without an fsync (checkpoints sync), so a power
+    loss may lose the last commits but never corrupts the file.
     """
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, cache_size_mb: int = 64):
         self.db_path = db_path
         self._conn = sqlite3.connect(self.db_path)
         self._conn.row_factory = sqlite3.Row
+        self._depth = 0  # nesting of transaction() blocks
+        self._on_commit: List[Callable[[], None]] = []
+        self._conn.execute("PRAGMA journal_mode = WAL")  # stays "memory" for ":memory:"
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(f"PRAGMA cache_size = {-int(cache_size_mb) * 1024}")  # negative: KiB
         self.ensure_schema()
 
     def close(self):
         self._conn.close()
 
+    # --- Transactions --- #
+
+    @contextmanager
+    def transaction(self) -> Iterator["TradingDatabase"]:
+        """
+        Unit of work: the writes of the block (and of nested blocks) are
+        committed together when the outermost block exits, and rolled
+        back if it raises.
+        """
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.rollback()
+                self._on_commit.clear()
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self._conn.commit()
+            callbacks, self._on_commit = self._on_commit, []
+            for fn in callbacks:
+                fn()
+
+    def on_commit(self, fn: Callable[[], None]):
+        """
+        Run `fn` once the current transaction() commits (right away outside
+        one); dropped if it rolls back. For in-memory state that must only
+        advance with what was written.
+        """
+        if self._depth == 0:
+            fn()
+        else:
+            self._on_commit.append(fn)
+
+    def _commit(self):
+        """Commit, unless inside transaction() (which commits at its end)."""
+        if self._depth == 0:
+            self._conn.commit()
+
+    def _last_ids(self, cur: sqlite3.Cursor, table: str, count: int) -> List[int]:
+        """
+        Ids of the `count` rows just inserted into `table` by one
+        executemany (lastrowid is not set by executemany). The rows of one
+        statement get consecutive AUTOINCREMENT ids, as the write lock is
+        held throughout.
+        """
+        if count == 0:
+            return []
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+        last = cur.fetchone()["seq"]
+        return list(range(last - count + 1, last + 1))
+
     # --- Schema --- #
 
     def ensure_schema(self):
@@ -72,71 +212,111 @@ class TradingDatabase:
             """
         )
 
-        self._conn.commit()
-
-    # --- Insert helpers --- #
-
-    def insert_signal(self, signal: Signal) -> int:
-        cur = self._conn.cursor()
-        metadata_json = json.dumps(signal.metadata or {})
+        # Columns added after the first release: add them to existing DBs
+        # (strategy_instance: see runner.strategy_instance_id)
+        self._add_missing_columns("signals", {"strategy_instance": "TEXT"})
+        self._add_missing_columns(
+            "trades",
+            {
+                "exit_price": "REAL",
+                "close_reason": "TEXT",  # "stop", "target", ...
+                "strategy_instance": "TEXT",
+            },
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trades_status ON trades (status, instrument)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trades_instance ON trades (strategy_instance, status)"
+        )
 
+        # Runner state (e.g. last processed bar close per strategy / timeframe)
         cur.execute(
             """
-            INSERT INTO signals (
-                strategy_name, instrument, timeframe, kind, direction, timestamp,
-                price, stop_price, target_price, metadata, linked_trade_id
+            CREATE TABLE IF NOT EXISTS runner_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at TEXT NOT NULL
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                signal.strategy_name,
-                signal.instrument,
-                signal.timeframe,
-                signal.kind.value,
-                signal.direction.value if signal.direction else None,
-                signal.timestamp.isoformat(),
-                signal.price,
-                signal.stop_price,
-                signal.target_price,
-                metadata_json,
-                signal.linked_trade_id,
-            ),
+            """
         )
-        self._conn.commit()
-        signal_id = cur.lastrowid
-        return signal_id
 
-    def insert_trade(self, trade: ProposedTrade) -> int:
-        cur = self._conn.cursor()
+        # Paper trading equity curve (see execution/paper.py)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS paper_equity (
+                timestamp TEXT NOT NULL,
+                strategy_name TEXT NOT NULL,
+                equity REAL NOT NULL,
+                realised_pnl REAL NOT NULL,
+                unrealised_pnl REAL NOT NULL,
+                open_trades INTEGER NOT NULL
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_paper_equity ON paper_equity (strategy_name, timestamp)"
+        )
+        self._add_missing_columns("paper_equity", {"strategy_instance": "TEXT"})
 
+        # Per-cycle timings and counters (long format, see execution/metrics.py)
         cur.execute(
             """
-            INSERT INTO trades (
-                signal_id, strategy_name, instrument, direction,
-                entry_price, stop_price, target_price, size, risk_amount,
-                open_time, close_time, status, realised_pnl
+            CREATE TABLE IF NOT EXISTS cycle_metrics (
+                cycle_id TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                bar_close TEXT,
+                strategy_name TEXT,
+                instrument TEXT,
+                name TEXT NOT NULL,
+                value REAL
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                trade.signal_id,
-                trade.strategy_name,
-                trade.instrument,
-                trade.direction.value,
-                trade.entry_price,
-                trade.stop_price,
-                trade.target_price,
-                trade.size,
-                trade.risk_amount,
-                trade.open_time.isoformat(),
-                None,
-                "open",
-                None,
-            ),
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cycle_metrics_started ON cycle_metrics (started_at)"
         )
+
         self._conn.commit()
-        trade_id = cur.lastrowid
-        return trade_id
+
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        cur = self._conn.cursor()
+        existing = {row["name"] for row in cur.execute(f"PRAGMA table_info({table})")}
+        for name, decl in columns.items():
+            if name not in existing:
+                cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+    # --- Insert helpers --- #
+
+    def insert_signal(self, signal: Signal) -> int:
+        return self.insert_signals([signal])[0]
+
+    def insert_signals(self, signals: List[Signal]) -> List[int]:
+        """Insert several signals with one executemany; sets and returns their ids."""
+        cur = self._conn.cursor()
+        cur.executemany(_INSERT_SIGNAL_SQL, [_signal_params(s) for s in signals])
+        ids = self._last_ids(cur, "signals", len(signals))
+        self._commit()
+        for signal, signal_id in zip(signals, ids):
+            signal.id = signal_id
+        return ids
+
+    def insert_trade(self, trade: ProposedTrade, status: str = "open") -> int:
+        """
+        status: "open", or "pending" for a paper trade waiting for its
+        entry fill (execution/paper.py).
+        """
+        return self.insert_trades([trade], status=status)[0]
+
+    def insert_trades(self, trades: List[ProposedTrade], status: str = "open") -> List[int]:
+        """Insert several trades with one executemany; sets and returns their ids."""
+        cur = self._conn.cursor()
+        cur.executemany(_INSERT_TRADE_SQL, [_trade_params(t, status) for t in trades])
+        ids = self._last_ids(cur, "trades", len(trades))
+        self._commit()
+        for trade, trade_id in zip(trades, ids):
+            trade.id = trade_id
+        return ids
 
     def link_signal_to_trade(self, signal_id: int, trade_id: int):
         cur = self._conn.cursor()
@@ -144,43 +324,221 @@ class TradingDatabase:
             "UPDATE signals SET linked_trade_id = ? WHERE id = ?",
             (trade_id, signal_id),
         )
-        self._conn.commit()
+        self._commit()
+
+    def insert_signals_and_trades(
+        self,
+        entries: List[Tuple[Signal, Optional[ProposedTrade]]],
+        trade_status: str = "open",
+    ):
+        """
+        Insert signals and the trades built from them (None for signals
+        without one) in one transaction: signals first, then the trades
+        with their signal_id, then the signals' linked_trade_id. Sets the
+        ids on the Signal / ProposedTrade objects.
+        """
+        with self.transaction():
+            self.insert_signals([sig for sig, _ in entries])
+            linked = [(sig, trade) for sig, trade in entries if trade is not None]
+            for sig, trade in linked:
+                trade.signal_id = sig.id
+            self.insert_trades([trade for _, trade in linked], status=trade_status)
+            for sig, trade in linked:
+                sig.linked_trade_id = trade.id
+            self._conn.executemany(
+                "UPDATE signals SET linked_trade_id = ? WHERE id = ?",
+                [(trade.id, sig.id) for sig, trade in linked],
+            )
+
+    def insert_cycle_metrics(self, rows: List[tuple]) -> None:
+        """
+        rows: (cycle_id, started_at, bar_close, strategy_name, instrument, name, value)
+        """
+        cur = self._conn.cursor()
+        cur.executemany(
+            """
+            INSERT INTO cycle_metrics (
+                cycle_id, started_at, bar_close, strategy_name, instrument, name, value
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        self._commit()
 
     # --- Query helpers --- #
 
-    def get_open_trades(self, strategy_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_open_trades(
+        self,
+        strategy_name: Optional[str] = None,
+        include_pending: bool = False,
+        strategy_instance: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        strategy_instance: only this strategy instance's trades (instances
+        of one strategy share its strategy_name).
+        """
         cur = self._conn.cursor()
-        if strategy_name:
+        statuses = "('open', 'pending')" if include_pending else "('open')"
+        if strategy_instance:
             cur.execute(
-                """
+                f"""
                 SELECT * FROM trades
-                WHERE status = 'open' AND strategy_name = ?
+                WHERE status IN {statuses} AND strategy_instance = ?
+                """,
+                (strategy_instance,),
+            )
+        elif strategy_name:
+            cur.execute(
+                f"""
+                SELECT * FROM trades
+                WHERE status IN {statuses} AND strategy_name = ?
                 """,
                 (strategy_name,),
             )
         else:
             cur.execute(
-                "SELECT * FROM trades WHERE status = 'open'"
+                f"SELECT * FROM trades WHERE status IN {statuses}"
             )
 
         rows = cur.fetchall()
         return [dict(row) for row in rows]
 
+    def get_open_trades_with_timeframe(
+        self,
+        statuses: Sequence[str] = ("open",),
+    ) -> List[Dict[str, Any]]:
+        """
+        All trades with one of `statuses`, plus the timeframe of the
+        signal that opened them (None if the signal is missing).
+        """
+        cur = self._conn.cursor()
+        cur.execute(
+            f"""
+            SELECT t.*, s.timeframe AS timeframe
+            FROM trades t
+            LEFT JOIN signals s ON s.id = t.signal_id
+            WHERE t.status IN ({", ".join("?" for _ in statuses)})
+            """,
+            tuple(statuses),
+        )
+        return [dict(row) for row in cur.fetchall()]
+
+    def get_realised_pnl(self) -> Dict[Optional[str], float]:
+        """Total realised PnL of closed trades per strategy instance."""
+        cur = self._conn.cursor()
+        cur.execute(
+            """
+            SELECT strategy_instance, SUM(realised_pnl) AS pnl
+            FROM trades
+            WHERE status = 'closed'
+            GROUP BY strategy_instance
+            """
+        )
+        return {row["strategy_instance"]: row["pnl"] or 0.0 for row in cur.fetchall()}
+
+    def claim_legacy_rows(self, strategy_name: str, timeframe: str, strategy_instance: str) -> int:
+        """
+        Assign signals and trades written before strategy_instance existed
+        (NULL) to `strategy_instance`: those of `strategy_name` whose signal
+        has `timeframe`. Returns the number of trades claimed.
+        """
+        with self.transaction():
+            cur = self._conn.cursor()
+            cur.execute(
+                """
+                UPDATE signals SET strategy_instance = ?
+                WHERE strategy_instance IS NULL AND strategy_name = ? AND timeframe = ?
+                """,
+                (strategy_instance, strategy_name, timeframe),
+            )
+            cur.execute(
+                """
+                UPDATE trades SET strategy_instance = ?
+                WHERE strategy_instance IS NULL AND strategy_name = ?
+                  AND signal_id IN (SELECT id FROM signals WHERE strategy_instance = ?)
+                """,
+                (strategy_instance, strategy_name, strategy_instance),
+            )
+            return cur.rowcount
+
     def close_trade(
         self,
         trade_id: int,
         close_time: datetime,
         realised_pnl: Optional[float] = None,
+        exit_price: Optional[float] = None,
+        close_reason: Optional[str] = None,
+    ):
+        self.close_trades([(trade_id, close_time, realised_pnl, exit_price, close_reason)])
+
+    def close_trades(self, closes: List[tuple]) -> int:
+        """
+        Close several trades in one transaction.
+
+        closes: (trade_id, close_time, realised_pnl, exit_price, close_reason)
+        Trades that are no longer open are left alone. Returns the number
+        of trades closed.
+        """
+        cur = self._conn.cursor()
+        cur.executemany(_CLOSE_TRADE_SQL, _close_params(closes))
+        self._commit()
+        return cur.rowcount
+
+    def apply_paper_cycle(
+        self,
+        fills: List[tuple],
+        closes: List[tuple],
+        equity: List[tuple],
+        state: Optional[Dict[str, str]] = None,
     ):
+        """
+        Write one paper-trading cycle in a single transaction:
+
+        fills:  (trade_id, entry_price) for pending trades now open
+        closes: as for close_trades
+        equity: (timestamp, strategy_name, strategy_instance, equity, realised_pnl,
+                 unrealised_pnl, open_trades)
+        state:  runner_state entries to set
+        """
+        with self.transaction():
+            cur = self._conn.cursor()
+            cur.executemany(
+                "UPDATE trades SET status = 'open', entry_price = ? WHERE id = ? AND status = 'pending'",
+                [(price, trade_id) for trade_id, price in fills],
+            )
+            cur.executemany(_CLOSE_TRADE_SQL, _close_params(closes))
+            cur.executemany(
+                """
+                INSERT INTO paper_equity (
+                    timestamp, strategy_name, strategy_instance, equity, realised_pnl,
+                    unrealised_pnl, open_trades
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(ts.isoformat(), *rest) for ts, *rest in equity],
+            )
+            now = datetime.utcnow().isoformat()
+            cur.executemany(
+                "INSERT OR REPLACE INTO runner_state (key, value, updated_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in (state or {}).items()],
+            )
+
+    # --- Runner state --- #
+
+    def get_state(self, key: str) -> Optional[str]:
+        cur = self._conn.cursor()
+        cur.execute("SELECT value FROM runner_state WHERE key = ?", (key,))
+        row = cur.fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, key: str, value: str):
         cur = self._conn.cursor()
         cur.execute(
             """
-            UPDATE trades
-            SET status = 'closed',
-                close_time = ?,
-                realised_pnl = ?
-            WHERE id = ?
+            INSERT OR REPLACE INTO runner_state (key, value, updated_at)
+            VALUES (?, ?, ?)
             """,
-            (close_time.isoformat(), realised_pnl, trade_id),
+            (key, value, datetime.utcnow().isoformat()),
         )
-        self._conn.commit()
+        self._commit()
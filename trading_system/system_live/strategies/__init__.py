@@ -21,27 +21,51 @@ A StrategyInstance must implement:
 - get_instruments() -> list[str]
 - compute_indicators(df: pd.DataFrame) -> pd.DataFrame
 - generate_signals(df: pd.DataFrame, open_trades_for_instrument: list[dict]) -> list[Signal]
+
+Optionally, a strategy can evaluate bar by bar, keeping its indicator
+state between cycles instead of recomputing it over the whole window.
+The runner then uses these instead of compute_indicators / generate_signals:
+
+- on_bar(instrument: str, bar: pd.Series, open_trades_for_instrument: list[dict]) -> list[Signal]
+    (bar.name is the bar timestamp; bars at or before the last one seen
+     are skipped, except that a re-sent last bar replaces it)
+- last_bar_time(instrument: str) -> datetime | None
+- reset(instrument: str) -> None
+
+and, to persist that state in the DB across restarts:
+
+- get_state() -> dict  (JSON-serialisable)
+- set_state(state: dict) -> None
 """
 
 from __future__ import annotations
 
 import importlib
-from typing import Any, List
+from typing import Any, List, Optional
 
 
-def load_strategy(strategy_name: str, instruments: List[str]) -> Any:
+def load_strategy(
+    strategy_name: str,
+    instruments: List[str],
+    timeframe: Optional[str] = None,
+) -> Any:
     """
     Dynamically load a strategy from system_live.strategies.<strategy_name>.strategy
+
+    If timeframe is given, it overrides the strategy's own `timeframe`.
     """
-    module_path = f"system_live.strategies.{strategy_name}.strategy"
+    module_path = f"{__name__}.{strategy_name}.strategy"
     module = importlib.import_module(module_path)
 
     if hasattr(module, "build_strategy"):
-        return module.build_strategy(instruments=instruments)
-
-    if hasattr(module, "Strategy"):
-        return module.Strategy(instruments=instruments)
+        strategy = module.build_strategy(instruments=instruments)
+    elif hasattr(module, "Strategy"):
+        strategy = module.Strategy(instruments=instruments)
+    else:
+        raise RuntimeError(
+            f"Strategy module {module_path} must define build_strategy() or Strategy class."
+        )
 
-    raise RuntimeError(
-        f"Strategy module {module_path} must define build_strategy() or Strategy class."
-    )
+    if timeframe is not None:
+        strategy.timeframe = timeframe
+    return strategy
@@ -2,15 +2,70 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import itertools
+import math
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Deque, Dict, List, Optional
 
 import pandas as pd
 
 from ...execution.trade_types import Signal, SignalKind, Direction
 
 
+@dataclass
+class _IndicatorState:
+    """Rolling windows behind fast_ma / slow_ma / atr for one instrument."""
+
+    closes: Deque[float]              # last max(fast_ma, slow_ma) closes
+    trs: Deque[float]                 # last atr_period true ranges
+    prev_close: Optional[float] = None
+    fast_ma: float = float("nan")
+    slow_ma: float = float("nan")
+    last_ts: Optional[datetime] = None
+    prior: Optional["_IndicatorState"] = None  # state before last_ts, to redo a re-sent bar
+
+    def copy(self) -> "_IndicatorState":
+        return _IndicatorState(
+            closes=deque(self.closes, maxlen=self.closes.maxlen),
+            trs=deque(self.trs, maxlen=self.trs.maxlen),
+            prev_close=self.prev_close,
+            fast_ma=self.fast_ma,
+            slow_ma=self.slow_ma,
+            last_ts=self.last_ts,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "closes": list(self.closes),
+            "trs": list(self.trs),
+            "prev_close": self.prev_close,
+            "fast_ma": self.fast_ma,
+            "slow_ma": self.slow_ma,
+            "last_ts": self.last_ts.isoformat() if self.last_ts else None,
+            "prior": self.prior.to_dict() if self.prior else None,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], n_closes: int, n_trs: int) -> "_IndicatorState":
+        return cls(
+            closes=deque(d["closes"], maxlen=n_closes),
+            trs=deque(d["trs"], maxlen=n_trs),
+            prev_close=d["prev_close"],
+            fast_ma=float(d["fast_ma"]),
+            slow_ma=float(d["slow_ma"]),
+            last_ts=datetime.fromisoformat(d["last_ts"]) if d["last_ts"] else None,
+            prior=cls.from_dict(d["prior"], n_closes, n_trs) if d.get("prior") else None,
+        )
+
+
+def _window_mean(values: Deque[float], n: int) -> float:
+    if len(values) < n:
+        return float("nan")
+    return math.fsum(itertools.islice(values, len(values) - n, None)) / n
+
+
 @dataclass
 class ExampleMACrossStrategy:
     """
@@ -36,6 +91,7 @@ class ExampleMACrossStrategy:
     atr_period: int = 14
     stop_atr_multiple: float = 2.0
     target_r_multiple: float = 3.0
+    _states: Dict[str, _IndicatorState] = field(default_factory=dict, repr=False)
 
     def get_required_lookback(self) -> int:
         return max(self.fast_ma, self.slow_ma, self.atr_period) + 10
@@ -89,6 +145,100 @@ class ExampleMACrossStrategy:
         slow_prev = float(prev["slow_ma"])
         atr_now = float(last["atr"]) if not pd.isna(last["atr"]) else None
 
+        return self._signals_for_bar(
+            timestamp, price, fast_now, slow_now, fast_prev, slow_prev, atr_now,
+            open_trades_for_instrument,
+        )
+
+    # --- Incremental API (see strategies/__init__.py) --- #
+
+    def last_bar_time(self, instrument: str) -> Optional[datetime]:
+        state = self._states.get(instrument)
+        return state.last_ts if state else None
+
+    def reset(self, instrument: str) -> None:
+        self._states.pop(instrument, None)
+
+    def on_bar(
+        self,
+        instrument: str,
+        bar: pd.Series,
+        open_trades_for_instrument: List[Dict[str, Any]],
+    ) -> List[Signal]:
+        """
+        Advance the fast/slow MA and ATR windows by one bar (bar.name is
+        its timestamp) and return the signals generate_signals() would
+        give for it. Bars older than the last one seen are ignored; a
+        re-sent last bar (e.g. it was still forming) replaces it.
+        """
+        timestamp: datetime = pd.Timestamp(bar.name).to_pydatetime()
+        state = self._states.get(instrument)
+        if state is None:
+            n_closes = max(self.fast_ma, self.slow_ma)
+            state = _IndicatorState(closes=deque(maxlen=n_closes), trs=deque(maxlen=self.atr_period))
+        elif state.last_ts is not None and timestamp <= state.last_ts:
+            if timestamp < state.last_ts or state.prior is None:
+                return []
+            state = state.prior
+
+        prior = state.copy()
+        fast_prev, slow_prev = state.fast_ma, state.slow_ma
+
+        high, low, close = float(bar["high"]), float(bar["low"]), float(bar["close"])
+        tr = high - low
+        if state.prev_close is not None:
+            tr = max(tr, abs(high - state.prev_close), abs(low - state.prev_close))
+
+        state.closes.append(close)
+        state.trs.append(tr)
+        state.prev_close = close
+        state.fast_ma = _window_mean(state.closes, self.fast_ma)
+        state.slow_ma = _window_mean(state.closes, self.slow_ma)
+        state.last_ts = timestamp
+        state.prior = prior
+        self._states[instrument] = state
+
+        atr_now = _window_mean(state.trs, self.atr_period)
+        return self._signals_for_bar(
+            timestamp, close, state.fast_ma, state.slow_ma, fast_prev, slow_prev,
+            None if math.isnan(atr_now) else atr_now,
+            open_trades_for_instrument,
+        )
+
+    def _params(self) -> Dict[str, Any]:
+        return {"fast_ma": self.fast_ma, "slow_ma": self.slow_ma, "atr_period": self.atr_period}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "params": self._params(),
+            "instruments": {sym: st.to_dict() for sym, st in self._states.items()},
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        if state.get("params") != self._params():
+            # Windows were built with other periods; start cold.
+            self._states = {}
+            return
+        n_closes = max(self.fast_ma, self.slow_ma)
+        self._states = {
+            sym: _IndicatorState.from_dict(d, n_closes, self.atr_period)
+            for sym, d in state.get("instruments", {}).items()
+        }
+
+    def _signals_for_bar(
+        self,
+        timestamp: datetime,
+        price: float,
+        fast_now: float,
+        slow_now: float,
+        fast_prev: float,
+        slow_prev: float,
+        atr_now: Optional[float],
+        open_trades_for_instrument: List[Dict[str, Any]],
+    ) -> List[Signal]:
+        """Entry / exit signals for one bar, given its indicator values."""
+        signals: List[Signal] = []
+
         if atr_now is None or pd.isna(fast_now) or pd.isna(slow_now):
             # not enough data
             return signals